@@ -0,0 +1,200 @@
+# agent_host.py - Long-running ReAct agent host over lazily started, shared MCP servers
+import os
+import json
+import time
+import asyncio
+import hashlib
+import statistics
+
+from langchain_core.messages import SystemMessage, HumanMessage
+from langgraph.prebuilt import create_react_agent
+
+from batch_tools import with_batching
+from mcp_session_pool import MCPSessionPool
+
+DEFAULT_MANIFEST_PATH = os.getenv("MCP_TOOL_MANIFEST", ".mcp_tool_manifest.json")
+DEFAULT_SYSTEM_PROMPT = (
+    "You have access to multiple tools that can help answer queries. "
+    "Use them dynamically and efficiently based on the user's request. "
+)
+
+
+def server_fingerprint(config: dict) -> str:
+    """Changes when the command, its arguments or a script file it runs changes."""
+    parts = [config.get("command", ""), *config.get("args", [])]
+    for arg in config.get("args", []):
+        if os.path.isfile(arg):
+            parts.append(str(os.path.getmtime(arg)))
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def final_answer(response: dict):
+    """Final message content of an agent run (unwraps ElevenLabs-style status dicts)."""
+    content = response["messages"][-1].content
+    if isinstance(content, dict) and content.get("status") == "success" and "message" in content:
+        return content["message"]  # e.g., "Audio saved on server as output_xxx.mp3"
+    return content
+
+
+class AgentHost:
+    """
+    Build the agent once and serve many queries over shared MCP sessions.
+
+    Tool descriptions come from a manifest file saved from an earlier run, so
+    the agent can be compiled without spawning any server; a server process
+    starts only when one of its tools is first called (servers missing from
+    the manifest are started once to list their tools). Queries may run
+    concurrently, up to `max_concurrency` at a time.
+    """
+
+    def __init__(self, servers: dict, model=None, system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+                 manifest_path: str = DEFAULT_MANIFEST_PATH, pool: MCPSessionPool = None,
+                 max_concurrency: int = 8):
+        self.servers = {}
+        for name, config in servers.items():
+            if config.get("transport", "stdio") != "stdio":
+                raise ValueError(f"{name}: only stdio servers are supported")
+            self.servers[name] = {k: v for k, v in config.items() if k != "transport"}
+        self.model = model
+        self.system_prompt = system_prompt
+        self.manifest_path = manifest_path
+        self.pool = pool or MCPSessionPool()
+        self._own_pool = pool is None
+        for name, config in self.servers.items():
+            self.pool.register(name, config)
+        self.max_concurrency = max_concurrency
+        self.agent = None
+        self.tools = []
+        self.startup = {}         # phase -> seconds
+        self.server_starts = {}   # server -> seconds to start on first use
+        self.latencies = []
+        self.failures = 0
+        self._server_locks = {name: asyncio.Lock() for name in self.servers}
+        self._semaphore = None
+
+    # ----- tool manifest -----
+    def _load_manifest(self) -> dict:
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: dict) -> None:
+        if not self.manifest_path:
+            return
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    async def _discover(self, name: str) -> list:
+        start = time.perf_counter()
+        tools = await self.pool.get_tools(name)
+        self.server_starts[name] = time.perf_counter() - start
+        return [
+            {"name": t.name, "description": t.description, "args_schema": t.args_schema}
+            for t in tools
+        ]
+
+    # ----- lifecycle -----
+    async def start(self) -> "AgentHost":
+        """Prepare tools and compile the agent (no server is started for known tools)."""
+        if self.agent is not None:
+            return self
+        start = time.perf_counter()
+        manifest = self._load_manifest()
+        stale = [
+            name for name, config in self.servers.items()
+            if manifest.get(name, {}).get("fingerprint") != server_fingerprint(config)
+        ]
+        self.startup["manifest"] = time.perf_counter() - start
+
+        if stale:
+            start = time.perf_counter()
+            discovered = await asyncio.gather(*(self._discover(name) for name in stale), return_exceptions=True)
+            for name, tools in zip(stale, discovered):
+                if isinstance(tools, Exception):
+                    print(f"MCP server '{name}' is unavailable: {tools}")
+                    manifest.pop(name, None)
+                    continue
+                manifest[name] = {"fingerprint": server_fingerprint(self.servers[name]), "tools": tools}
+            self._save_manifest(manifest)
+            self.startup["discovery"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        # parallel single-item calls are merged into a server's batch tool when it has one
+        self.tools = with_batching([
+            self._lazy_tool(name, spec)
+            for name in self.servers if name in manifest
+            for spec in manifest[name]["tools"]
+        ])
+        if self.model is None:
+            from llm_clients import get_chat_model
+            self.model = get_chat_model("gpt-4o")
+        self.agent = create_react_agent(self.model, self.tools)
+        self.startup["agent_build"] = time.perf_counter() - start
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    def _lazy_tool(self, server: str, spec: dict):
+        tool = self.pool.bridge_tool(server, spec["name"], spec["description"], spec["args_schema"])
+        forward = tool.coroutine
+
+        async def _acall(**kwargs):
+            if not self.pool.is_connected(server):
+                async with self._server_locks[server]:
+                    if not self.pool.is_connected(server):
+                        start = time.perf_counter()
+                        await self.pool.aconnect(server)
+                        self.server_starts[server] = time.perf_counter() - start
+            return await forward(**kwargs)
+
+        tool.coroutine = _acall
+        return tool
+
+    async def ask(self, query: str, messages: list = None):
+        """Run one query through the shared agent and return its final answer."""
+        await self.start()
+        messages = messages or [SystemMessage(content=self.system_prompt), HumanMessage(content=query)]
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                response = await self.agent.ainvoke({"messages": messages})
+            except Exception:
+                self.failures += 1
+                raise
+            finally:
+                self.latencies.append(time.perf_counter() - start)
+        return final_answer(response)
+
+    async def ask_many(self, queries: list) -> list:
+        """Run queries concurrently; a failed query returns its exception."""
+        return await asyncio.gather(*(self.ask(q) for q in queries), return_exceptions=True)
+
+    def metrics(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def pct(q):
+            if not latencies:
+                return None
+            if len(latencies) == 1:
+                return latencies[0]
+            return statistics.quantiles(latencies, n=100)[q - 1]
+
+        return {
+            "startup_seconds": dict(self.startup),
+            "server_start_seconds": dict(self.server_starts),
+            "queries": len(latencies),
+            "failures": self.failures,
+            "latency_p50": pct(50),
+            "latency_p95": pct(95),
+            "latency_max": latencies[-1] if latencies else None,
+        }
+
+    def close(self) -> None:
+        """Stop the servers this host started (a shared pool is left running)."""
+        if self._own_pool:
+            self.pool.close()
@@ -0,0 +1,295 @@
+# alert_dispatcher.py - Background email alerts over a persistent SMTP connection
+import os
+import ssl
+import time
+import atexit
+import smtplib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+# SMTP settings (.env); point SMTP_HOST/SMTP_PORT at a local aiosmtpd server for testing
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_SECURITY = os.getenv("SMTP_SECURITY", "starttls")  # "starttls", "ssl" or "none"
+
+
+@dataclass
+class Alert:
+    subject: str
+    body: str
+    key: str = None          # alerts with the same key (e.g. a currency pair) are coalesced
+    created: float = field(default_factory=time.monotonic)
+    coalesced: int = 0       # how many older alerts this one replaced
+
+
+class AlertDispatcher:
+    """
+    Queue alerts and send them from a worker thread.
+
+    send() only enqueues, so graph nodes return immediately. While an alert
+    for a key is still waiting, a newer one replaces it (only the latest
+    signal per pair is mailed). The worker waits `batch_window` seconds after
+    the first alert to collect a batch, then sends the batch over one
+    connection, or as a single digest email when digest=True. The SMTP
+    connection is kept open between batches, checked with NOOP after it has
+    been idle, re-opened when the server dropped it, and closed after
+    `idle_timeout` seconds without alerts.
+    """
+
+    def __init__(self, host: str = None, port: int = None, security: str = None,
+                 username: str = None, password: str = None, sender: str = None, recipient: str = None,
+                 batch_window: float = 0.5, max_batch: int = 50, digest: bool = False,
+                 idle_timeout: float = 60.0, max_retries: int = 3, timeout: float = 30.0):
+        self.host = host or SMTP_HOST
+        self.port = port or SMTP_PORT
+        self.security = (security or SMTP_SECURITY).lower()
+        self.username = username
+        self.password = password
+        self.sender = sender or username or "alerts@localhost"
+        self.recipient = recipient or self.sender
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.digest = digest
+        self.idle_timeout = idle_timeout
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        self._pending = OrderedDict()  # key -> Alert
+        self._cond = threading.Condition()
+        self._sequence = 0
+        self._in_flight = 0
+        self._closed = False
+        self._smtp = None
+        self._last_used = 0.0
+        self._worker = None
+        self.stats = {"queued": 0, "coalesced": 0, "sent": 0, "emails": 0, "batches": 0,
+                      "connections": 0, "failures": 0}
+
+    @property
+    def configured(self) -> bool:
+        """Credentials are required unless the server is a plain local relay."""
+        return bool(self.host) and (self.security == "none" or bool(self.username and self.password))
+
+    # ----- producer side -----
+    def send(self, subject: str, body: str, key: str = None) -> None:
+        """Enqueue an alert and return immediately."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AlertDispatcher is closed")
+            if key is None:
+                self._sequence += 1
+                key = f"__alert_{self._sequence}"
+            alert = Alert(subject, body, key)
+            previous = self._pending.pop(key, None)
+            if previous is not None:
+                alert.coalesced = previous.coalesced + 1
+                self.stats["coalesced"] += 1
+            self._pending[key] = alert
+            self.stats["queued"] += 1
+            self._ensure_worker()
+            self._cond.notify()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until every queued alert was handled; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Send what is queued, then stop the worker and quit the SMTP session."""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    # ----- worker side -----
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+            self._worker.start()
+
+    def _next_batch(self) -> list:
+        with self._cond:
+            while not self._pending and not self._closed:
+                if not self._cond.wait(self.idle_timeout if self._smtp else None):
+                    self._disconnect()  # idle: let the connection go
+            if not self._pending:
+                return []
+            # Collect a batch: wait out the window unless it is already full or we are closing
+            first = next(iter(self._pending.values())).created
+            while len(self._pending) < self.max_batch and not self._closed:
+                remaining = first + self.batch_window - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                batch.append(self._pending.popitem(last=False)[1])
+            self._in_flight = len(batch)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                self._disconnect()
+                return
+            try:
+                self._deliver(batch)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+
+    def _message(self, subject: str, body: str) -> EmailMessage:
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = self.sender
+        msg["To"] = self.recipient
+        msg.set_content(body)
+        return msg
+
+    def _messages(self, batch: list) -> list:
+        def body(alert):
+            return alert.body + (f"\n(replaced {alert.coalesced} earlier alert(s))" if alert.coalesced else "")
+
+        if self.digest and len(batch) > 1:
+            text = "\n\n".join(f"{alert.subject}\n{body(alert)}" for alert in batch)
+            return [(self._message(f"[Alerts] {len(batch)} signals", text), len(batch))]
+        return [(self._message(alert.subject, body(alert)), 1) for alert in batch]
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            if time.monotonic() - self._last_used < 10:
+                return self._smtp
+            try:
+                self._smtp.noop()  # idle for a while: make sure the server still talks to us
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                self._disconnect()
+        if self.security == "ssl":
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                    context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.security == "starttls":
+                smtp.starttls(context=ssl.create_default_context())
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        self._smtp = smtp
+        self.stats["connections"] += 1
+        return smtp
+
+    def _disconnect(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+    def _deliver(self, batch: list) -> None:
+        self.stats["batches"] += 1
+        for msg, alerts in self._messages(batch):
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self._connect().send_message(msg)
+                    self._last_used = time.monotonic()
+                    self.stats["emails"] += 1
+                    self.stats["sent"] += alerts
+                    logger.info("Alert sent: %s", msg["Subject"])
+                    break
+                except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError) as e:
+                    # Connection-level failure: reconnect and retry with backoff
+                    self._disconnect()
+                    if attempt == self.max_retries:
+                        self.stats["failures"] += alerts
+                        logger.error("Alert email failed after %d attempts: %s", attempt + 1, e)
+                    else:
+                        time.sleep(min(0.5 * 2 ** attempt, 10))
+                except smtplib.SMTPException as e:
+                    # Rejected message (auth, recipient, ...): retrying will not help
+                    self.stats["failures"] += alerts
+                    logger.error("Alert email rejected: %s", e)
+                    break
+
+
+_dispatchers = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_dispatcher(name: str = "default", **options) -> AlertDispatcher:
+    """Shared dispatcher per name; options apply when it is first created."""
+    with _dispatchers_lock:
+        dispatcher = _dispatchers.get(name)
+        if dispatcher is None:
+            dispatcher = _dispatchers[name] = AlertDispatcher(**options)
+        return dispatcher
+
+
+@atexit.register
+def _close_all() -> None:
+    for dispatcher in list(_dispatchers.values()):
+        dispatcher.close(timeout=10)
+
+
+if __name__ == "__main__":
+    import argparse
+    from aiosmtpd.controller import Controller
+
+    parser = argparse.ArgumentParser(description="Send an alert burst to a local aiosmtpd server")
+    parser.add_argument("--alerts", type=int, default=200)
+    parser.add_argument("--pairs", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated server delay per message (s)")
+    args = parser.parse_args()
+
+    class Handler:
+        received = 0
+
+        async def handle_DATA(self, server, session, envelope):
+            import asyncio
+            await asyncio.sleep(args.latency)
+            Handler.received += 1
+            return "250 OK"
+
+    controller = Controller(Handler(), hostname="127.0.0.1", port=8025)
+    controller.start()
+    alerts = [(f"PAIR{i % args.pairs}/USD", "BUY" if i % 2 else "SELL") for i in range(args.alerts)]
+
+    # Old pattern: connect, send and quit inside the graph step
+    start = time.perf_counter()
+    for pair, signal in alerts:
+        with smtplib.SMTP("127.0.0.1", 8025) as smtp:
+            msg = EmailMessage()
+            msg["Subject"], msg["From"], msg["To"] = f"[Forex Signal] {pair} - {signal}", "a@localhost", "b@localhost"
+            msg.set_content(signal)
+            smtp.send_message(msg)
+    blocking = time.perf_counter() - start
+    print(f"connection per alert: {blocking * 1000:8.1f} ms blocked, {Handler.received} emails")
+
+    Handler.received = 0
+    dispatcher = AlertDispatcher("127.0.0.1", 8025, security="none", batch_window=0.2)
+    start = time.perf_counter()
+    for pair, signal in alerts:
+        dispatcher.send(f"[Forex Signal] {pair} - {signal}", signal, key=pair)
+    enqueued = time.perf_counter() - start
+    dispatcher.flush()
+    drained = time.perf_counter() - start
+    print(f"dispatcher:           {enqueued * 1000:8.1f} ms blocked, {drained * 1000:.1f} ms to drain, "
+          f"{Handler.received} emails")
+    print(dispatcher.stats)
+    dispatcher.close()
+    controller.stop()
@@ -0,0 +1,163 @@
+# batch_tools.py - Merge parallel single-item MCP tool calls into one batched request
+import os
+import json
+import asyncio
+from dataclasses import dataclass
+
+from langchain_core.tools import StructuredTool
+
+BATCH_WINDOW = float(os.getenv("TOOL_BATCH_WINDOW", "0.005"))  # seconds to wait for sibling calls
+MAX_BATCH = int(os.getenv("TOOL_MAX_BATCH", "100"))
+
+
+@dataclass(frozen=True)
+class BatchSpec:
+    """How a single-item tool maps onto its batched variant."""
+    batch_tool: str   # e.g. "check_inventory_many"
+    item_arg: str     # argument of the single tool, e.g. "product_id"
+    batch_arg: str    # list argument of the batch tool, e.g. "product_ids"
+    value: str        # field of a successful per-item result returned by the single tool
+
+
+# Batched variants provided by the servers in this repo
+BATCH_VARIANTS = {
+    "check_inventory": BatchSpec("check_inventory_many", "product_id", "product_ids", "status"),
+    "get_user_name": BatchSpec("get_user_names", "user_id", "user_ids", "name"),
+    "get_rate": BatchSpec("get_rates", "pair", "pairs", "rate"),
+}
+
+
+def parse_batch_result(result, items: list) -> list:
+    """
+    Per-item results of a batch tool, aligned with `items`.
+
+    Accepts the tool's raw output: a list (one JSON content block per item,
+    as FastMCP returns lists), a JSON string, or a dict keyed by item (as
+    get_rates returns).
+    """
+    if isinstance(result, (list, tuple)):
+        values = []
+        for block in result:
+            if isinstance(block, dict) and block.get("type") == "text":
+                block = block.get("text", "")
+            values.append(json.loads(block) if isinstance(block, str) else block)
+        if len(values) == 1 and isinstance(values[0], (list, dict)) and not _is_item(values[0]):
+            result = values[0]  # the whole result in one block
+        else:
+            result = values
+    elif isinstance(result, str):
+        result = json.loads(result)
+    if isinstance(result, dict):
+        return [result.get(str(item), {"ok": False, "error": f"No result for {item!r}"}) for item in items]
+    if len(result) != len(items):
+        raise ValueError(f"Batch returned {len(result)} results for {len(items)} items")
+    return list(result)
+
+
+def _is_item(value) -> bool:
+    return isinstance(value, dict) and "ok" in value
+
+
+class MicroBatcher:
+    """
+    Collects items submitted within `window` seconds (or until `max_batch`)
+    and resolves them with one `call_batch(items) -> per-item results` call.
+    Duplicate items in a batch are sent once.
+    """
+
+    def __init__(self, call_batch, window: float = BATCH_WINDOW, max_batch: int = MAX_BATCH):
+        self.call_batch = call_batch
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self._pending = {}   # item -> future
+        self._timer = None
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = self._pending.get(item)
+        if future is None:
+            future = self._pending[item] = loop.create_future()
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if pending:
+            asyncio.ensure_future(self._run(pending))
+
+    async def _run(self, pending: dict) -> None:
+        items = list(pending)
+        self.batches += 1
+        self.items += len(items)
+        try:
+            results = await self.call_batch(items)
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for item, result in zip(items, results):
+            if not pending[item].done():
+                pending[item].set_result(result)
+
+
+def batched_tool(single, batch, spec: BatchSpec, window: float = BATCH_WINDOW) -> StructuredTool:
+    """
+    Same name, description and arguments as `single`, but concurrent calls
+    (e.g. the parallel tool calls of one agent step, which ToolNode runs
+    together) are sent to the server as one `batch` call.
+    """
+
+    async def call_batch(items: list) -> list:
+        return parse_batch_result(await batch.ainvoke({spec.batch_arg: items}), items)
+
+    batcher = MicroBatcher(call_batch, window=window)
+
+    async def _acall(**kwargs):
+        item = kwargs[spec.item_arg]
+        result = await batcher.submit(item)
+        return result.get(spec.value) if result.get("ok") else result.get("error")
+
+    tool = StructuredTool(
+        name=single.name,
+        description=single.description,
+        args_schema=single.args_schema,
+        coroutine=_acall,
+    )
+    tool.metadata = {**(single.metadata or {}), "batcher": batcher}
+    return tool
+
+
+def with_batching(tools: list, variants: dict = None, window: float = BATCH_WINDOW) -> list:
+    """
+    Replace every single-item tool whose batched variant is also in `tools`
+    with a micro-batching wrapper. The batch tools stay available, so the
+    model can also ask for many items in one call.
+    """
+    variants = BATCH_VARIANTS if variants is None else variants
+    by_name = {tool.name: tool for tool in tools}
+    wrapped = []
+    for tool in tools:
+        spec = variants.get(tool.name)
+        if spec is not None and spec.batch_tool in by_name:
+            tool = batched_tool(tool, by_name[spec.batch_tool], spec, window)
+        wrapped.append(tool)
+    return wrapped
+
+
+def batch_stats(tools: list) -> dict:
+    """{tool name: (batched requests sent, items)} for the wrappers in `tools`."""
+    stats = {}
+    for tool in tools:
+        batcher = (tool.metadata or {}).get("batcher")
+        if batcher is not None:
+            stats[tool.name] = (batcher.batches, batcher.items)
+    return stats
@@ -0,0 +1,382 @@
+# catalog_engine.py - Indexed product catalog for the e-commerce MCP server
+import os
+import re
+import heapq
+import pickle
+import sqlite3
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import groupby, islice
+
+CATALOG_PATH = os.getenv("CATALOG_PATH")       # .sqlite/.db or .parquet file (unset: built-in demo catalog)
+CATALOG_TABLE = os.getenv("CATALOG_TABLE", "products")
+INDEX_CACHE = os.getenv("CATALOG_INDEX_CACHE", "1") == "1"  # reuse saved indexes (<catalog>.index)
+CHEAP_PRICE = float(os.getenv("CATALOG_CHEAP_PRICE", "1000"))  # "cheap" without a number means <= this
+
+_INDEX_VERSION = 1
+_TOKEN = re.compile(r"[a-z0-9]+")
+CHEAP_WORDS = {"cheap", "cheaper", "cheapest", "affordable", "inexpensive", "budget", "under", "below"}
+STOP_WORDS = {
+    "a", "an", "the", "and", "or", "for", "with", "that", "is", "are", "in", "of", "to", "me", "my",
+    "i", "want", "need", "please", "recommend", "suggest", "find", "show", "some", "any", "one",
+    "stock", "available", "than", "less", "more", "over", "above", "between", "price", "priced",
+}
+_PRICE_PATTERNS = (
+    ("between", re.compile(r"between\s*\$?\s*(\d+(?:\.\d+)?)\s*(?:and|-|to)\s*\$?\s*(\d+(?:\.\d+)?)")),
+    ("max", re.compile(r"(?:under|below|less than|cheaper than|up to|max(?:imum)?|<=?)\s*\$?\s*(\d+(?:\.\d+)?)")),
+    ("min", re.compile(r"(?:over|above|more than|at least|min(?:imum)?|>=?)\s*\$?\s*(\d+(?:\.\d+)?)")),
+)
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN.findall(text.lower())
+
+
+def _singular(token: str) -> str:
+    if len(token) > 3 and token.endswith("es") and token[:-2].endswith(("s", "x", "ch", "sh")):
+        return token[:-2]
+    if len(token) > 2 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+class CatalogEngine:
+    """
+    Read-only product catalog with indexes for recommendation queries.
+
+    Rows are stored column-wise, sorted by (category, price, id), so:
+    - each category is one contiguous row range (category index);
+    - prices inside a category are sorted, so a price range is two bisects;
+    - the inverted index maps a name/category token to a sorted array of
+      rows, so rows matching a keyword within a category and price range
+      are again a bisected slice, already in price order.
+    Top-k queries therefore stop after k hits instead of scanning the catalog.
+    Product ids are looked up by bisecting a sorted id array.
+    """
+
+    def __init__(self, rows):
+        """rows: iterable of (id, name, category, price, stock), in any order."""
+        rows = sorted(rows, key=lambda r: (r[2].lower(), float(r[3]), r[0]))
+        ids, names, categories, prices, stock = zip(*rows) if rows else ((),) * 5
+        del rows
+        self.ids = array("q", map(int, ids))
+        self.names = list(names)
+        self.prices = array("d", map(float, prices))
+        self.stock = array("l", map(int, stock))
+        self.categories = {}   # lower-case category -> (first row, end row, display name)
+        row = 0
+        for key, group in groupby(categories, key=str.lower):
+            end = row + sum(1 for _ in group)
+            self.categories[key] = (row, end, categories[row])
+            row = end
+        self.postings = {}     # token -> array of rows (ascending)
+        word_tokens = {}       # word -> its index tokens (catalog words repeat a lot)
+        for row, (name, category) in enumerate(zip(names, categories)):
+            tokens = set()
+            for word in name.split() + [category]:
+                found = word_tokens.get(word)
+                if found is None:
+                    found = word_tokens[word] = tuple(map(_singular, tokenize(word)))
+                tokens.update(found)
+            for token in tokens:
+                posting = self.postings.get(token)
+                if posting is None:
+                    posting = self.postings[token] = array("l")
+                posting.append(row)
+        self._category_keys = {}  # "laptops" / "laptop" -> "laptop"
+        for key in self.categories:
+            self._category_keys[key] = self._category_keys[_singular(key)] = key
+        order = sorted(range(len(self.ids)), key=self.ids.__getitem__)
+        self._id_rows = array("l", order)
+        self._sorted_ids = array("q", (self.ids[i] for i in order))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ----- loading -----
+    @classmethod
+    def from_dict(cls, products: dict) -> "CatalogEngine":
+        """{id: {"name", "category", "price", "stock"}}, e.g. the server's PRODUCT_DB literal."""
+        return cls((pid, p["name"], p["category"], p["price"], p["stock"]) for pid, p in products.items())
+
+    @classmethod
+    def from_sqlite(cls, path: str, table: str = CATALOG_TABLE) -> "CatalogEngine":
+        """Table columns: id, name, category, price, stock."""
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return cls(conn.execute(f"SELECT id, name, category, price, stock FROM {table}"))
+        finally:
+            conn.close()
+
+    @classmethod
+    def from_parquet(cls, path: str) -> "CatalogEngine":
+        import pandas as pd  # needs pyarrow or fastparquet
+
+        frame = pd.read_parquet(path, columns=["id", "name", "category", "price", "stock"])
+        return cls(frame.itertuples(index=False, name=None))
+
+    @classmethod
+    def load(cls, path: str, index_cache: bool = INDEX_CACHE) -> "CatalogEngine":
+        """
+        Load a .sqlite/.db or .parquet catalog. Building the indexes takes
+        seconds for a large catalog, so they are saved next to the file
+        (<path>.index) and reused while the file's size and mtime are unchanged.
+        """
+        stat = os.stat(path)
+        signature = (_INDEX_VERSION, stat.st_size, stat.st_mtime_ns)
+        cache_path = path + ".index"
+        if index_cache:
+            try:
+                with open(cache_path, "rb") as f:
+                    if pickle.load(f) == signature:
+                        engine = cls.__new__(cls)
+                        engine.__dict__.update(pickle.load(f))
+                        return engine
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+        ext = os.path.splitext(path)[1].lower()
+        engine = cls.from_parquet(path) if ext in (".parquet", ".pq") else cls.from_sqlite(path)
+        if index_cache:
+            try:
+                tmp_path = cache_path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(signature, f)
+                    pickle.dump(engine.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass  # read-only location: rebuild next time
+        return engine
+
+    # ----- lookups -----
+    def _row(self, product_id: int):
+        i = bisect_left(self._sorted_ids, product_id)
+        if i < len(self._sorted_ids) and self._sorted_ids[i] == product_id:
+            return self._id_rows[i]
+        return None
+
+    def get(self, product_id: int):
+        row = self._row(product_id)
+        return None if row is None else self._product(row)
+
+    def stock_of(self, product_id: int):
+        """Units in stock, or None for an unknown id."""
+        row = self._row(product_id)
+        return None if row is None else self.stock[row]
+
+    def _product(self, row: int) -> dict:
+        return {"id": self.ids[row], "name": self.names[row], "price": self.prices[row]}
+
+    def _price_range(self, start: int, end: int, min_price, max_price):
+        lo = start if min_price is None else bisect_left(self.prices, min_price, start, end)
+        hi = end if max_price is None else bisect_right(self.prices, max_price, lo, end)
+        return lo, hi
+
+    def _category_rows(self, start, end, keywords, in_stock, min_price, max_price):
+        """Matching rows of one category, cheapest first (a lazy iterator)."""
+        lo, hi = self._price_range(start, end, min_price, max_price)
+        if lo >= hi:
+            return iter(())
+        if keywords:
+            # drive from the keyword with the fewest rows in range; bisect the others
+            slices = []
+            for posting in keywords:
+                a, b = bisect_left(posting, lo), bisect_left(posting, hi)
+                slices.append((b - a, a, b, posting))
+            slices.sort(key=lambda s: s[0])
+            _, a, b, driver = slices[0]
+            others = [s[3] for s in slices[1:]]
+            rows = (driver[i] for i in range(a, b))
+            if others:
+                rows = (r for r in rows if all(_contains(p, r) for p in others))
+        else:
+            rows = iter(range(lo, hi))
+        if in_stock:
+            rows = (r for r in rows if self.stock[r] > 0)
+        return rows
+
+    def search(self, category: str = None, keywords=(), min_price: float = None, max_price: float = None,
+               in_stock: bool = False, k: int = 3) -> list:
+        """
+        Cheapest k products matching every filter. Keywords are matched as
+        whole name/category tokens; an unknown keyword matches nothing.
+        """
+        postings = []
+        for word in keywords:
+            posting = self.postings.get(_singular(word.lower()))
+            if posting is None:
+                return []
+            postings.append(posting)
+        if category is not None:
+            key = self._category_keys.get(category.lower())
+            entry = self.categories.get(key)
+            groups = [entry] if entry else []
+        else:
+            groups = list(self.categories.values())
+        streams = [
+            self._category_rows(start, end, postings, in_stock, min_price, max_price)
+            for start, end, _ in groups
+        ]
+        if len(streams) == 1:
+            rows = islice(streams[0], k)
+        else:
+            rows = islice(heapq.merge(*streams, key=self.prices.__getitem__), k)
+        return [self._product(r) for r in rows]
+
+    # ----- natural-language queries -----
+    def parse_query(self, query: str) -> dict:
+        """
+        Extract search filters: a category mentioned by name (singular or
+        plural), a price range ("under $500", "over 100", "between 200 and
+        400", or "cheap" alone meaning <= CATALOG_CHEAP_PRICE), "in stock",
+        and the remaining words that are catalog tokens as keywords.
+        """
+        text = query.lower()
+        filters = {"category": None, "keywords": [], "min_price": None, "max_price": None,
+                   "in_stock": "in stock" in text or "available" in text}
+        for kind, pattern in _PRICE_PATTERNS:
+            match = pattern.search(text)
+            if not match:
+                continue
+            if kind == "between":
+                filters["min_price"], filters["max_price"] = sorted(map(float, match.groups()))
+                break
+            filters["max_price" if kind == "max" else "min_price"] = float(match.group(1))
+        tokens = tokenize(text)
+        if filters["max_price"] is None and CHEAP_WORDS.intersection(tokens):
+            filters["max_price"] = CHEAP_PRICE
+        for token in tokens:
+            word = _singular(token)
+            if filters["category"] is None and token in self._category_keys:
+                filters["category"] = self._category_keys[token]
+            elif (token not in STOP_WORDS and token not in CHEAP_WORDS and not token.isdigit()
+                  and word in self.postings and word != filters["category"] and word not in filters["keywords"]):
+                filters["keywords"].append(word)
+        return filters
+
+    def recommend(self, query: str, k: int = 3) -> list:
+        """Top-k cheapest products for a free-text query (empty if it names no category or keyword)."""
+        filters = self.parse_query(query)
+        if filters["category"] is None and not filters["keywords"]:
+            return []
+        return self.search(k=k, **filters)
+
+
+def _contains(posting, row: int) -> bool:
+    i = bisect_left(posting, row)
+    return i < len(posting) and posting[i] == row
+
+
+# ----- synthetic catalogs (benchmarks) -----
+SYNTHETIC_CATEGORIES = {
+    "Laptop": (300, 3000), "Smartphone": (100, 1500), "Tablet": (80, 1200), "Monitor": (90, 2000),
+    "Headphones": (15, 600), "Keyboard": (10, 300), "Mouse": (5, 150), "Camera": (150, 4000),
+    "Printer": (60, 900), "Speaker": (20, 800), "Router": (25, 500), "Smartwatch": (50, 900),
+    "Charger": (5, 120), "Accessory": (3, 200), "Drone": (100, 3000), "Console": (200, 700),
+}
+SYNTHETIC_BRANDS = ["Acme", "Nova", "Zenith", "Orbit", "Pulse", "Vertex", "Lumen", "Apex", "Echo", "Titan"]
+SYNTHETIC_ADJECTIVES = ["Gaming", "Business", "Pro", "Ultra", "Mini", "Wireless", "Portable", "Compact",
+                        "Premium", "Budget", "Slim", "Rugged", "Smart", "Classic", "Travel", "Studio"]
+
+
+def generate_catalog(n: int, seed: int = 7):
+    """Yield n random (id, name, category, price, stock) rows."""
+    import random
+
+    rng = random.Random(seed)
+    categories = list(SYNTHETIC_CATEGORIES.items())
+    for pid in range(1, n + 1):
+        category, (low, high) = rng.choice(categories)
+        name = f"{rng.choice(SYNTHETIC_BRANDS)} {rng.choice(SYNTHETIC_ADJECTIVES)} {category} {rng.randint(100, 999)}"
+        stock = 0 if rng.random() < 0.2 else rng.randint(1, 200)
+        yield pid, name, category, round(rng.uniform(low, high), 2), stock
+
+
+def write_sqlite(path: str, rows, table: str = CATALOG_TABLE) -> None:
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, name TEXT, category TEXT, price REAL, stock INTEGER)")
+        conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?)", rows)
+    conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import statistics
+    import tempfile
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark the catalog indexes against a linear scan")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["sqlite", "parquet"], default="sqlite")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        rows = list(generate_catalog(args.products))
+        path = os.path.join(tmp, "catalog." + ("sqlite" if args.format == "sqlite" else "parquet"))
+        if args.format == "sqlite":
+            write_sqlite(path, rows)
+        else:
+            import pandas as pd
+
+            pd.DataFrame(rows, columns=["id", "name", "category", "price", "stock"]).to_parquet(path)
+        print(f"generated {len(rows):,} products in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        engine = CatalogEngine.load(path)
+        print(f"loaded and indexed from {args.format} in {time.perf_counter() - start:.1f}s "
+              f"({len(engine.categories)} categories, {len(engine.postings):,} tokens)")
+        start = time.perf_counter()
+        engine = CatalogEngine.load(path)
+        print(f"reloaded with saved indexes in {time.perf_counter() - start:.2f}s")
+
+    def linear_scan(filters, k=3):
+        # the old approach: look at every product and sort the matches
+        category = filters["category"]
+        words = [_singular(w) for w in filters["keywords"]]
+        lo = filters["min_price"] if filters["min_price"] is not None else float("-inf")
+        hi = filters["max_price"] if filters["max_price"] is not None else float("inf")
+        hits = []
+        for pid, name, cat, price, stock in rows:
+            if category and cat.lower() != category:
+                continue
+            if not lo <= price <= hi or (filters["in_stock"] and stock <= 0):
+                continue
+            if words:
+                tokens = set(map(_singular, tokenize(name + " " + cat)))
+                if not all(w in tokens for w in words):
+                    continue
+            hits.append((price, cat.lower(), pid, name))
+        return [{"id": pid, "name": name, "price": price} for price, _, pid, name in sorted(hits)[:k]]
+
+    queries = [
+        "Recommend an inexpensive laptop that is in stock.",
+        "gaming laptop under $800",
+        "wireless headphones between 50 and 100",
+        "smartphone over 1400",
+        "cheap zenith studio camera",
+        "anything from Acme under $10",
+    ]
+    print(f"\n{'query':52s} {'index p50':>10s} {'p95':>9s} {'scan':>9s}  results")
+    for query in queries:
+        filters = engine.parse_query(query)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = engine.recommend(query)
+            timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        expected = linear_scan(filters) if filters["category"] or filters["keywords"] else []
+        scan = time.perf_counter() - start
+        assert [p["price"] for p in result] == [p["price"] for p in expected], (query, result, expected)
+        q = statistics.quantiles(timings, n=100)
+        print(f"{query:52s} {q[49] * 1e6:8.1f}us {q[94] * 1e6:7.1f}us {scan * 1e3:7.0f}ms  "
+              f"{[p['name'] for p in result]}")
+
+    ids = [pid for pid, *_ in rows[:: max(1, len(rows) // 1000)]]
+    start = time.perf_counter()
+    for pid in ids:
+        engine.stock_of(pid)
+    print(f"\nstock_of: {(time.perf_counter() - start) / len(ids) * 1e6:.2f}us per lookup")
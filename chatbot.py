@@ -19,6 +19,8 @@ class State(TypedDict):
     final_answer: str                      # 최종 답변
 
 import openai
+from llm_cache import maybe_cached
+from llm_clients import get_openai_client
 from langchain_community.utilities import SerpAPIWrapper
 
 # OpenAI GPT-3.5 Turbo 모델 설정 (또는 원하는 모델로 변경 가능)
@@ -56,8 +58,9 @@ def answer_agent(state: State) -> dict:
     ]
     # OpenAI ChatCompletion 호출
     try:
-        client = openai.Client(api_key=openai_api_key)
-        completion = openai.chat.completions.create(
+        # Shared, connection-pooled client; LLM_CACHE=1 enables response caching
+        client = maybe_cached(get_openai_client(api_key=openai_api_key))
+        completion = client.chat.completions.create(
             model=MODEL_NAME,
             messages=messages
         )
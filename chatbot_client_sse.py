@@ -1,6 +1,6 @@
 # chatbot_client.py - LangGraph 클라이언트: SSE 방식 MCP 툴 연동 대화 에이전트
 import asyncio
-import aiohttp  # aiohttp를 이용하여 SSE 스트림 수신
+from sse_client import SSEError, get_sse_client  # keep-alive 세션으로 SSE 스트림 수신
 from langgraph.graph import StateGraph, START, END
 from typing import TypedDict, List
 import operator
@@ -20,25 +20,19 @@ def decide_next_step(state: State) -> dict:
     else:
         return {"route": "answer"}
 
-async def sse_invoke(tool_name: str, params: dict) -> str:
+# 서버별 keep-alive 세션을 재사용하는 SSE 클라이언트 (여러 툴 호출을 동시에 처리 가능)
+sse_client = get_sse_client("http://localhost:8000")
+
+async def sse_invoke(tool_name: str, params: dict, on_token=None) -> str:
     """
-    aiohttp를 통해 SSE 엔드포인트에 POST 요청을 보내고, 
+    공유 SSE 클라이언트로 SSE 엔드포인트에 POST 요청을 보내고,
     SSE 스트림으로 전달된 결과 문자열을 수신한다.
+    토큰 단위로 스트리밍되는 답변은 on_token(token)으로 바로 전달된다.
     """
-    url = "http://localhost:8000/sse"
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, json={"tool": tool_name, "params": params}) as resp:
-            if resp.status != 200:
-                return f"오류 발생: 상태 코드 {resp.status}"
-            result = ""
-            # SSE 스트림은 text/event-stream 형식의 데이터를 보낸다.
-            async for line in resp.content:
-                decoded_line = line.decode('utf-8').strip()
-                # "data:"로 시작하는 줄이 SSE 이벤트 데이터
-                if decoded_line.startswith("data:"):
-                    result = decoded_line[len("data:"):].strip()
-                    break
-            return result
+    try:
+        return await sse_client.call(tool_name, params, on_token=on_token)
+    except SSEError as e:
+        return f"오류 발생: 상태 코드 {e.status}"
 
 async def main():
     # [1] 검색 노드: 사용자 질문을 대상으로 웹 검색 도구 호출 (search_web)
@@ -58,7 +52,8 @@ async def main():
             answer_text = await sse_invoke("generate_answer", {
                 "query": query,
                 "search_results": search_info
-            })
+            }, on_token=lambda token: print(token, end="", flush=True))
+            print()
         except Exception as e:
             answer_text = f"답변 생성 중 오류가 발생했습니다: {e}"
         return {"final_answer": answer_text}
@@ -87,6 +82,7 @@ async def main():
     print("질문:", user_question)
     print("검색 결과 요약:", result_state.get("search_results"))
     print("답변:", result_state.get("final_answer"))
+    await sse_client.aclose()
 
 # 비동기 메인 함수 실행
 if __name__ == "__main__":
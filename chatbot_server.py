@@ -1,4 +1,5 @@
 # chatbot_server.py - MCP Server: Define Web Search and Answer Generation Tools
+from mcp_startup import lazy, ready  # first import: times the imports below with --profile-startup
 import os
 from dotenv import load_dotenv, find_dotenv
 
@@ -7,18 +8,24 @@ load_dotenv(find_dotenv())
 openai_api_key = os.getenv('OPENAI_API_KEY')
 serpapi_api_key = os.getenv('SERPAPI_API_KEY')
 
-# Set OpenAI API key
-import openai
-openai.api_key = openai_api_key
-
 # Import MCP server and tool decorator
 from mcp.server.fastmcp import FastMCP
 
-# Import SerpAPI wrapper for search (using LangChain)
-from langchain_community.utilities import SerpAPIWrapper
+# openai and langchain_community take seconds to import, so the clients are
+# built on the first tool call instead of at every server spawn.
+@lazy("openai_client")
+def get_client():
+    """Shared client; identical prompts are answered from the cache when LLM_CACHE=1"""
+    import openai
+    from llm_cache import maybe_cached
+    openai.api_key = openai_api_key
+    return maybe_cached(openai.Client(api_key=openai_api_key))
 
-# Initialize SerpAPI search tool (uses SERPAPI_API_KEY from env)
-search_tool_api = SerpAPIWrapper()
+@lazy("serpapi")
+def get_search_tool():
+    """SerpAPI search tool via LangChain (uses SERPAPI_API_KEY from env)"""
+    from langchain_community.utilities import SerpAPIWrapper
+    return SerpAPIWrapper()
 
 # Create MCP server instance (service name: "ChatbotService")
 mcp = FastMCP("ChatbotService")
@@ -28,7 +35,7 @@ mcp = FastMCP("ChatbotService")
 def search_web(query: str) -> str:
     """Perform a web search for the given query and return results as a string."""
     try:
-        result = search_tool_api.run(query)
+        result = get_search_tool().run(query)
     except Exception as e:
         result = f"(Error occurred during search: {e})"
     return result
@@ -56,7 +63,7 @@ def generate_answer(query: str, search_results: str) -> str:
     ]
     try:
         # Call OpenAI ChatCompletion API to generate the answer (default model: gpt-3.5-turbo)
-        completion = openai.chat.completions.create(
+        completion = get_client().chat.completions.create(
             model="gpt-3.5-turbo",
             messages=messages
         )
@@ -66,5 +73,6 @@ def generate_answer(query: str, search_results: str) -> str:
     return answer_text
 
 if __name__ == "__main__":
+    ready("ChatbotService")
     # Run MCP server (using stdio transport)
     mcp.run(transport="stdio")
@@ -1,4 +1,5 @@
 # chatbot_server_sse.py - MCP Server: Define Web Search and Answer Generation Tools via SSE
+from mcp_startup import lazy, ready  # first import: times the imports below with --profile-startup
 import os
 from dotenv import load_dotenv, find_dotenv
 
@@ -7,16 +8,24 @@ load_dotenv(find_dotenv())
 openai_api_key = os.getenv('OPENAI_API_KEY')
 serpapi_api_key = os.getenv('SERPAPI_API_KEY')
 
-# Set OpenAI API key
-import openai
-openai.api_key = openai_api_key
-
-# Import FastMCP and SerpAPIWrapper
+# Import FastMCP
 from mcp.server.fastmcp import FastMCP
-from langchain_community.utilities import SerpAPIWrapper
 
-# Initialize SerpAPI search wrapper
-search_tool_api = SerpAPIWrapper()
+# openai and langchain_community take seconds to import, so the clients are
+# built on the first tool call instead of at server start.
+@lazy("openai_client")
+def get_client():
+    """Shared client; identical prompts are answered from the cache when LLM_CACHE=1"""
+    import openai
+    from llm_cache import maybe_cached
+    openai.api_key = openai_api_key
+    return maybe_cached(openai.Client(api_key=openai_api_key))
+
+@lazy("serpapi")
+def get_search_tool():
+    """SerpAPI search wrapper via LangChain (uses SERPAPI_API_KEY from env)"""
+    from langchain_community.utilities import SerpAPIWrapper
+    return SerpAPIWrapper()
 
 # Create MCP server instance (service name: ChatbotService)
 mcp = FastMCP("ChatbotService")
@@ -26,15 +35,15 @@ mcp = FastMCP("ChatbotService")
 def search_web(query: str) -> str:
     """Perform a web search for the given query and return the results as a string."""
     try:
-        result = search_tool_api.run(query)
+        result = get_search_tool().run(query)
     except Exception as e:
         result = f"(Error occurred during search: {e})"
     return result
 
-# [2] Register answer generation tool
-@mcp.tool()
-def generate_answer(query: str, search_results: str) -> str:
-    """Generate an answer using the user's query and search data."""
+ANSWER_MODEL = "gpt-3.5-turbo"
+
+def build_messages(query: str, search_results: str) -> list:
+    """Chat messages for answering the query with optional search data."""
     if search_results and search_results.strip():
         user_content = (
             f"User question: {query}\n\n"
@@ -47,20 +56,39 @@ def generate_answer(query: str, search_results: str) -> str:
         "You are an intelligent assistant that answers questions through multiple steps. "
         "Please respond as accurately and concisely as possible."
     )
-    messages = [
+    return [
         {"role": "system", "content": system_content},
         {"role": "user", "content": user_content}
     ]
+
+# [2] Register answer generation tool
+@mcp.tool()
+def generate_answer(query: str, search_results: str) -> str:
+    """Generate an answer using the user's query and search data."""
     try:
-        completion = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=messages
+        completion = get_client().chat.completions.create(
+            model=ANSWER_MODEL,
+            messages=build_messages(query, search_results)
         )
         answer_text = completion.choices[0].message.content
     except Exception as e:
         answer_text = f"An error occurred while generating the answer: {e}"
     return answer_text
 
+async def stream_answer(query: str, search_results: str):
+    """Yield answer tokens as the model produces them."""
+    from llm_cache import maybe_cached
+    from llm_clients import get_async_openai_client
+    aclient = maybe_cached(get_async_openai_client(api_key=openai_api_key))
+    stream = await aclient.chat.completions.create(
+        model=ANSWER_MODEL,
+        messages=build_messages(query, search_results),
+        stream=True,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
 # --- Configure SSE server (using FastAPI) ---
 from fastapi import FastAPI, Request, HTTPException
 from sse_starlette.sse import EventSourceResponse
@@ -68,34 +96,48 @@ import asyncio
 
 app = FastAPI()
 
+# Blocking tools run in a worker thread so the event loop keeps serving other requests
+BLOCKING_TOOLS = {"search_web": search_web, "generate_answer": generate_answer}
+
 @app.post("/sse")
 async def sse_invoke(request: Request):
     """
     Receive a JSON POST from the client containing the tool name and parameters,
-    invoke the corresponding MCP tool, and send the result as an SSE event.
+    invoke the corresponding MCP tool, and stream the result as SSE events:
+      event "token"  - one piece of a streamed answer (generate_answer only)
+      event "result" - the complete result text
+      event "error"  - the tool failed; data is the error message
+      event "done"   - end of the stream
+    Multi-line data is sent as one data: line per text line, as the SSE spec requires.
     """
     payload = await request.json()
     tool_name = payload.get("tool")
     params = payload.get("params", {})
     if not tool_name:
         raise HTTPException(status_code=400, detail="tool parameter is required")
-    
-    # Invoke MCP tool based on tool_name (additional tools can be registered as needed)
-    if tool_name == "search_web":
-        result = search_web(**params)
-    elif tool_name == "generate_answer":
-        result = generate_answer(**params)
-    else:
-        result = f"Unknown tool: {tool_name}"
-    
+    if tool_name not in BLOCKING_TOOLS:
+        raise HTTPException(status_code=404, detail=f"Unknown tool: {tool_name}")
+
     async def event_generator():
-        # Send one line in 'data: <content>' format according to SSE protocol, then end
-        yield f"data: {result}\n\n"
-        await asyncio.sleep(0.1)
-    
+        try:
+            if tool_name == "generate_answer":
+                # Stream LLM tokens as separate events, then the full answer
+                parts = []
+                async for token in stream_answer(**params):
+                    parts.append(token)
+                    yield {"event": "token", "data": token}
+                yield {"event": "result", "data": "".join(parts)}
+            else:
+                result = await asyncio.to_thread(BLOCKING_TOOLS[tool_name], **params)
+                yield {"event": "result", "data": result}
+        except Exception as e:
+            yield {"event": "error", "data": f"An error occurred while running {tool_name}: {e}"}
+        yield {"event": "done", "data": ""}
+
     return EventSourceResponse(event_generator())
 
 # Run FastAPI server (using uvicorn)
 if __name__ == "__main__":
     import uvicorn
+    ready("ChatbotService (SSE)")
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,5 +1,5 @@
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
+from delta_checkpointer import DeltaCheckpointSaver
 from typing import Annotated
 from typing_extensions import TypedDict
 from operator import add
@@ -22,7 +22,8 @@ workflow.add_edge(START, "node_a")
 workflow.add_edge("node_a", "node_b")
 workflow.add_edge("node_b", END)
 
-checkpointer = MemorySaver()
+# list channels (bar) are stored as deltas; CHECKPOINT_KEEP_LAST / CHECKPOINT_MAX_AGE_HOURS prune old history
+checkpointer = DeltaCheckpointSaver()
 graph = workflow.compile(checkpointer=checkpointer)
 
 config = {"configurable": {"thread_id": "1"}}
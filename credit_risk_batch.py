@@ -0,0 +1,94 @@
+# credit_risk_batch.py - Batched multi-ticker credit-risk screening (vectorized finance.py rules)
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from finance import NEEDED_KEYS, AnalysisState, fetch_financial_data, risk_analyzer
+
+# Same thresholds as finance.risk_analyzer
+HIGH_DEBT, ELEVATED_DEBT, SEVERE_DEBT = 0.6, 0.4, 0.8
+LOW_CURRENT, FAIR_CURRENT, SEVERE_CURRENT = 1.0, 1.5, 0.8
+WEAK_MARGIN, FAIR_MARGIN = 0.05, 0.15
+
+TEXT_COLUMNS = ['financialCurrency']
+NUMERIC_COLUMNS = [key for key in NEEDED_KEYS if key not in TEXT_COLUMNS]
+
+
+def fetch_many(tickers: list, fetcher=fetch_financial_data, max_workers: int = 16) -> dict:
+    """Fetch fundamentals for many tickers concurrently (yfinance calls are I/O bound)."""
+    tickers = list(dict.fromkeys(tickers))  # drop duplicates, keep order
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(tickers, pool.map(fetcher, tickers)))
+
+
+def build_table(data_by_ticker: dict) -> pd.DataFrame:
+    """Columnar table: one row per ticker, one column per NEEDED_KEYS metric (NaN when missing)."""
+    table = pd.DataFrame(list(data_by_ticker.values()), index=list(data_by_ticker)).reindex(columns=NEEDED_KEYS)
+    table[NUMERIC_COLUMNS] = table[NUMERIC_COLUMNS].apply(pd.to_numeric, errors='coerce')
+    table.index.name = 'ticker'
+    return table
+
+
+def classify(table: pd.DataFrame) -> pd.DataFrame:
+    """Leverage, liquidity, profitability and overall risk level for every row at once."""
+    debt = table['debtToEquity'].to_numpy(dtype=float)
+    current = table['currentRatio'].to_numpy(dtype=float)
+    margin = table['profitMargins'].to_numpy(dtype=float)
+
+    # Comparisons with NaN are False, matching the `is not None` guards of risk_analyzer
+    with np.errstate(invalid='ignore'):
+        high_debt = debt > HIGH_DEBT
+        low_liquidity = current < LOW_CURRENT
+        weak_profit = margin < WEAK_MARGIN
+        severe = (debt > SEVERE_DEBT) | (current < SEVERE_CURRENT) | (margin < 0)
+
+        leverage = np.select(
+            [np.isnan(debt), high_debt, debt > ELEVATED_DEBT], ['N/A', '매우 높음', '다소 높음'], '낮음'
+        )
+        liquidity = np.select(
+            [np.isnan(current), low_liquidity, current < FAIR_CURRENT], ['N/A', '부족', '다소 낮음'], '양호'
+        )
+        profitability = np.select(
+            [np.isnan(margin), margin < 0, weak_profit, margin < FAIR_MARGIN],
+            ['N/A', '마이너스', '낮음', '보통'], '매우 우수'
+        )
+
+    reason_count = high_debt.astype(int) + low_liquidity + weak_profit
+    risk_level = np.select([severe | (reason_count >= 2), reason_count == 0], ['높음', '낮음'], '보통')
+
+    reasons = np.full(len(table), '', dtype=object)
+    for flag, label in ((high_debt, '높은 부채비율'), (low_liquidity, '낮은 유동비율'), (weak_profit, '취약한 수익성')):
+        reasons = np.where(flag, np.where(reasons == '', label, reasons + ', ' + label), reasons)
+
+    result = table.copy()
+    result['leverage'] = leverage
+    result['liquidity'] = liquidity
+    result['profitability'] = profitability
+    result['risk_reasons'] = reasons
+    result['risk_level'] = risk_level
+    # Rows without any data cannot be rated (risk_analyzer reports "no data" for them)
+    no_data = table[NUMERIC_COLUMNS].isna().all(axis=1).to_numpy()
+    result.loc[no_data, 'risk_level'] = 'N/A'
+    return result
+
+
+def analyze_portfolio(tickers: list, fetcher=fetch_financial_data, max_workers: int = 16) -> pd.DataFrame:
+    """Fetch, tabulate and classify a whole portfolio; returns one result table."""
+    return classify(build_table(fetch_many(tickers, fetcher, max_workers)))
+
+
+def row_summary(result: pd.DataFrame, ticker: str, company: str = None) -> str:
+    """The per-company text summary of finance.risk_analyzer for one row of the result table."""
+    row = result.loc[ticker, NEEDED_KEYS]
+    financial_data = {key: value for key, value in row.items() if not pd.isna(value)}
+    state = AnalysisState(company=company or ticker, ticker=ticker, financial_data=financial_data)
+    return risk_analyzer(state).analysis_summary
+
+
+if __name__ == "__main__":
+    portfolio = ["AAPL", "GOOGL", "MSFT", "005930.KS", "TSLA", "F", "INTC"]
+    result = analyze_portfolio(portfolio)
+    print(result[['debtToEquity', 'currentRatio', 'profitMargins',
+                  'leverage', 'liquidity', 'profitability', 'risk_level', 'risk_reasons']])
+    print("\n[AAPL]\n" + row_summary(result, "AAPL"))
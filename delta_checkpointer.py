@@ -0,0 +1,374 @@
+# delta_checkpointer.py - MemorySaver that stores list channels as deltas, with retention and background compaction
+#
+# A checkpoint normally stores the full value of every channel that changed,
+# so a thread whose `messages` (or any `Annotated[list, add]` accumulator)
+# grows by one item per step stores 1 + 2 + ... + n items: quadratic in the
+# conversation length. DeltaCheckpointSaver stores a list value that extends
+# the previous version of the same channel as that version plus the appended
+# items, and writes a full snapshot once a delta chain is long enough and the
+# value has grown enough since the last snapshot (snapshots then grow
+# geometrically, so the total stays linear). get_state, get_state_history and
+# update_state work as with MemorySaver.
+#
+#     from delta_checkpointer import DeltaCheckpointSaver
+#     graph = builder.compile(checkpointer=DeltaCheckpointSaver(keep_last=100))
+#
+# Retention (keep the last N checkpoints and/or the last T hours of a thread)
+# is applied by compact(), which a background thread runs every
+# CHECKPOINT_COMPACT_INTERVAL seconds. With `path` (CHECKPOINT_DELTA_PATH)
+# the store is loaded from and saved to a pickle file on compaction and close.
+import os
+import time
+import pickle
+import atexit
+import threading
+import weakref
+from datetime import datetime, timedelta, timezone
+
+from langgraph.checkpoint.memory import MemorySaver
+
+SNAPSHOT_EVERY = int(os.getenv("DELTA_SNAPSHOT_EVERY", "20"))          # min deltas between full snapshots
+SNAPSHOT_GROWTH = float(os.getenv("DELTA_SNAPSHOT_GROWTH", "1.0"))     # ...and min growth since the last one (1.0 = doubled)
+KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", "0"))                # checkpoints kept per thread, 0 = all
+MAX_AGE_HOURS = float(os.getenv("CHECKPOINT_MAX_AGE_HOURS", "0"))      # older checkpoints are pruned, 0 = never
+COMPACT_INTERVAL = float(os.getenv("CHECKPOINT_COMPACT_INTERVAL", "60"))  # seconds, 0 = no background thread
+DELTA_PATH = os.getenv("CHECKPOINT_DELTA_PATH")                        # pickle file; unset keeps it in memory only
+
+DELTA = "delta"
+FILE_VERSION = 1
+
+_open_savers = weakref.WeakSet()
+
+
+class DeltaCheckpointSaver(MemorySaver):
+    """
+    MemorySaver with delta-encoded list channels and retention.
+
+    A blob stored as a delta has the type tag "delta+<serde type>" and holds
+    [base version, depth, appended items]; reading it walks back to the
+    nearest full snapshot. The latest value of every channel is kept (as a
+    shallow copy) to detect appends without deserializing, and answers reads
+    of the latest version directly.
+
+    compact() prunes checkpoints outside the retention policy together with
+    their pending writes and blobs. A kept delta whose base is pruned is
+    rewritten as a full snapshot first. The latest checkpoint of a thread is
+    always kept.
+    """
+
+    def __init__(self, *, keep_last: int = KEEP_LAST, max_age_hours: float = MAX_AGE_HOURS,
+                 snapshot_every: int = SNAPSHOT_EVERY, snapshot_growth: float = SNAPSHOT_GROWTH,
+                 compact_interval: float = COMPACT_INTERVAL, path: str = DELTA_PATH, serde=None):
+        super().__init__(serde=serde)
+        self.keep_last = keep_last
+        self.max_age_hours = max_age_hours
+        self.snapshot_every = snapshot_every
+        self.snapshot_growth = snapshot_growth
+        self.path = path
+        self._lock = threading.RLock()
+        self._latest = {}      # (thread_id, ns, channel) -> (version, value copy, depth, snapshot length)
+        self._dirty = set()    # (thread_id, ns) written since the last compaction
+        self._unsaved = False
+        self.pruned = 0        # checkpoints removed by compaction
+        if path and os.path.exists(path):
+            self._load(path)
+        self._stop = threading.Event()
+        self._compactor = None
+        if compact_interval > 0 and (keep_last > 0 or max_age_hours > 0 or path):
+            self._compactor = threading.Thread(target=self._compact_loop, args=(compact_interval,),
+                                               name="checkpoint-compactor", daemon=True)
+            self._compactor.start()
+        _open_savers.add(self)
+
+    # ----- writes -----
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        values = checkpoint["channel_values"]
+        with self._lock:
+            # let MemorySaver store the checkpoint and the channels that can't be delta-encoded
+            plain = {k: v for k, v in new_versions.items() if type(values.get(k)) is not list}
+            next_config = super().put(config, checkpoint, metadata, plain)
+            for channel, version in new_versions.items():
+                if channel not in plain:
+                    self._put_list(thread_id, checkpoint_ns, channel, version, values[channel])
+            self._dirty.add((thread_id, checkpoint_ns))
+            self._unsaved = True
+        return next_config
+
+    def _put_list(self, thread_id, checkpoint_ns, channel, version, value: list) -> None:
+        key = (thread_id, checkpoint_ns, channel, version)
+        latest = self._latest.get((thread_id, checkpoint_ns, channel))
+        if latest is not None:
+            base_version, base_value, depth, snapshot_len = latest
+            base_key = (thread_id, checkpoint_ns, channel, base_version)
+            closes_chain = (depth + 1 >= self.snapshot_every
+                            and len(value) >= snapshot_len * (1 + self.snapshot_growth))
+            if (not closes_chain and base_key in self.blobs and len(value) >= len(base_value)
+                    and all(a is b or a == b for a, b in zip(base_value, value))):
+                type_, data = self.serde.dumps_typed([base_version, depth + 1, value[len(base_value):]])
+                self.blobs[key] = (f"{DELTA}+{type_}", data)
+                self._latest[key[:3]] = (version, list(value), depth + 1, snapshot_len)
+                return
+        self.blobs[key] = self.serde.dumps_typed(value)
+        self._latest[key[:3]] = (version, list(value), 0, len(value))
+
+    # ----- reads -----
+    def _load_blobs(self, thread_id, checkpoint_ns, versions):
+        result = {}
+        with self._lock:
+            for channel, version in versions.items():
+                stored = self.blobs.get((thread_id, checkpoint_ns, channel, version))
+                if stored is None or stored[0] == "empty":
+                    continue
+                result[channel] = self._value((thread_id, checkpoint_ns, channel, version))
+        return result
+
+    def _value(self, key):
+        """Value of one blob, rebuilt from its chain of deltas."""
+        thread_id, checkpoint_ns, channel, version = key
+        suffixes = []
+        while True:
+            latest = self._latest.get(key[:3])
+            if latest is not None and latest[0] == version:
+                value = list(latest[1])
+                break
+            type_, data = self.blobs[key]
+            if not type_.startswith(DELTA + "+"):
+                value = self.serde.loads_typed((type_, data))
+                break
+            version, _, items = self.serde.loads_typed((type_[len(DELTA) + 1:], data))
+            suffixes.append(items)
+            key = (thread_id, checkpoint_ns, channel, version)
+        for items in reversed(suffixes):
+            value.extend(items)
+        return value
+
+    def _is_delta(self, key) -> bool:
+        return self.blobs[key][0].startswith(DELTA + "+")
+
+    def get_tuple(self, config):
+        with self._lock:
+            return super().get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self._lock:  # materialized, so compaction can't change the dicts mid-iteration
+            items = list(super().list(config, filter=filter, before=before, limit=limit))
+        yield from items
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            self._unsaved = True
+
+    def delete_thread(self, thread_id):
+        with self._lock:
+            super().delete_thread(thread_id)
+            for key in [k for k in self._latest if k[0] == thread_id]:
+                del self._latest[key]
+            self._dirty = {k for k in self._dirty if k[0] != thread_id}
+            self._unsaved = True
+
+    # ----- retention and compaction -----
+    def compact(self) -> int:
+        """Apply the retention policy to the threads written since the last run; returns checkpoints pruned."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            pruned = sum(self._prune(thread_id, checkpoint_ns) for thread_id, checkpoint_ns in dirty)
+            self.pruned += pruned
+            if self.path and self._unsaved:
+                self.save(self.path)
+        return pruned
+
+    def _prune(self, thread_id, checkpoint_ns) -> int:
+        checkpoints = self.storage.get(thread_id, {}).get(checkpoint_ns)
+        if not checkpoints:
+            return 0
+        ids = sorted(checkpoints)  # checkpoint ids sort by creation time
+        drop = set(ids[:-self.keep_last]) if self.keep_last > 0 else set()
+        if self.max_age_hours > 0:
+            cutoff = datetime.now(timezone.utc) - timedelta(hours=self.max_age_hours)
+            for checkpoint_id in ids[:-1]:
+                ts = self.serde.loads_typed(checkpoints[checkpoint_id][0]).get("ts")
+                if ts and datetime.fromisoformat(ts) < cutoff:
+                    drop.add(checkpoint_id)
+        drop.discard(ids[-1])
+        if not drop:
+            return 0
+
+        referenced = set()
+        for checkpoint_id in ids:
+            if checkpoint_id not in drop:
+                versions = self.serde.loads_typed(checkpoints[checkpoint_id][0])["channel_versions"]
+                referenced.update((thread_id, checkpoint_ns, ch, v) for ch, v in versions.items())
+        referenced &= self.blobs.keys()
+        # a kept delta whose base goes away becomes a full snapshot
+        rebased = {}
+        for key in referenced:
+            if self._is_delta(key):
+                type_, data = self.blobs[key]
+                base_version = self.serde.loads_typed((type_[len(DELTA) + 1:], data))[0]
+                if (thread_id, checkpoint_ns, key[2], base_version) not in referenced:
+                    rebased[key] = self._value(key)
+        for key, value in rebased.items():
+            self.blobs[key] = self.serde.dumps_typed(value)
+            latest = self._latest.get(key[:3])
+            if latest is not None and latest[0] == key[3]:
+                self._latest[key[:3]] = (key[3], latest[1], 0, len(value))
+        for key, latest in list(self._latest.items()):
+            if key[:2] == (thread_id, checkpoint_ns) and (*key, latest[0]) not in referenced:
+                del self._latest[key]  # its version is pruned: the next put stores a full snapshot
+
+        for checkpoint_id in drop:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        for key in [k for k in self.blobs if k[:2] == (thread_id, checkpoint_ns) and k not in referenced]:
+            del self.blobs[key]
+        self._unsaved = True
+        return len(drop)
+
+    def _compact_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"[checkpoint] compaction failed: {e}")
+
+    def close(self) -> None:
+        """Stop the compactor and run a last compaction (which saves to `path`)."""
+        self._stop.set()
+        self.compact()
+
+    # ----- persistence -----
+    def save(self, path: str) -> None:
+        """Write the store to `path` atomically."""
+        with self._lock:
+            data = {
+                "version": FILE_VERSION,
+                "storage": {t: {ns: dict(cps) for ns, cps in nss.items()} for t, nss in self.storage.items()},
+                "writes": {k: dict(v) for k, v in self.writes.items()},
+                "blobs": dict(self.blobs),
+            }
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            self._unsaved = False
+
+    def _load(self, path: str) -> None:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != FILE_VERSION:
+            raise ValueError(f"{path}: unsupported checkpoint file version {data.get('version')}")
+        for thread_id, namespaces in data["storage"].items():
+            for checkpoint_ns, checkpoints in namespaces.items():
+                self.storage[thread_id][checkpoint_ns].update(checkpoints)
+        for key, writes in data["writes"].items():
+            self.writes[key].update(writes)
+        self.blobs.update(data["blobs"])
+
+    # ----- stats -----
+    def stats(self) -> dict:
+        """Checkpoint, blob and byte counts of the store."""
+        with self._lock:
+            deltas = [v for v in self.blobs.values() if v[0].startswith(DELTA + "+")]
+            return {
+                "checkpoints": sum(len(cps) for nss in self.storage.values() for cps in nss.values()),
+                "blobs": len(self.blobs),
+                "delta_blobs": len(deltas),
+                "blob_bytes": sum(len(v[1]) for v in self.blobs.values()),
+                "delta_bytes": sum(len(v[1]) for v in deltas),
+                "checkpoint_bytes": sum(len(c[0][1]) + len(c[1][1]) for nss in self.storage.values()
+                                        for cps in nss.values() for c in cps.values()),
+                "write_bytes": sum(len(w[2][1]) for ws in self.writes.values() for w in ws.values()),
+                "pruned": self.pruned,
+            }
+
+
+@atexit.register
+def _close_all() -> None:
+    for saver in list(_open_savers):
+        if saver.path:
+            saver.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    from operator import add
+    from typing import Annotated
+    from typing_extensions import TypedDict
+
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langgraph.graph import StateGraph, START, END
+    from langgraph.graph.message import add_messages
+
+    parser = argparse.ArgumentParser(description="Checkpoint storage growth: MemorySaver vs delta storage")
+    parser.add_argument("--turns", type=int, default=400, help="conversation turns on one thread")
+    parser.add_argument("--keep-last", type=int, default=50)
+    args = parser.parse_args()
+
+    class State(TypedDict):
+        messages: Annotated[list, add_messages]
+        bar: Annotated[list[str], add]
+
+    def chatbot(state: State) -> dict:
+        turn = len(state["messages"]) // 2
+        return {"messages": [AIMessage(f"answer {turn}: " + "lorem ipsum " * 30)], "bar": [f"turn {turn}"]}
+
+    builder = StateGraph(State)
+    builder.add_node("chatbot", chatbot)
+    builder.add_edge(START, "chatbot")
+    builder.add_edge("chatbot", END)
+
+    def stored_bytes(saver) -> int:
+        blobs = sum(len(v[1]) for v in saver.blobs.values())
+        checkpoints = sum(len(c[0][1]) + len(c[1][1]) for nss in saver.storage.values()
+                          for cps in nss.values() for c in cps.values())
+        writes = sum(len(w[2][1]) for ws in saver.writes.values() for w in ws.values())
+        return blobs + checkpoints + writes
+
+    def run(label, saver):
+        graph = builder.compile(checkpointer=saver)
+        config = {"configurable": {"thread_id": "long"}}
+        marks = {args.turns // 4, args.turns // 2, args.turns}
+        start = time.perf_counter()
+        sizes = []
+        for turn in range(1, args.turns + 1):
+            graph.invoke({"messages": [HumanMessage(f"question {turn}")]}, config)
+            if turn in marks:
+                if isinstance(saver, DeltaCheckpointSaver):
+                    saver.compact()
+                sizes.append(f"{turn}: {stored_bytes(saver) / 1e6:6.2f} MB")
+        elapsed = time.perf_counter() - start
+        state = graph.get_state(config)
+        history = len(list(graph.get_state_history(config)))
+        print(f"  {label:34s} {elapsed / args.turns * 1000:6.2f} ms/turn  {'  '.join(sizes)}  "
+              f"({len(state.values['messages'])} messages, {history} checkpoints)")
+        return graph, state
+
+    print(f"One thread, {args.turns} turns (stored bytes after n turns):")
+    _, reference = run("MemorySaver", MemorySaver())
+    graph, state = run("DeltaCheckpointSaver", DeltaCheckpointSaver(compact_interval=0))
+    assert [m.content for m in state.values["messages"]] == [m.content for m in reference.values["messages"]]
+    assert state.values["bar"] == reference.values["bar"]
+    run(f"DeltaCheckpointSaver keep_last={args.keep_last}",
+        DeltaCheckpointSaver(keep_last=args.keep_last, compact_interval=0))
+
+    # history and time travel read the same values as MemorySaver
+    config = {"configurable": {"thread_id": "long"}}
+    for snapshot in list(graph.get_state_history(config))[::37]:
+        assert len(snapshot.values["bar"]) == len(snapshot.values["messages"]) // 2
+    graph.update_state(config, {"bar": ["edited"]})
+    assert graph.get_state(config).values["bar"][-1] == "edited"
+    print("history and update_state: ok")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "checkpoints.pkl")
+        saver = DeltaCheckpointSaver(path=path, compact_interval=0)
+        run("DeltaCheckpointSaver, saved to disk", saver)
+        saver.close()
+        size = os.path.getsize(path)
+        reopened = builder.compile(checkpointer=DeltaCheckpointSaver(path=path, compact_interval=0))
+        messages = reopened.get_state(config).values["messages"]
+        print(f"file {size / 1e6:.2f} MB, reopened with {len(messages)} messages")
@@ -11,9 +11,9 @@ import openai
 openai.api_key = openai_api_key
 
 import asyncio
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp import StdioServerParameters
+from mcp_session_pool import get_pool
+from batch_tools import batch_stats, with_batching
 from langgraph.prebuilt import create_react_agent
 from langchain_openai import ChatOpenAI  # OpenAI GPT-4 model (LangChain OpenAI wrapper)
 from utils import show_graph
@@ -34,23 +34,23 @@ async def main():
         command=python_command,
         args=[server_script]  # Path to MCP server script
     )
-    # 2. Connect to MCP server as STDIO client and start session
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            # 3. Initialize MCP session (exchange initial metadata with server)
-            await session.initialize()
-            # 4. Load list of available tools from the server
-            tools = await load_mcp_tools(session)
-            # 5. Create a LangGraph agent with LLM model and tools
-            model = ChatOpenAI(model="gpt-4")  # OpenAI GPT-4 model instance (requires API key)
-            agent = create_react_agent(model, tools)
-            show_graph(agent)
-            # 6. Handle user query using the agent
-            query = {"messages": "Recommend an inexpensive laptop that is in stock." }
-            result = await agent.ainvoke(query)
-            # 7. Print the results
-            for message in result["messages"]:
-                print(message.content)
+    # 2-4. Register the server with the shared pool and load its tools
+    #      (session initialization happens once; the process stays warm for later queries)
+    pool = get_pool()
+    pool.register("ecommerce", server_params)
+    #    Parallel check_inventory calls of one agent step go to the server as one check_inventory_many request
+    tools = with_batching(await pool.get_tools("ecommerce"))
+    # 5. Create a LangGraph agent with LLM model and tools
+    model = ChatOpenAI(model="gpt-4")  # OpenAI GPT-4 model instance (requires API key)
+    agent = create_react_agent(model, tools)
+    show_graph(agent)
+    # 6. Handle user query using the agent
+    query = {"messages": "Recommend an inexpensive laptop that is in stock." }
+    result = await agent.ainvoke(query)
+    # 7. Print the results
+    for message in result["messages"]:
+        print(message.content)
+    print("batched tool requests (requests, items):", batch_stats(tools))
 
 # Execute the async function
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 # ecommerce_service_server.py - MCP Server Setup (Product Recommendation & Inventory Check Service)
+from mcp_startup import lazy, ready  # first import: times the imports below with --profile-startup
 from mcp.server.fastmcp import FastMCP
+from catalog_engine import CATALOG_PATH, CatalogEngine
 
 # Create an MCP server named "ECommerceService"
 mcp = FastMCP("ECommerceService")
@@ -12,40 +14,47 @@ PRODUCT_DB = {
     4: {"name": "Gaming Mouse Z",  "category": "Accessory",   "price": 50,  "stock": 100}
 }
 
+@lazy("catalog")
+def get_catalog() -> CatalogEngine:
+    """Indexed catalog from CATALOG_PATH (SQLite or Parquet), or the demo PRODUCT_DB above."""
+    if CATALOG_PATH:
+        return CatalogEngine.load(CATALOG_PATH)
+    return CatalogEngine.from_dict(PRODUCT_DB)
+
 @mcp.tool()
 def recommend_products(query: str) -> list:
     """Return a list of products recommended based on the user's query."""
-    results = []
-    query_lower = query.lower()
-    # Example filtering: "laptop", "cheap", etc.
-    for pid, info in PRODUCT_DB.items():
-        name     = info["name"]
-        price    = info["price"]
-        category = info["category"].lower()
-        # Match category keywords
-        if ("laptop" in query_lower and category == "laptop") or \
-           ("smartphone" in query_lower and category == "smartphone"):
-            # Price condition: if "cheap" or "under" mentioned, filter by price <=1000
-            if "cheap" in query_lower or "affordable" in query_lower or "under" in query_lower:
-                if price <= 1000:
-                    results.append({"id": pid, "name": name, "price": price})
-            else:
-                results.append({"id": pid, "name": name, "price": price})
-    # Return up to 3 recommendations
-    return results[:3]
+    # Category ("laptop"), price ("cheap", "under $800", "between 200 and 400"),
+    # "in stock" and name keywords ("gaming") are answered from the indexes, cheapest first
+    return get_catalog().recommend(query, k=3)
+
+def inventory_status(stock: int) -> str:
+    return f"{stock} items in stock" if stock > 0 else "Out of stock"
 
 @mcp.tool()
 def check_inventory(product_id: int) -> str:
     """Return the inventory status for the given product ID."""
-    product = PRODUCT_DB.get(product_id)
-    if product is None:
+    stock = get_catalog().stock_of(product_id)
+    if stock is None:
         return f"Product ID {product_id} not found."
-    stock = product["stock"]
-    if stock > 0:
-        return f"{stock} items in stock"
-    else:
-        return "Out of stock"
+    return inventory_status(stock)
+
+# Batched variant: one tool call (and one LLM step) for many products
+@mcp.tool()
+def check_inventory_many(product_ids: list[int]) -> list[dict]:
+    """Return the inventory status of several products at once. Use this instead of repeated check_inventory calls.
+    One result per ID, in order: {"product_id", "ok": true, "stock", "status"} or {"product_id", "ok": false, "error"}."""
+    catalog = get_catalog()
+    results = []
+    for product_id in product_ids:
+        stock = catalog.stock_of(product_id)
+        if stock is None:
+            results.append({"product_id": product_id, "ok": False, "error": f"Product ID {product_id} not found."})
+        else:
+            results.append({"product_id": product_id, "ok": True, "stock": stock, "status": inventory_status(stock)})
+    return results
 
 if __name__ == "__main__":
+    ready("ECommerceService")
     # Run MCP server over stdio (prepare for client communication in the same process)
     mcp.run(transport="stdio")
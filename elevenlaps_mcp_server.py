@@ -1,4 +1,5 @@
 # elevenlabs_mcp_server.py
+from mcp_startup import ready  # first import: times the imports below with --profile-startup
 from mcp.server.fastmcp import FastMCP
 import os, requests
 from dotenv import load_dotenv, find_dotenv
@@ -64,4 +65,5 @@ def synthesize_speech(text: str, voice_id: str = None) -> dict:
         return {"status": "error", "data": data}
     
 if __name__ == "__main__":
+    ready("ElevenLabsAPI")
     mcp.run(transport="stdio")
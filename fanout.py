@@ -0,0 +1,103 @@
+# fanout.py - Bounded-concurrency fan-out for async LangGraph nodes
+import math
+import asyncio
+from contextlib import aclosing
+
+_DONE = object()
+
+
+async def fan_out(items, worker, concurrency: int = 8, timeout: float = None):
+    """
+    Run `await worker(item)` for every item with at most `concurrency` tasks in
+    flight, yielding (item, result) in completion order. A failure or timeout
+    yields the exception as the result instead of aborting the others.
+
+    New tasks start only as running ones finish, so `items` may be any
+    iterable. Use `async with aclosing(fan_out(...))` when the loop may exit
+    early; closing the generator cancels the tasks still running.
+    """
+    pending_items = iter(items)
+    running = {}  # task -> item
+
+    async def run_one(item):
+        if timeout is None:
+            return await worker(item)
+        return await asyncio.wait_for(worker(item), timeout)
+
+    def fill():
+        while len(running) < concurrency:
+            item = next(pending_items, _DONE)
+            if item is _DONE:
+                return
+            running[asyncio.ensure_future(run_one(item))] = item
+
+    try:
+        fill()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            finished = []
+            for task in done:
+                item = running.pop(task)
+                try:
+                    finished.append((item, task.result()))
+                except Exception as e:  # includes asyncio.TimeoutError
+                    finished.append((item, e))
+            # Keep the pool busy while the consumer handles these results
+            fill()
+            for pair in finished:
+                yield pair
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+
+def quorum_size(total: int, fraction: float) -> int:
+    """Number of items that counts as a quorum (at least one when there are items)."""
+    return min(total, max(1, math.ceil(total * fraction))) if total else 0
+
+
+async def gather_quorum(items, worker, concurrency: int = 8, timeout: float = None,
+                        quorum: int = None, on_result=None):
+    """
+    Fan out over items and return (results, failed) once every item finished
+    or `quorum` of them succeeded, whichever comes first; stragglers are
+    cancelled. `results` maps item -> result, `failed` maps item -> exception.
+    Items that were cancelled or never started appear in neither.
+    `on_result(item, result)` is called as each task finishes.
+    """
+    results, failed = {}, {}
+    async with aclosing(fan_out(items, worker, concurrency, timeout)) as stream:
+        async for item, result in stream:
+            if on_result is not None:
+                on_result(item, result)
+            if isinstance(result, Exception):
+                failed[item] = result
+            else:
+                results[item] = result
+                if quorum is not None and len(results) >= quorum:
+                    break
+    return results, failed
+
+
+if __name__ == "__main__":
+    import time
+    import random
+
+    async def fake_search(item):
+        # long-tailed latency with the occasional failure
+        await asyncio.sleep(random.expovariate(1 / 0.2))
+        if random.random() < 0.1:
+            raise ConnectionError(f"search failed for {item}")
+        return f"result for {item}"
+
+    async def main():
+        ideas = [f"idea {i}" for i in range(40)]
+        for quorum in (None, quorum_size(len(ideas), 0.8)):
+            start = time.perf_counter()
+            results, failed = await gather_quorum(ideas, fake_search, concurrency=8, timeout=1.0, quorum=quorum)
+            print(f"quorum={quorum}: {len(results)} ok, {len(failed)} failed, "
+                  f"{time.perf_counter() - start:.2f}s")
+
+    asyncio.run(main())
@@ -42,43 +42,34 @@ def query_interpret(state: AnalysisState) -> AnalysisState:
         state.ticker = state.company  # 입력이 이미 티커라고 가정
     return state
 
-import yfinance as yf
-
-def data_collector(state):
-    # 수집할 핵심 재무 정보 키 목록 (불필요한 필드는 제외)
-    needed_keys = [
-        'currentPrice', 'marketCap', 'enterpriseValue',
-        'trailingPE', 'forwardPE', 'pegRatio', 'dividendYield',
-        'revenueGrowth', 'earningsGrowth',
-        'profitMargins', 'grossMargins', 'operatingMargins', 'ebitdaMargins',
-        'returnOnAssets', 'returnOnEquity',
-        'currentRatio', 'quickRatio', 'debtToEquity',
-        'totalRevenue', 'revenuePerShare',
-        'ebitda', 'grossProfits',
-        'operatingCashflow', 'freeCashflow',
-        'totalCash', 'totalDebt',
-        'financialCurrency'
-    ]
-
+from fundamentals_cache import get_cache as get_fundamentals_cache
+
+# 수집할 핵심 재무 정보 키 목록 (불필요한 필드는 제외)
+NEEDED_KEYS = [
+    'currentPrice', 'marketCap', 'enterpriseValue',
+    'trailingPE', 'forwardPE', 'pegRatio', 'dividendYield',
+    'revenueGrowth', 'earningsGrowth',
+    'profitMargins', 'grossMargins', 'operatingMargins', 'ebitdaMargins',
+    'returnOnAssets', 'returnOnEquity',
+    'currentRatio', 'quickRatio', 'debtToEquity',
+    'totalRevenue', 'revenuePerShare',
+    'ebitda', 'grossProfits',
+    'operatingCashflow', 'freeCashflow',
+    'totalCash', 'totalDebt',
+    'financialCurrency'
+]
+
+def fetch_financial_data(ticker: str, needed_keys=NEEDED_KEYS) -> dict:
+    """한 기업의 재무 정보 중 needed_keys 항목만 반환 (로컬 캐시 우선, 만료 시 yfinance 조회)"""
     try:
-        # yfinance를 사용하여 해당 기업의 재무 정보 가져오기
-        ticker_data = yf.Ticker(state.ticker)
-        # info와 basic_info 딕셔너리 가져오기 (None 방지 위해 기본값 {} 사용)
-        info_data = ticker_data.info or {}
-        basic_info_data = ticker_data.basic_info or {}
-        
-        # 두 딕셔너리를 병합 (basic_info_data의 내용이 info_data를 업데이트)
-        merged_data = info_data.copy()  # info_data를 복사하여 새로운 딕셔너리 생성
-        merged_data.update(basic_info_data)  # basic_info_data의 키/값을 병합
-        
-        # needed_keys에 해당하는 데이터만 추출
-        financial_data = {key: merged_data[key] for key in needed_keys if key in merged_data}
+        # 필드별 TTL이 지나지 않은 값은 캐시에서 바로 반환 (FUNDAMENTALS_OFFLINE=1이면 캐시만 사용)
+        return get_fundamentals_cache().get(ticker, needed_keys)
     except Exception as e:
-        # ticker.info를 가져올 수 없는 경우 빈 딕셔너리로 설정
-        info = {}
-
-    state.financial_data = financial_data
+        # 재무 정보를 가져올 수 없는 경우 빈 딕셔너리로 설정
+        return {}
 
+def data_collector(state):
+    state.financial_data = fetch_financial_data(state.ticker)
     return state
 
 def risk_analyzer(state: AnalysisState) -> AnalysisState:
@@ -194,25 +185,14 @@ def risk_analyzer(state: AnalysisState) -> AnalysisState:
     return state
 
 
-from fpdf import FPDF
+from report_renderer import get_renderer, REPORT_FORMAT
 
 def report_generator(state: AnalysisState) -> AnalysisState:
     if not state.analysis_summary:
         state.report_saved = False
         return state
-    # PDF 객체 생성
-    pdf = FPDF()
-    pdf.add_page()
-    # 폰트 설정 (추가한 폰트 사용, 크기 14)
-    pdf.add_font('NanumGothic', '', 'C:/Windows/Fonts/NanumGothic.ttf', uni=True)
-    pdf.set_font('NanumGothic', '', 14)
-    # 제목 추가
-    pdf.cell(0, 10, f"{state.company} 신용 리스크 분석 보고서", ln=1, align='C')
-    # 본문 내용 추가
-    pdf.multi_cell(0, 10, state.analysis_summary)
-    # PDF 저장
-    report_filename = f"{state.company}_credit_report.pdf"
-    pdf.output(report_filename)
+    # 공유 렌더러 사용: 폰트는 한 번만 로드 (REPORT_FONT_PATH, REPORT_FORMAT=pdf|html|md 로 설정)
+    get_renderer().render(state, REPORT_FORMAT)
     state.report_saved = True
     return state
 
@@ -234,14 +214,16 @@ graph.add_edge("data_collector", "risk_analyzer")
 graph.add_edge("risk_analyzer", "report_generator")
 graph.add_edge("report_generator", END)
 graph = graph.compile()
-show_graph(graph)
 
-# 그래프 실행: 초기 상태를 넣어 실행하고, 최종 상태 반환
-initial_state = AnalysisState(user_input="애플 신용 위험 분석해줘")
-final_state = graph.invoke(initial_state)
+if __name__ == "__main__":
+    show_graph(graph)
+
+    # 그래프 실행: 초기 상태를 넣어 실행하고, 최종 상태 반환
+    initial_state = AnalysisState(user_input="애플 신용 위험 분석해줘")
+    final_state = graph.invoke(initial_state)
 
-# 결과 출력 예시
-print("분석 대상 기업:", final_state['company'])             # 애플 (Apple Inc.)
-print("분석 유형:", final_state['analysis_type'])             # credit_risk
-print("신용 리스크 분석 요약:\n", final_state['analysis_summary'])  
-print("PDF 보고서 저장 여부:", final_state['report_saved'])   # True (저장 완료)
+    # 결과 출력 예시
+    print("분석 대상 기업:", final_state['company'])             # 애플 (Apple Inc.)
+    print("분석 유형:", final_state['analysis_type'])             # credit_risk
+    print("신용 리스크 분석 요약:\n", final_state['analysis_summary'])  
+    print("PDF 보고서 저장 여부:", final_state['report_saved'])   # True (저장 완료)
@@ -1,10 +1,11 @@
+from collections import deque
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
 
-import asyncio
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp import StdioServerParameters
+from mcp_session_pool import get_pool
+from indicators import IndicatorEngine
+from alert_dispatcher import get_dispatcher
 
 import os
 
@@ -19,98 +20,89 @@ else:
     python_command = "python"
 
 # 1. Define the state structure
-class ForexState(TypedDict):
+class ForexState(TypedDict, total=False):
     pair: str
-    prices: list[float]
+    prices: deque  # recent prices, deque(maxlen=long_window)
     short_window: int
     long_window: int
     short_ma: float
     long_ma: float
     signal: str  # "BUY", "SELL", or "HOLD"
+    ma_type: str  # "sma" (default) or "ema"
+    hysteresis: float  # MA gap required to switch signals (ties keep the previous signal)
+    indicators: IndicatorEngine  # streaming MA/crossover state, created on the first tick
+
+def get_indicators(state: ForexState) -> IndicatorEngine:
+    """Return the state's indicator engine, creating it on first use."""
+    if state.get("indicators") is None:
+        state["indicators"] = IndicatorEngine(
+            state["short_window"], state["long_window"],
+            mode=state.get("ma_type", "sma"), hysteresis=state.get("hysteresis", 0.0),
+        )
+    return state["indicators"]
 
 # 2. Implement node functions
 def fetch_rate_node(state: ForexState) -> ForexState:
     """Fetch the current exchange rate via MCP tool and update the state."""
     pair = state["pair"]
     try:
-        # Invoke the MCP get_rate tool synchronously
-        result = asyncio.run(fetch_rate_via_mcp(pair))
+        # Invoke the MCP get_rate tool synchronously over the warm pooled session
+        result = fetch_rate_via_mcp(pair)
+        # Maintain rolling window (a bounded deque drops the oldest price in O(1))
+        if not isinstance(state["prices"], deque):
+            state["prices"] = deque(state["prices"], maxlen=state["long_window"])
         state["prices"].append(result)
-        # Maintain rolling window
-        if len(state["prices"]) > state["long_window"]:
-            state["prices"].pop(0)
+        # Update the running moving-average sums with the new tick
+        get_indicators(state).update(result)
     except Exception as e:
         print(f"MCP fetch error: {e}")
     return state
 
 def compute_ma_node(state: ForexState) -> ForexState:
     """Compute short-term and long-term moving averages."""
-    prices = state["prices"]
-    sw, lw = state["short_window"], state["long_window"]
-    # Short moving average
-    if len(prices) >= sw:
-        state["short_ma"] = sum(map(float, prices[-sw:])) / sw
-    else:
-        state["short_ma"] = sum(map(float, prices)) / len(prices)  # 데이터가 부족하면 이용 가능한 전체 평균
-    # Long moving average
-    if len(prices) >= lw:
-        state["long_ma"] = sum(map(float, prices[-lw:])) / lw
-    else:
-        state["long_ma"] = sum(map(float, prices)) / len(prices)
-        
+    # O(1): the engine keeps running sums; 데이터가 부족하면 이용 가능한 전체 평균
+    indicators = get_indicators(state)
+    state["short_ma"] = indicators.short_ma
+    state["long_ma"] = indicators.long_ma
     return state
 
 def signal_check_node(state: ForexState) -> ForexState:
     """Determine BUY, SELL, or HOLD signal based on MA crossover."""
-    short_ma = state["short_ma"]
-    long_ma = state["long_ma"]
-    if short_ma > long_ma:
-        state["signal"] = "BUY"
-    elif short_ma < long_ma:
-        state["signal"] = "SELL"
-    else:
-        state["signal"] = "HOLD"
+    # short > long (+ hysteresis) -> BUY, short < long (- hysteresis) -> SELL;
+    # inside the band the previous signal is kept (HOLD until the first crossover)
+    state["signal"] = get_indicators(state).signal
     return state
 
-def send_email_node(state: ForexState) -> ForexState:
-    """Send an email alert when a BUY or SELL signal is generated."""
-    import smtplib
-    from email.message import EmailMessage
+def get_alert_dispatcher():
+    """Shared background dispatcher (one persistent SMTP connection for all alerts)."""
+    smtp_user = os.getenv("GMAIL_USER")
+    return get_dispatcher(
+        "forex",
+        username=smtp_user,
+        password=os.getenv("GMAIL_PASS"),
+        recipient=os.getenv("ALERT_EMAIL", smtp_user),  # Default to self if not set
+    )
 
+def send_email_node(state: ForexState) -> ForexState:
+    """Queue an email alert when a BUY or SELL signal is generated (sent in the background)."""
     # Load SMTP credentials and alert address from environment
-    smtp_user = os.getenv("GMAIL_USER")
-    smtp_pass = os.getenv("GMAIL_PASS")
-    alert_to  = os.getenv("ALERT_EMAIL", smtp_user)  # Default to self if not set
-    if not smtp_user or not smtp_pass:
+    dispatcher = get_alert_dispatcher()
+    if not dispatcher.configured:
         print("⚠️ SMTP credentials for sending email are not configured.")
         return state
 
     # Compose email
-    msg = EmailMessage()
     pair  = state["pair"]
     price = state["prices"][-1] if state["prices"] else None
     signal = state["signal"]
-
-    msg["Subject"] = f"[Forex Signal] {pair} - {signal}"
-    msg["From"]    = smtp_user
-    msg["To"]      = alert_to
     body = (
         f"Trading signal for {pair}: {signal}\n"
         f"Latest price = {price}\n"
         f"Short MA = {state['short_ma']}, Long MA = {state['long_ma']}"
     )
-    msg.set_content(body)
-
-    # Send via Gmail SMTP
-    try:
-        server = smtplib.SMTP("smtp.gmail.com", 587)
-        server.starttls()
-        server.login(smtp_user, smtp_pass)
-        server.send_message(msg)
-        server.quit()
-        print(f"✅ Email alert sent: {signal} @ price {price}")
-    except Exception as e:
-        print(f"❌ Email send failed: {e}")
+    # Returns right away; repeated signals for the same pair are coalesced
+    dispatcher.send(f"[Forex Signal] {pair} - {signal}", body, key=pair)
+    print(f"📨 Email alert queued: {signal} @ price {price}")
     return state
 
 # 3. Build the workflow graph and configure edges
@@ -145,41 +137,40 @@ server_params = StdioServerParameters(
     command=python_command,
     args=[server_script],
 )
+# The server process is spawned on first use and kept warm across ticks
+mcp_pool = get_pool()
+mcp_pool.register("forex", server_params)
 
-async def fetch_rate_via_mcp(pair: str) -> float:
+def fetch_rate_via_mcp(pair: str) -> float:
     """Helper to invoke the get_rate MCP tool and return its result."""
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            tools = await load_mcp_tools(session)
-            get_rate = next(t for t in tools if t.name == "get_rate")
-            return await get_rate.ainvoke({"pair": pair})
+    return mcp_pool.call_tool("forex", "get_rate", {"pair": pair})
 
 # Example execution
-pair = "EUR/USD"
-rate = asyncio.run(fetch_rate_via_mcp(pair))
-print(f"Current exchange rate for {pair}: {rate}")
-
-import random
-random.seed(42)  # Fix seed for reproducibility
-
-# Initialize agent state
-state: ForexState = {
-    "pair": "EUR/USD",
-    "prices": [],
-    "short_window": 3,
-    "long_window": 5,
-    "short_ma": 0.0,
-    "long_ma": 0.0,
-    "signal": "HOLD"
-}
-
-# Run the workflow for 10 iterations
-for i in range(1, 11):
-    print(f"\n=== Iteration {i} ===")
-    state = agent.invoke(state)  # Execute graph
-    latest_price = state["prices"][-1]
-    print(f"New price = {latest_price}")
-    print(f"Short MA (window={state['short_window']}) = {state['short_ma']}")
-    print(f"Long  MA (window={state['long_window']}) = {state['long_ma']}")
-    print(f"Signal = {state['signal']}")
+if __name__ == "__main__":
+    pair = "EUR/USD"
+    rate = fetch_rate_via_mcp(pair)
+    print(f"Current exchange rate for {pair}: {rate}")
+
+    import random
+    random.seed(42)  # Fix seed for reproducibility
+
+    # Initialize agent state
+    state: ForexState = {
+        "pair": "EUR/USD",
+        "prices": deque(maxlen=5),
+        "short_window": 3,
+        "long_window": 5,
+        "short_ma": 0.0,
+        "long_ma": 0.0,
+        "signal": "HOLD"
+    }
+
+    # Run the workflow for 10 iterations
+    for i in range(1, 11):
+        print(f"\n=== Iteration {i} ===")
+        state = agent.invoke(state)  # Execute graph
+        latest_price = state["prices"][-1]
+        print(f"New price = {latest_price}")
+        print(f"Short MA (window={state['short_window']}) = {state['short_ma']}")
+        print(f"Long  MA (window={state['long_window']}) = {state['long_ma']}")
+        print(f"Signal = {state['signal']}")
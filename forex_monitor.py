@@ -0,0 +1,226 @@
+# forex_monitor.py - Monitor many currency pairs on one event loop with batched rate fetches
+import json
+import time
+import asyncio
+import inspect
+import statistics
+from dataclasses import dataclass, field
+
+from indicators import IndicatorEngine
+
+
+def parse_rates(result, errors: dict = None) -> dict:
+    """
+    Normalize a get_rates tool result (dict, JSON text or MCP content blocks) to {pair: float}.
+    Per-pair entries may be plain rates or {"ok", "rate"/"error"}; failed pairs are left out
+    (and collected in `errors` as {pair: message} when given).
+    """
+    if isinstance(result, (list, tuple)):
+        # content blocks: [{"type": "text", "text": "..."}] or plain strings
+        texts = [block.get("text", "") if isinstance(block, dict) else str(block) for block in result]
+        result = "".join(texts)
+    if isinstance(result, str):
+        result = json.loads(result)
+    rates = {}
+    for pair, entry in result.items():
+        if isinstance(entry, dict):
+            if not entry.get("ok", "rate" in entry):
+                if errors is not None:
+                    errors[pair] = entry.get("error", "unknown error")
+                continue
+            entry = entry["rate"]
+        rates[pair] = float(entry)
+    return rates
+
+
+@dataclass
+class PairMonitor:
+    """Indicator state of one monitored pair."""
+    pair: str
+    engine: IndicatorEngine
+    last_price: float = None
+    updates: int = 0
+
+
+@dataclass
+class SignalEvent:
+    pair: str
+    signal: str          # "BUY" or "SELL"
+    price: float
+    short_ma: float
+    long_ma: float
+    latency: float       # seconds from issuing the rate request to emitting the signal
+    timestamp: float = field(default_factory=time.time)
+
+
+class ForexMonitor:
+    """
+    Track many pairs with one batched get_rates call per tick.
+
+    Every pair keeps its own IndicatorEngine. `on_signal(event)` (sync or
+    async) is called whenever a pair crosses into BUY or SELL. metrics()
+    reports pair updates per second and the end-to-end signal latency.
+    """
+
+    def __init__(self, pairs: list, short_window: int = 3, long_window: int = 5, interval: float = 1.0,
+                 mode: str = "sma", hysteresis: float = 0.0, on_signal=None, fetch_rates=None,
+                 pool=None, server: str = "forex"):
+        self.pairs = list(dict.fromkeys(pairs))
+        self.monitors = {
+            pair: PairMonitor(pair, IndicatorEngine(short_window, long_window, mode=mode, hysteresis=hysteresis))
+            for pair in self.pairs
+        }
+        self.interval = interval
+        self.on_signal = on_signal
+        self.pool = pool
+        self.server = server
+        self._fetch_rates = fetch_rates or self._fetch_via_mcp
+        self._batched = True
+        self.ticks = 0
+        self.pair_updates = 0
+        self.errors = 0
+        self.signals = []
+        self.fetch_latencies = []
+        self.signal_latencies = []
+        self._started = None
+        self._busy = 0.0
+
+    async def _fetch_via_mcp(self, pairs: list) -> dict:
+        if self.pool is None:
+            from forex_client import mcp_pool
+            self.pool = mcp_pool
+        if self._batched:
+            try:
+                return parse_rates(await self.pool.acall_tool(self.server, "get_rates", {"pairs": pairs}))
+            except KeyError:
+                # Older server without get_rates: fall back to concurrent single-pair calls
+                self._batched = False
+        rates = await asyncio.gather(
+            *(self.pool.acall_tool(self.server, "get_rate", {"pair": pair}) for pair in pairs)
+        )
+        return {pair: float(rate) for pair, rate in zip(pairs, rates)}
+
+    async def _emit(self, event: SignalEvent) -> None:
+        self.signals.append(event)
+        self.signal_latencies.append(event.latency)
+        if self.on_signal is not None:
+            result = self.on_signal(event)
+            if inspect.isawaitable(result):
+                await result
+
+    async def tick(self) -> dict:
+        """Fetch all rates once and update every pair; returns {pair: signal}."""
+        started = time.perf_counter()
+        try:
+            rates = await self._fetch_rates(self.pairs)
+        except Exception as e:
+            self.errors += 1
+            print(f"Rate fetch failed: {e}")
+            return {}
+        self.fetch_latencies.append(time.perf_counter() - started)
+
+        signals = {}
+        for pair, rate in rates.items():
+            monitor = self.monitors.get(pair)
+            if monitor is None:
+                continue
+            engine = monitor.engine
+            signals[pair] = engine.update(rate)
+            monitor.last_price = rate
+            monitor.updates += 1
+            if engine.crossed and engine.signal in ("BUY", "SELL"):
+                await self._emit(SignalEvent(
+                    pair, engine.signal, rate, engine.short_ma, engine.long_ma,
+                    latency=time.perf_counter() - started,
+                ))
+        self.ticks += 1
+        self.pair_updates += len(signals)
+        self._busy += time.perf_counter() - started
+        return signals
+
+    async def run(self, ticks: int = None, duration: float = None) -> None:
+        """Tick every `interval` seconds until `ticks` ticks or `duration` seconds have passed."""
+        self._started = self._started or time.perf_counter()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration if duration else None
+        next_tick = loop.time()
+        count = 0
+        while (ticks is None or count < ticks) and (deadline is None or loop.time() < deadline):
+            await self.tick()
+            count += 1
+            next_tick += self.interval
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                next_tick = loop.time()  # fell behind: do not try to catch up with a burst
+
+    def metrics(self) -> dict:
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+
+        def ms(values, q):
+            if not values:
+                return None
+            if len(values) == 1:
+                return values[0] * 1000
+            return statistics.quantiles(values, n=100)[q - 1] * 1000
+
+        return {
+            "pairs": len(self.pairs),
+            "ticks": self.ticks,
+            "pair_updates": self.pair_updates,
+            "errors": self.errors,
+            "signals": len(self.signals),
+            "ticks_per_second": self.pair_updates / elapsed if elapsed else 0.0,
+            # throughput the loop could sustain with no interval between ticks
+            "capacity_per_second": self.pair_updates / self._busy if self._busy else 0.0,
+            "fetch_ms_p50": ms(self.fetch_latencies, 50),
+            "fetch_ms_p95": ms(self.fetch_latencies, 95),
+            "signal_latency_ms_p50": ms(self.signal_latencies, 50),
+            "signal_latency_ms_p95": ms(self.signal_latencies, 95),
+            "signal_latency_ms_max": max(self.signal_latencies) * 1000 if self.signal_latencies else None,
+        }
+
+
+def _random_walk_fetcher(pairs: list, latency: float = 0.0):
+    """Local stand-in for the MCP server (benchmarks without spawning a subprocess)."""
+    import random
+
+    prices = {pair: 1.0 + random.random() for pair in pairs}
+
+    async def fetch(requested: list) -> dict:
+        if latency:
+            await asyncio.sleep(latency)
+        for pair in requested:
+            prices[pair] += random.gauss(0, 0.001)
+        return {pair: prices[pair] for pair in requested}
+
+    return fetch
+
+
+if __name__ == "__main__":
+    import argparse
+
+    majors = ["EUR/USD", "USD/JPY", "GBP/USD", "USD/CHF", "AUD/USD", "USD/CAD", "NZD/USD", "USD/KRW"]
+    parser = argparse.ArgumentParser(description="Monitor many forex pairs")
+    parser.add_argument("--pairs", type=int, default=40, help="number of pairs to monitor")
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.0)
+    parser.add_argument("--short-window", type=int, default=3)
+    parser.add_argument("--long-window", type=int, default=5)
+    parser.add_argument("--fake", action="store_true", help="use a local random walk instead of the MCP server")
+    args = parser.parse_args()
+
+    pairs = (majors + [f"PAIR{i}/USD" for i in range(args.pairs)])[:args.pairs]
+
+    def print_signal(event: SignalEvent):
+        print(f"{event.pair:9s} {event.signal:4s} @ {event.price:.4f} "
+              f"(short {event.short_ma:.4f} / long {event.long_ma:.4f}, {event.latency * 1000:.2f} ms)")
+
+    monitor = ForexMonitor(
+        pairs, args.short_window, args.long_window, interval=args.interval, on_signal=print_signal,
+        fetch_rates=_random_walk_fetcher(pairs, latency=0.002) if args.fake else None,
+    )
+    asyncio.run(monitor.run(ticks=args.ticks))
+    for name, value in monitor.metrics().items():
+        print(f"{name:24s} {value:.2f}" if isinstance(value, float) else f"{name:24s} {value}")
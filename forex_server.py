@@ -1,4 +1,7 @@
 # forex_server.py - Mock Forex MCP Server using FastMCP
+from mcp_startup import ready  # first import: times the imports below with --profile-startup
+import re
+import sys
 from mcp.server.fastmcp import FastMCP
 
 # Create an MCP server instance
@@ -11,9 +14,28 @@ def get_rate(pair: str = "EUR/USD") -> float:
     import random
     # Generate a mock EUR/USD rate between 0.95 and 1.05
     rate = round(random.uniform(0.95, 1.05), 4)
-    print(f"[MCP] {pair} rate = {rate}")
+    # Log to stderr: stdout carries the MCP stdio protocol
+    print(f"[MCP] {pair} rate = {rate}", file=sys.stderr)
     return rate
 
+PAIR_PATTERN = re.compile(r"^[A-Z]{3}/[A-Z]{3}$")
+
+# Batched variant: one MCP round trip for every monitored pair
+@mcp.tool()
+def get_rates(pairs: list[str]) -> dict[str, dict]:
+    """Return the rates of several currency pairs at once (mock data). Use this instead of repeated get_rate calls.
+    One entry per pair: {pair: {"ok": true, "rate"}} or {pair: {"ok": false, "error"}}."""
+    import random
+    rates = {}
+    for pair in pairs:
+        if PAIR_PATTERN.match(pair):
+            rates[pair] = {"ok": True, "rate": round(random.uniform(0.95, 1.05), 4)}
+        else:
+            rates[pair] = {"ok": False, "error": f"Invalid currency pair: {pair!r} (expected e.g. 'EUR/USD')"}
+    print(f"[MCP] rates for {len(rates)} pairs", file=sys.stderr)
+    return rates
+
 if __name__ == "__main__":
+    ready("ForexServer")
     # Run the MCP server over stdio transport
     mcp.run(transport="stdio")
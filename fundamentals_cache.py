@@ -0,0 +1,198 @@
+# fundamentals_cache.py - Persistent per-field cache of company fundamentals with TTLs
+import os
+import json
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CACHE_PATH = os.getenv("FUNDAMENTALS_CACHE_PATH", "fundamentals_cache.sqlite")
+DEFAULT_TTL = 24 * 3600          # statements change at most daily
+MARKET_TTL = 15 * 60             # price-driven fields go stale faster
+DEFAULT_MAX_STALE = 7 * 24 * 3600  # how long a stale value may be served while it is refreshed
+
+FIELD_TTLS = {
+    'currentPrice': MARKET_TTL, 'marketCap': MARKET_TTL, 'enterpriseValue': MARKET_TTL,
+    'trailingPE': MARKET_TTL, 'forwardPE': MARKET_TTL, 'pegRatio': MARKET_TTL,
+    'dividendYield': MARKET_TTL,
+}
+
+
+def yahoo_fetcher(ticker: str, fields: list) -> dict:
+    """Fetch the requested fields from yfinance (info merged with basic_info)."""
+    import yfinance as yf
+
+    ticker_data = yf.Ticker(ticker)
+    # info and basic_info may be None; basic_info values win on overlap
+    info_data = ticker_data.info or {}
+    basic_info_data = ticker_data.basic_info or {}
+    merged_data = info_data.copy()
+    merged_data.update(basic_info_data)
+    return {key: merged_data[key] for key in fields if key in merged_data}
+
+
+class FixtureFetcher:
+    """Serve fundamentals from a local JSON file ({ticker: {field: value}}) instead of Yahoo."""
+
+    def __init__(self, path: str = None, data: dict = None):
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        self.data = data or {}
+        self.calls = 0
+
+    def __call__(self, ticker: str, fields: list) -> dict:
+        self.calls += 1
+        record = self.data.get(ticker, {})
+        return {key: record[key] for key in fields if key in record}
+
+
+class FundamentalsCache:
+    """
+    SQLite cache of fundamentals keyed by (ticker, field).
+
+    Each field has its own TTL. A missing field (or one older than ttl +
+    max_stale) is fetched before returning; a merely stale field is returned
+    immediately and refreshed in the background (stale-while-revalidate).
+    Fields the provider does not have are cached as absent, so they do not
+    trigger a fetch on every call. In offline mode only cached values are used.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, fetcher=yahoo_fetcher,
+                 ttls: dict = None, default_ttl: float = DEFAULT_TTL,
+                 max_stale: float = DEFAULT_MAX_STALE, offline: bool = None):
+        self.fetcher = fetcher
+        self.ttls = dict(FIELD_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_stale = max_stale
+        if offline is None:
+            offline = os.getenv("FUNDAMENTALS_OFFLINE", "0").lower() in ("1", "true", "yes", "on")
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fundamentals-refresh")
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fundamentals ("
+            "ticker TEXT NOT NULL, field TEXT NOT NULL, value TEXT, fetched_at REAL NOT NULL, "
+            "PRIMARY KEY (ticker, field))"
+        )
+        self.conn.commit()
+
+    def ttl(self, field: str) -> float:
+        return self.ttls.get(field, self.default_ttl)
+
+    def _read(self, ticker: str, fields: list) -> dict:
+        placeholders = ",".join("?" * len(fields))
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT field, value, fetched_at FROM fundamentals WHERE ticker = ? AND field IN ({placeholders})",
+                (ticker, *fields),
+            ).fetchall()
+        return {field: (value, fetched_at) for field, value, fetched_at in rows}
+
+    def _write(self, ticker: str, fields: list, data: dict) -> None:
+        now = time.time()
+        rows = [
+            # NULL marks a field the provider does not have for this ticker
+            (ticker, field, json.dumps(data[field], default=str) if field in data else None, now)
+            for field in fields
+        ]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO fundamentals (ticker, field, value, fetched_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.commit()
+
+    def _fetch(self, ticker: str, fields: list) -> dict:
+        data = self.fetcher(ticker, fields)
+        self._write(ticker, fields, data)
+        return data
+
+    def _refresh_in_background(self, ticker: str, fields: list) -> None:
+        key = (ticker, tuple(sorted(fields)))
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._fetch(ticker, fields)
+            except Exception as e:
+                print(f"Fundamentals refresh failed for {ticker}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(run)
+
+    def get(self, ticker: str, fields: list) -> dict:
+        """Return {field: value} for the fields known for ticker."""
+        fields = list(dict.fromkeys(fields))
+        cached = self._read(ticker, fields)
+        now = time.time()
+        stale, expired = [], []
+        for field in fields:
+            entry = cached.get(field)
+            age = now - entry[1] if entry else None
+            if entry is None or age > self.ttl(field) + self.max_stale:
+                expired.append(field)
+            elif age > self.ttl(field):
+                stale.append(field)
+
+        if expired and not self.offline:
+            try:
+                # One provider call covers every field of the ticker
+                fresh = self._fetch(ticker, fields)
+                return {field: fresh[field] for field in fields if field in fresh}
+            except Exception as e:
+                print(f"Fundamentals fetch failed for {ticker}, serving cached data: {e}")
+        elif stale and not self.offline:
+            self._refresh_in_background(ticker, stale)
+
+        return {
+            field: json.loads(value)
+            for field, (value, _) in cached.items()
+            if value is not None
+        }
+
+    def invalidate(self, ticker: str = None) -> None:
+        with self._lock:
+            if ticker is None:
+                self.conn.execute("DELETE FROM fundamentals")
+            else:
+                self.conn.execute("DELETE FROM fundamentals WHERE ticker = ?", (ticker,))
+            self.conn.commit()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache() -> FundamentalsCache:
+    """Return the process-wide fundamentals cache (created on first use)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = FundamentalsCache()
+    return _default_cache
+
+
+def set_fetcher(fetcher) -> None:
+    """Swap the data provider of the shared cache (e.g. a FixtureFetcher in tests)."""
+    get_cache().fetcher = fetcher
+
+
+if __name__ == "__main__":
+    fields = ['currentPrice', 'debtToEquity', 'currentRatio', 'profitMargins']
+    cache = FundamentalsCache(path=":memory:", fetcher=FixtureFetcher(data={
+        "AAPL": {"currentPrice": 190.5, "debtToEquity": 1.5, "currentRatio": 0.9, "profitMargins": 0.25},
+    }))
+    for attempt in ("cold", "warm"):
+        start = time.perf_counter()
+        data = cache.get("AAPL", fields)
+        print(f"{attempt}: {(time.perf_counter() - start) * 1000:.3f} ms -> {data}")
+    print("provider calls:", cache.fetcher.calls)
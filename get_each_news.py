@@ -7,6 +7,9 @@ from newsapi import NewsApiClient
 from langgraph.graph import StateGraph, START, END
 from typing import TypedDict, List  
 from dotenv import load_dotenv  
+from translation_engine import TranslationEngine, article_text
+from llm_cache import maybe_cached
+from news_writer import NewsWriter
 load_dotenv() 
 
 # ✅ 1. 공유 정보 (State) 정의
@@ -16,7 +19,7 @@ class NewsState(TypedDict):
     model: str  
     max_articles: int  
     articles: List[dict]  
-    news: List[dict]  
+    saved_count: int  
     save_path: str  
 
 def create_initial_state(user_input: str) -> NewsState:  
@@ -26,14 +29,14 @@ def create_initial_state(user_input: str) -> NewsState:
         "model": "gpt-3.5-turbo",  
         "max_articles": 5,  
         "articles": [],  
-        "news": [],  
+        "saved_count": 0,  
         "save_path": "news_.json"  
     }  
     
 # ✅ 2. OpenAI API 설정
 openai.api_key = os.environ.get("OPENAI_API_KEY")
 MODEL_NAME="gpt-4"#"gpt-3.5-turbo"  
-client = openai.Client(api_key=openai.api_key)
+client = maybe_cached(openai.Client(api_key=openai.api_key))  # LLM_CACHE=1 enables response caching
 
 def parse_user_input(state: NewsState) -> NewsState:  
     # print(f"🧠 사용자의 요청을 분석 중: '{state['user_input']}'")  
@@ -104,44 +107,26 @@ def fetch_news(state):
 #     return state  
 
 
-# ✅ 4. 뉴스 요약 (Summarize News)
-def translate_news(state: NewsState):
-    """OpenAI LLM을 사용하여 뉴스 요약"""
+# ✅ 4. 뉴스 번역 (Translate News)
+def translate_news(state: NewsState, on_record):
+    """OpenAI LLM을 사용하여 뉴스 번역 - 여러 기사를 동시에 요청하고, 원래 순서대로 on_record(record) 호출"""
     print("📝 뉴스 번역 진행 중...")
-    translations = []
-    
-    for article in state['articles']:
-        title = article.get('title', '제목 없음')
-        description = article.get('description', '')
-        content = article.get('content', '')
-        text_to_translate = content if content else (description if description else title)
-        
-        try:  
-            completion = client.chat.completions.create(  
-                model=state['model'],  
-                messages=[  
-                    {"role": "system", "content": "You are a Korean translation assistant. Please Translate the news article to Korean ."},  
-                    {"role": "user", "content": f"News article to translate: {text_to_translate}"}  
-                    # {"role": "system", "content": "You are a news summary assistant. Please summarize the news article."},  
-                    # {"role": "user", "content": f"News article to summarize: {text_to_summarize}"}  
-                ],  
-                max_tokens=150,  
-                temperature=0.5  
-            )  
-            translation = completion.choices[0].message.content.strip()  
-        except Exception as e:  
-            print(f"❌ Translation failed: {e}")  
-            news = "translation failed"  
-        
-        translations.append({"title": title, "url": article.get('url'), "content": translation})
-
-    state['news'] = translations
-    return state
+    engine = TranslationEngine(model=state['model'], max_tokens=150, temperature=0.5)
+    articles = state['articles']
+
+    def on_result(index, translation):
+        article = articles[index]
+        if isinstance(translation, Exception):
+            print(f"❌ Translation failed: {translation}")
+            translation = "translation failed"
+        on_record({"title": article.get('title', '제목 없음'), "url": article.get('url'), "content": translation})
+
+    engine.translate_each((article_text(article) for article in articles), on_result)
 
 # ✅ 5. HITL을 활용한 파일명 입력
 def get_save_filename(state: NewsState):
     topic_filename = state['topic'].replace(' ', '_')
-    state['save_path'] = topic_filename + ".json"
+    state['save_path'] = topic_filename + ".jsonl"
     return state
     # """사용자로부터 저장할 파일명을 입력받음"""
     # print("\n💾 저장할 파일 이름을 입력하세요 (기본값: 'news_summary.json'):")
@@ -149,37 +134,16 @@ def get_save_filename(state: NewsState):
     # state['save_path'] = filename.strip() if filename.strip() else "news_summary.json"
     # return state
 
-# ✅ 6. 뉴스 요약 결과 저장
-def json_to_markdown(topic, json_file):
-    # JSON 파일 읽기 (UTF-8 인코딩)
-    with open(json_file, 'r', encoding='utf-8') as file:
-        news_list = json.load(file)
-    
-    # Markdown 형식의 게시글 생성
-    markdown_output = f"# 오늘의 {topic} 주요 뉴스\n\n"
-    for idx, article in enumerate(news_list, start=1):
-        markdown_output += f"### {idx}. {article['title']}\n"
-        markdown_output += f"URL: {article['url']}\n"
-        markdown_output += f"내용: {article['content']}\n\n"
-    
-    # 입력 JSON 파일명에서 확장자를 제거하고 .md 확장자로 변경
-    base_name = os.path.splitext(json_file)[0]
-    md_file = f"{base_name}.md"
-    
-    # Markdown 파일로 저장
-    with open(md_file, 'w', encoding='utf-8') as file:
-        file.write(markdown_output)
-    
-    print(f"Markdown 파일 '{md_file}' 저장 완료!")
-
+# ✅ 6. 뉴스 번역 결과 저장 (번역이 끝나는 대로 한 건씩 JSONL/Markdown에 기록)
 def save_news(state: NewsState):
-    """요약된 기사들을 JSON 파일로 저장"""
+    """번역된 기사를 JSON Lines와 Markdown 파일로 바로바로 저장"""
     print(f"📁 '{state['save_path']}' 파일로 저장 중...")
-    with open(state['save_path'], "w", encoding="utf-8") as f:
-        json.dump(state['news'], f, ensure_ascii=False, indent=2)
-
-    json_to_markdown(state['topic'], state['save_path'])
-    print(f"✅ {len(state['news'])}개의 뉴스가 저장되었습니다.")
+    header = f"# 오늘의 {state['topic']} 주요 뉴스\n\n"
+    with NewsWriter(state['save_path'], append=False, header=header) as writer:
+        translate_news(state, writer.write)
+    state['saved_count'] = writer.count
+    print(f"Markdown 파일 '{writer.md_path}' 저장 완료!")
+    print(f"✅ {writer.count}개의 뉴스가 저장되었습니다.")
     return state
 
 # ✅ 7. Edge 연결 및 LangGraph Workflow 구성
@@ -187,14 +151,12 @@ workflow = StateGraph(NewsState)
 
 workflow.add_node("parse_user_input", parse_user_input)
 workflow.add_node("fetch_news", fetch_news)
-workflow.add_node("translate_news", translate_news)
 workflow.add_node("get_save_filename", get_save_filename)
-workflow.add_node("save_news", save_news)
+workflow.add_node("save_news", save_news)  # translation streams straight into the output files
 
 workflow.add_edge(START, "parse_user_input")
 workflow.add_edge("parse_user_input", "fetch_news")
-workflow.add_edge("fetch_news", "translate_news")
-workflow.add_edge("translate_news", "get_save_filename")
+workflow.add_edge("fetch_news", "get_save_filename")
 workflow.add_edge("get_save_filename", "save_news")
 workflow.add_edge("save_news", END)
 
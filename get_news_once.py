@@ -7,13 +7,19 @@ from newsapi import NewsApiClient
 from langgraph.graph import StateGraph, START, END
 from typing import TypedDict, List  
 from dotenv import load_dotenv  
+from translation_engine import TranslationEngine, article_text
+from llm_cache import maybe_cached
+from news_index import SeenArticleIndex, topic_key
+from news_writer import NewsWriter
 import requests
 import re
 
 load_dotenv()
 openai.api_key = os.environ.get("OPENAI_API_KEY")
 MODEL_NAME="gpt-4"#"gpt-3.5-turbo"  
-client = openai.Client(api_key=openai.api_key)
+client = maybe_cached(openai.Client(api_key=openai.api_key))  # LLM_CACHE=1 enables response caching
+# Articles processed by earlier runs are skipped (index file: NEWS_INDEX_PATH)
+news_index = SeenArticleIndex()
 
 class NewsState(TypedDict):
     user_input: str
@@ -22,7 +28,7 @@ class NewsState(TypedDict):
     model: str
     max_articles: int
     articles: List[dict]
-    news: List[dict]
+    saved_count: int
     save_path: str
 
 def create_initial_state(input_data) -> NewsState:
@@ -34,7 +40,7 @@ def create_initial_state(input_data) -> NewsState:
             "model": MODEL_NAME,
             "max_articles": 20,
             "articles": [],
-            "news": [],
+            "saved_count": 0,
             "save_path": "news_.json"
         }
     elif isinstance(input_data, list):
@@ -45,7 +51,7 @@ def create_initial_state(input_data) -> NewsState:
             "model": MODEL_NAME,
             "max_articles": 10,
             "articles": [],
-            "news": [],
+            "saved_count": 0,
             "save_path": "news_.json"
         }
     else:
@@ -57,6 +63,9 @@ def create_initial_state(input_data) -> NewsState:
 def clean_topic(topic):
     return re.sub(r'[^\w\s-]', '', topic).strip()
 
+def state_topic_key(state):
+    return topic_key(state['topics'] if state.get('topics') else [state['topic']])
+
 def fetch_news(state):
     if 'topics' in state and state['topics']:
         topics = state['topics']
@@ -86,9 +95,15 @@ def fetch_news(state):
             "max": state['max_articles'],
             "token": os.environ.get("GNEWS_API_KEY")
         }
+        # Only ask for articles newer than the last run's high-water mark
+        since = news_index.watermark(state_topic_key(state))
+        if since:
+            params["from"] = since
         response = requests.get(url, params=params)
         data = response.json()
-        state["articles"] = data.get("articles",[])
+        articles = data.get("articles",[])
+        state["articles"] = news_index.filter_new(articles)
+        print(f"{len(state['articles'])} new of {len(articles)} fetched articles")
     except Exception as e:
         print(f"❌ News search failed: {e}")
         state["articles"] = []
@@ -97,22 +112,32 @@ def fetch_news(state):
 def get_save_filename(state: NewsState):
     if 'topics' in state and state['topics']:
         topics_str = '_'.join([topic.replace(' ', '_') for topic in state['topics']])
-        state['save_path'] = topics_str + ".json"
+        state['save_path'] = topics_str + ".jsonl"
     else:
         topic_filename = state['topic'].replace(' ', '_')
-        state['save_path'] = topic_filename + ".json"
+        state['save_path'] = topic_filename + ".jsonl"
     return state
 
 def save_news(state: NewsState):
+    """Translate the new articles and append each one to the JSONL/Markdown files as soon as it is ready."""
+    if not state['articles']:
+        print("No new articles since the last run.")
+        return state
     print(f"Saving to '{state['save_path']}'...")
-    with open(state['save_path'], "w", encoding="utf-8") as f:
-        json.dump(state['news'], f, ensure_ascii=False, indent=2)
-    
-    topic_str = ', '.join(state['topics']) if state['topics'] else state['topic']
-    json_to_markdown(topic_str, state['save_path'])
-    
-    print(f"Saved {len(state['news'])} news articles.")
+    key = state_topic_key(state)
+
+    def on_record(article, record):
+        writer.write(record)
+        # Failed translations stay out of the index so the next run retries them
+        if record['content'] != "translation failed":
+            news_index.mark_seen([article], key)
+
+    with NewsWriter(state['save_path'], append=True, format_markdown=format_markdown) as writer:
+        translate_news(state, on_record)
+    state['saved_count'] = writer.count
+    print(f"Saved {writer.count} new news articles ('{writer.jsonl_path}', '{writer.md_path}').")
     return state
+
 def extract_cleaned_sentence(text):
     colon_pos = text.find(':')
     if colon_pos == -1:
@@ -125,23 +150,12 @@ def extract_cleaned_sentence(text):
         cleaned_text = after_colon
     return cleaned_text  # 마침표가 없을 경우 전체 텍스트 반환
     
-def json_to_markdown(topic, json_file):
-    with open(json_file, 'r', encoding='utf-8') as file:
-        news_list = json.load(file)
-    5
-    markdown_output = ""
-    for idx, article in enumerate(news_list, start=1):
-        markdown_output += f"{idx}. {article['title']}\n"
-        markdown_output += f"{article['url']}\n"
-        markdown_output += extract_cleaned_sentence(f"{article['content']}")+"\n\n"
-    
-    base_name = os.path.splitext(json_file)[0]
-    md_file = f"{base_name}.md"
-    
-    with open(md_file, 'w', encoding='utf-8') as file:
-        file.write(markdown_output)
-    
-    print(f"Markdown file '{md_file}' saved!")
+def format_markdown(idx, article):
+    return (
+        f"{idx}. {article['title']}\n"
+        f"{article['url']}\n"
+        + extract_cleaned_sentence(f"{article['content']}") + "\n\n"
+    )
 
 
 def parse_user_input(state: NewsState) -> NewsState:  
@@ -169,52 +183,32 @@ def parse_user_input(state: NewsState) -> NewsState:
     return state  
 
 
-# ✅ 4. 뉴스 요약 (Summarize News)
-def translate_news(state: NewsState):
-    """OpenAI LLM을 사용하여 뉴스 요약"""
+# ✅ 4. 뉴스 번역 (Translate News)
+def translate_news(state: NewsState, on_record):
+    """OpenAI LLM을 사용하여 뉴스 번역 - 여러 기사를 동시에 요청하고, 원래 순서대로 on_record(article, record) 호출"""
     print("📝 뉴스 번역 진행 중...")
-    translations = []
-    
-    for article in state['articles']:
-        title = article.get('title', '제목 없음')
-        description = article.get('description', '')
-        content = article.get('content', '')
-        text_to_translate = content if content else (description if description else title)
-        
-        try:  
-            completion = client.chat.completions.create(  
-                model=state['model'],  
-                messages=[  
-                    {"role": "system", "content": "You are a Korean translation assistant. Please Translate the news article to Korean ."},  
-                    {"role": "user", "content": f"News article to translate: {text_to_translate}"}  
-                    # {"role": "system", "content": "You are a news summary assistant. Please summarize the news article."},  
-                    # {"role": "user", "content": f"News article to summarize: {text_to_summarize}"}  
-                ],  
-                max_tokens=500,  
-                temperature=0.5  
-            )  
-            translation = completion.choices[0].message.content.strip()  
-        except Exception as e:  
-            print(f"❌ Translation failed: {e}")  
-            news = "translation failed"  
-        
-        translations.append({"title": title, "url": article.get('url'), "content": translation})
-
-    state['news'] = translations
-    return state
+    engine = TranslationEngine(model=state['model'], max_tokens=500, temperature=0.5)
+    articles = state['articles']
+
+    def on_result(index, translation):
+        article = articles[index]
+        if isinstance(translation, Exception):
+            print(f"❌ Translation failed: {translation}")
+            translation = "translation failed"
+        on_record(article, {"title": article.get('title', '제목 없음'), "url": article.get('url'), "content": translation})
+
+    engine.translate_each((article_text(article) for article in articles), on_result)
     
     
 # ✅ 7. Edge 연결 및 LangGraph Workflow 구성
 workflow = StateGraph(NewsState)
 
 workflow.add_node("fetch_news", fetch_news)
-workflow.add_node("translate_news", translate_news)
 workflow.add_node("get_save_filename", get_save_filename)
-workflow.add_node("save_news", save_news)
+workflow.add_node("save_news", save_news)  # translation streams straight into the output files
 
 workflow.add_edge(START, "fetch_news")
-workflow.add_edge("fetch_news", "translate_news")
-workflow.add_edge("translate_news", "get_save_filename")
+workflow.add_edge("fetch_news", "get_save_filename")
 workflow.add_edge("get_save_filename", "save_news")
 workflow.add_edge("save_news", END)
 
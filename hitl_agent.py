@@ -1,8 +1,7 @@
 from dotenv import load_dotenv
 load_dotenv()
-import sqlite3
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.sqlite import SqliteSaver  # SQLite-based checkpoint
+from checkpointing import make_saver  # SQLite-based checkpoint (in-memory, or a durable file via CHECKPOINT_DB)
 from utils import show_graph
 
 # (For Postgres: from langgraph.checkpoint.postgres import PostgresSaver)
@@ -57,9 +56,9 @@ builder.add_edge("ai_decision", "human_review")  # AI decision -> human review
 builder.add_edge("human_review", "final_step")   # human review -> final step
 builder.add_edge("final_step", END)            # end
 
-# 4. Configure checkpointer: using SQLite (':memory:' for in-memory DB, or specify file path)
-conn = sqlite3.connect(":memory:", check_same_thread=False)  # connect to in-memory DB
-checkpointer = SqliteSaver(conn)  # create SqliteSaver with the connection object
+# 4. Configure checkpointer: SqliteSaver on ':memory:' by default; set CHECKPOINT_DB=<file> in .env
+#    for a durable WAL database with group commit and compressed checkpoints (survives restarts)
+checkpointer = make_saver()
 graph = builder.compile(checkpointer=checkpointer)
 show_graph(graph)
 
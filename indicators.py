@@ -0,0 +1,162 @@
+# indicators.py - Streaming moving averages and crossover signals with O(1) updates per tick
+import math
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of the most recent values with O(1) append and indexing."""
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._data = [0.0] * capacity
+        self._start = 0
+        self._len = 0
+
+    def append(self, value: float) -> None:
+        end = (self._start + self._len) % self.capacity
+        self._data[end] = value
+        if self._len < self.capacity:
+            self._len += 1
+        else:
+            self._start = (self._start + 1) % self.capacity  # the oldest value is overwritten
+
+    def __getitem__(self, index: int) -> float:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("ring buffer index out of range")
+        return self._data[(self._start + index) % self.capacity]
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self._data[(self._start + i) % self.capacity]
+
+    def last(self, n: int) -> list:
+        return [self[i] for i in range(max(self._len - n, 0), self._len)]
+
+
+class CrossoverDetector:
+    """
+    Turn (fast, slow) pairs into BUY/SELL regimes with a hysteresis band.
+
+    The regime switches to BUY only when fast > slow + band and to SELL only
+    when fast < slow - band; inside the band (including exact ties) the
+    previous regime is kept, so the signal does not flip on noise. The band
+    is `hysteresis` in price units, or a fraction of slow when relative=True.
+    """
+
+    def __init__(self, hysteresis: float = 0.0, relative: bool = False, initial: str = "HOLD"):
+        self.hysteresis = hysteresis
+        self.relative = relative
+        self.signal = initial
+        self.crossed = False  # True on the update where the regime changed
+
+    def update(self, fast: float, slow: float) -> str:
+        band = self.hysteresis * abs(slow) if self.relative else self.hysteresis
+        previous = self.signal
+        if fast > slow + band:
+            self.signal = "BUY"
+        elif fast < slow - band:
+            self.signal = "SELL"
+        self.crossed = self.signal != previous
+        return self.signal
+
+
+class IndicatorEngine:
+    """
+    Short/long moving averages over a price stream plus a crossover signal.
+
+    Prices live in one ring buffer sized for the longest window and every
+    window keeps a running sum, so an update costs O(1) regardless of window
+    length. Until a window is full its average is the mean of the prices
+    seen so far. mode="ema" uses exponential averages (alpha = 2 / (n + 1)),
+    seeded with that same warm-up mean. Running sums are re-summed every
+    `resync_every` ticks to stop floating-point drift.
+    """
+
+    def __init__(self, short_window: int, long_window: int, mode: str = "sma",
+                 hysteresis: float = 0.0, relative: bool = False, resync_every: int = 100_000):
+        if mode not in ("sma", "ema"):
+            raise ValueError("mode must be 'sma' or 'ema'")
+        self.short_window = short_window
+        self.long_window = long_window
+        self.mode = mode
+        self.windows = sorted({short_window, long_window})
+        self.prices = RingBuffer(max(self.windows))
+        self._sums = {w: 0.0 for w in self.windows}
+        self._ema = {w: None for w in self.windows}
+        self.crossover = CrossoverDetector(hysteresis, relative)
+        self.resync_every = resync_every
+        self.ticks = 0
+
+    def update(self, price: float) -> str:
+        """Add one price and return the current signal."""
+        price = float(price)
+        count = len(self.prices)
+        for w in self.windows:
+            if count >= w:
+                self._sums[w] -= self.prices[-w]  # the price leaving this window
+            self._sums[w] += price
+        self.prices.append(price)
+        self.ticks += 1
+        if self.ticks % self.resync_every == 0:
+            for w in self.windows:
+                self._sums[w] = math.fsum(self.prices.last(w))
+
+        if self.mode == "ema":
+            for w in self.windows:
+                if self.ticks <= w:
+                    self._ema[w] = self.sma(w)  # warm-up: mean of the prices so far
+                else:
+                    alpha = 2.0 / (w + 1)
+                    self._ema[w] += alpha * (price - self._ema[w])
+        return self.crossover.update(self.short_ma, self.long_ma)
+
+    def sma(self, window: int) -> float:
+        n = min(len(self.prices), window)
+        return self._sums[window] / n if n else 0.0
+
+    def average(self, window: int) -> float:
+        if self.mode == "ema":
+            return self._ema[window] if self._ema[window] is not None else 0.0
+        return self.sma(window)
+
+    @property
+    def short_ma(self) -> float:
+        return self.average(self.short_window)
+
+    @property
+    def long_ma(self) -> float:
+        return self.average(self.long_window)
+
+    @property
+    def signal(self) -> str:
+        return self.crossover.signal
+
+    @property
+    def crossed(self) -> bool:
+        return self.crossover.crossed
+
+
+if __name__ == "__main__":
+    import time
+    import random
+
+    random.seed(42)
+    prices = [1.08]
+    for _ in range(200_000):
+        prices.append(prices[-1] + random.gauss(0, 0.0005))
+
+    for short_window, long_window in ((3, 5), (50, 200), (200, 800)):
+        engine = IndicatorEngine(short_window, long_window)
+        start = time.perf_counter()
+        for p in prices:
+            engine.update(p)
+        elapsed = time.perf_counter() - start
+        naive = sum(prices[-long_window:]) / long_window
+        print(f"windows {short_window:3d}/{long_window:3d}: {len(prices) / elapsed:,.0f} ticks/s, "
+              f"long MA {engine.long_ma:.6f} (recomputed {naive:.6f}), signal {engine.signal}")
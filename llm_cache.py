@@ -0,0 +1,277 @@
+# llm_cache.py - Content-addressed LLM response cache (in-process LRU + on-disk SQLite)
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite")
+DEFAULT_TTL = float(os.getenv("LLM_CACHE_TTL", "0")) or None          # seconds, None = never expire
+DEFAULT_MEMORY_ITEMS = int(os.getenv("LLM_CACHE_MEMORY_ITEMS", "1024"))
+DEFAULT_DISK_ITEMS = int(os.getenv("LLM_CACHE_DISK_ITEMS", "100000"))
+
+# Request options that never change the generated content
+_IGNORED_OPTIONS = {"stream", "timeout", "extra_headers", "user"}
+
+
+def cache_enabled() -> bool:
+    """The cache is opt-in: set LLM_CACHE=1 in the environment (.env) to turn it on."""
+    return os.getenv("LLM_CACHE", "0").lower() in ("1", "true", "yes", "on")
+
+
+def make_key(model: str, messages, temperature=None, max_tokens=None, **options) -> str:
+    """Hash of everything that determines the completion (model, messages, sampling options)."""
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        **{k: v for k, v in options.items() if k not in _IGNORED_OPTIONS},
+    }
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier key/value cache for LLM responses.
+
+    The memory tier is an LRU of at most `max_memory_items`; the disk tier is a
+    SQLite table trimmed to `max_disk_items` by least-recent access. Entries
+    older than `ttl` seconds are treated as misses and removed.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 max_memory_items: int = DEFAULT_MEMORY_ITEMS, max_disk_items: int = DEFAULT_DISK_ITEMS):
+        self.path = path
+        self.ttl = ttl
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self._memory = OrderedDict()  # key -> (value, created_at)
+        self._lock = threading.Lock()
+        self._puts_since_trim = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed_at)")
+            self._conn.commit()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str):
+        """Return the cached value for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._memory[key]
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if not self._expired(created_at, now):
+                        self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        self._remember(key, value, created_at)
+                        self.disk_hits += 1
+                        return value
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._puts_since_trim += 1
+            if self._puts_since_trim >= 100:
+                self._trim()
+            self._conn.commit()
+
+    def _trim(self) -> None:
+        """Drop expired rows and the least recently used rows above the size limit."""
+        self._puts_since_trim = 0
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        if count > self.max_disk_items:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_disk_items,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+            "memory_items": len(self._memory),
+        }
+
+
+# ----- OpenAI client wrapper -----
+class _CachedCompletions:
+    """Drop-in replacement for client.chat.completions that consults the cache first."""
+
+    def __init__(self, completions, cache: LLMCache):
+        self._completions = completions
+        self._cache = cache
+        self._is_async = inspect.iscoroutinefunction(completions.create)
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+    @staticmethod
+    def _cacheable(kwargs: dict) -> bool:
+        # Streams and multi-sample requests are passed straight through
+        return not kwargs.get("stream") and kwargs.get("n", 1) == 1
+
+    def create(self, **kwargs):
+        if self._is_async:
+            return self._acreate(**kwargs)
+        if not self._cacheable(kwargs):
+            return self._completions.create(**kwargs)
+        from openai.types.chat import ChatCompletion
+
+        key = make_key(**kwargs)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return ChatCompletion.model_validate_json(cached)
+        completion = self._completions.create(**kwargs)
+        self._cache.put(key, completion.model_dump_json())
+        return completion
+
+    async def _acreate(self, **kwargs):
+        if not self._cacheable(kwargs):
+            return await self._completions.create(**kwargs)
+        from openai.types.chat import ChatCompletion
+
+        key = make_key(**kwargs)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return ChatCompletion.model_validate_json(cached)
+        completion = await self._completions.create(**kwargs)
+        self._cache.put(key, completion.model_dump_json())
+        return completion
+
+
+class _CachedChat:
+    def __init__(self, chat, cache: LLMCache):
+        self._chat = chat
+        self.completions = _CachedCompletions(chat.completions, cache)
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+
+class CachedClient:
+    """Proxy around an openai.Client / AsyncOpenAI whose chat completions are cached."""
+
+    def __init__(self, client, cache: LLMCache):
+        self._client = client
+        self.cache = cache
+        self.chat = _CachedChat(client.chat, cache)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# ----- LangChain adapter (ChatOpenAI and other LangChain LLMs) -----
+def _langchain_cache_class():
+    from langchain_core.caches import BaseCache
+    from langchain_core.load import dumps, loads
+
+    class LangChainLLMCache(BaseCache):
+        """LangChain BaseCache backed by an LLMCache instance."""
+
+        def __init__(self, cache: LLMCache):
+            self.cache = cache
+
+        @staticmethod
+        def _key(prompt: str, llm_string: str) -> str:
+            return hashlib.sha256(f"langchain\0{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+        def lookup(self, prompt, llm_string):
+            value = self.cache.get(self._key(prompt, llm_string))
+            return [loads(g) for g in json.loads(value)] if value is not None else None
+
+        def update(self, prompt, llm_string, return_val):
+            self.cache.put(self._key(prompt, llm_string), json.dumps([dumps(g) for g in return_val]))
+
+        def clear(self, **kwargs):
+            self.cache.clear()
+
+    return LangChainLLMCache
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    """Return the process-wide cache (created on first use)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+    return _default_cache
+
+
+def maybe_cached(client):
+    """Wrap an OpenAI client with the shared cache when LLM_CACHE is enabled."""
+    if not cache_enabled() or isinstance(client, CachedClient):
+        return client
+    return CachedClient(client, get_cache())
+
+
+def enable_llm_cache(force: bool = False) -> bool:
+    """Install the shared cache as LangChain's global LLM cache (when enabled or forced)."""
+    if not (force or cache_enabled()):
+        return False
+    from langchain_core.globals import set_llm_cache
+
+    set_llm_cache(_langchain_cache_class()(get_cache()))
+    return True
@@ -0,0 +1,246 @@
+# llm_clients.py - Process-wide registry of pooled OpenAI / LangChain clients
+import os
+import atexit
+import asyncio
+import threading
+import weakref
+
+import httpx
+import openai
+
+# Connection pool settings (override in .env)
+MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "600"))
+HTTP2_SETTING = os.getenv("LLM_HTTP2", "auto").lower()  # "auto", "1" or "0"
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def use_http2() -> bool:
+    if HTTP2_SETTING in ("0", "false", "no", "off"):
+        return False
+    return http2_available()
+
+
+class ConnectionMetrics:
+    """
+    Count requests and newly opened connections using httpcore's trace extension.
+    Every request that did not open a TCP connection reused a pooled one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+
+    def _record(self, event_name: str) -> None:
+        with self._lock:
+            if event_name in ("connection.connect_tcp.complete", "connection.connect_unix_socket.complete"):
+                self.connections += 1
+            elif event_name == "connection.start_tls.complete":
+                self.tls_handshakes += 1
+
+    def _trace(self, event_name, info):
+        self._record(event_name)
+
+    async def _atrace(self, event_name, info):
+        self._record(event_name)
+
+    def _on_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _aon_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._atrace
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            reused = max(self.requests - self.connections, 0)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections,
+                "tls_handshakes": self.tls_handshakes,
+                "reused": reused,
+                "reuse_ratio": reused / self.requests if self.requests else 0.0,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = self.connections = self.tls_handshakes = 0
+
+
+metrics = ConnectionMetrics()
+
+_lock = threading.Lock()
+_http_client = None
+_async_http_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+_openai_clients = {}
+_async_openai_clients = weakref.WeakKeyDictionary()  # event loop -> {key: AsyncOpenAI}
+_chat_models = {}
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """The shared sync connection pool behind every sync client in this process."""
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.Client(
+                limits=_limits(), http2=use_http2(), timeout=HTTP_TIMEOUT,
+                event_hooks={"request": [metrics._on_request]},
+            )
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    The shared async connection pool for the running event loop.
+    Async connections belong to the loop that opened them, so every loop
+    (e.g. each asyncio.run) gets its own pool.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_http_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=_limits(), http2=use_http2(), timeout=HTTP_TIMEOUT,
+                event_hooks={"request": [metrics._aon_request]},
+            )
+            _async_http_clients[loop] = client
+        return client
+
+
+def _client_key(api_key, base_url, options: dict):
+    return api_key, base_url, tuple(sorted(options.items()))
+
+
+def get_openai_client(api_key: str = None, base_url: str = None, **options) -> openai.OpenAI:
+    """Shared openai.OpenAI per (api_key, base_url, options); all of them use one pool."""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    key = _client_key(api_key, base_url, options)
+    client = _openai_clients.get(key)
+    if client is None:
+        http_client = get_http_client()
+        with _lock:
+            client = _openai_clients.get(key)
+            if client is None:
+                client = openai.OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, **options)
+                _openai_clients[key] = client
+    return client
+
+
+def get_async_openai_client(api_key: str = None, base_url: str = None, **options) -> openai.AsyncOpenAI:
+    """Shared openai.AsyncOpenAI for the running event loop; call from inside a coroutine."""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    key = _client_key(api_key, base_url, options)
+    loop = asyncio.get_running_loop()
+    http_client = get_async_http_client()
+    with _lock:
+        clients = _async_openai_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client, **options)
+            clients[key] = client
+        return client
+
+
+def _chat_model_class():
+    try:
+        from langchain_openai import ChatOpenAI
+    except ImportError:
+        from langchain.chat_models import ChatOpenAI
+    return ChatOpenAI
+
+
+def get_chat_model(model: str = "gpt-3.5-turbo", temperature: float = 0, **kwargs):
+    """
+    Shared LangChain ChatOpenAI per (model, temperature, kwargs), sending its
+    requests through the pooled sync client. Async calls (ainvoke) use the
+    library's own async client.
+    """
+    key = (model, temperature, tuple(sorted(kwargs.items())))
+    llm = _chat_models.get(key)
+    if llm is None:
+        http_client = get_http_client()
+        with _lock:
+            llm = _chat_models.get(key)
+            if llm is None:
+                llm = _chat_model_class()(model=model, temperature=temperature, http_client=http_client, **kwargs)
+                _chat_models[key] = llm
+    return llm
+
+
+def connection_stats() -> dict:
+    """Requests, opened connections and reuse ratio across all registry clients."""
+    stats = metrics.snapshot()
+    stats["http2"] = use_http2()
+    stats["openai_clients"] = len(_openai_clients)
+    stats["chat_models"] = len(_chat_models)
+    return stats
+
+
+def close_all() -> None:
+    global _http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+        _openai_clients.clear()
+        _chat_models.clear()
+
+
+atexit.register(close_all)
+
+
+if __name__ == "__main__":
+    import time
+    import argparse
+    from translation_engine import _start_fake_openai_server
+
+    parser = argparse.ArgumentParser(description="Compare per-call clients with the shared registry")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    server = _start_fake_openai_server(latency=0.0, error_rate=0.0)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    messages = [{"role": "user", "content": "hello"}]
+
+    def bench(label, make_client):
+        metrics.reset()
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            make_client().chat.completions.create(model="fake-model", messages=messages)
+        elapsed = time.perf_counter() - start
+        stats = metrics.snapshot()
+        print(f"{label:22s} {args.requests / elapsed:8.1f} req/s, "
+              f"connections={stats['connections_opened']}, reuse={stats['reuse_ratio']:.0%}")
+
+    def per_call_client():
+        # a new pool per call (the old pattern), traced so its connections are counted too
+        return openai.OpenAI(api_key="fake", base_url=base_url, http_client=httpx.Client(
+            event_hooks={"request": [metrics._on_request]}))
+
+    bench("new client per call", per_call_client)
+    bench("shared registry", lambda: get_openai_client(api_key="fake", base_url=base_url))
+    print(connection_stats())
+    server.shutdown()
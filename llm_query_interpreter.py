@@ -3,9 +3,14 @@ from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())  # .env 파일 로드
 openai_api_key = os.getenv('OPENAI_API_KEY')
 import json
-from langchain.chat_models import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
+from llm_cache import LLMCache, enable_llm_cache, make_key
+from llm_clients import get_chat_model
+from ticker_index import analysis_type_for, get_index
+
+# Serve repeated prompts from the shared response cache when LLM_CACHE=1
+enable_llm_cache()
 from dataclasses import dataclass
 
 @dataclass
@@ -18,18 +23,10 @@ class AnalysisState:
     report_saved: bool = False   # 보고서 저장 여부
     financial_data: dict = None  # 재무 데이터 (yfinance에서 수집한 데이터)
 
-def query_interpret(state: AnalysisState) -> AnalysisState:
-    """
-    사용자의 질의를 LLMChain을 이용하여 해석하고, 기업 이름, 티커, 분석 유형을 추출합니다.
-    모델은 입력 문장을 분석해 JSON 형태의 결과(예: {"company": "애플", "ticker": "AAPL", "analysis_type": "credit_risk"})를 반환합니다.
-    """
-    # ChatOpenAI 모델 초기화 (필요 시 temperature, model_name 등 조정)
-    llm = ChatOpenAI(temperature=0, model_name="gpt-3.5-turbo")
-    
-    # PromptTemplate 정의 - JSON 리터럴 부분에서 중괄호를 이스케이프 처리함
-    prompt = PromptTemplate(
-        input_variables=["user_input"],
-        template="""다음 사용자 질의를 분석하여 기업 이름, 티커 및 분석 유형을 JSON 형식으로 반환하세요.
+# 질의 해석 프롬프트 (체인은 처음 LLM이 필요할 때 한 번만 생성)
+QUERY_PROMPT = PromptTemplate(
+    input_variables=["user_input"],
+    template="""다음 사용자 질의를 분석하여 기업 이름, 티커 및 분석 유형을 JSON 형식으로 반환하세요.
         
 사용자 질의: {user_input}
 
@@ -45,40 +42,77 @@ def query_interpret(state: AnalysisState) -> AnalysisState:
 반환 형식은 반드시 다음과 같이 JSON 형태여야 합니다:
 {{"company": "<기업명>", "ticker": "<티커>", "analysis_type": "<분석유형>"}}
 """
-    )
-    
-    # LLMChain 생성
-    chain = LLMChain(llm=llm, prompt=prompt)
-    
+)
+
+_chain = None
+_interpretation_cache = None
+
+
+def get_chain() -> LLMChain:
+    global _chain
+    if _chain is None:
+        # 레지스트리의 공유 ChatOpenAI 사용 (필요 시 temperature, model 등 조정)
+        llm = get_chat_model("gpt-3.5-turbo", temperature=0)
+        _chain = LLMChain(llm=llm, prompt=QUERY_PROMPT)
+    return _chain
+
+
+def get_interpretation_cache() -> LLMCache:
+    """이전 LLM 해석 결과 캐시 (메모리 LRU + SQLite)"""
+    global _interpretation_cache
+    if _interpretation_cache is None:
+        _interpretation_cache = LLMCache(path=os.getenv("QUERY_CACHE_PATH", ".query_cache.sqlite"))
+    return _interpretation_cache
+
+
+def interpretation_key(user_input: str) -> str:
+    # 대소문자와 공백 차이는 같은 질의로 취급
+    normalized = " ".join(user_input.lower().split())
+    return make_key("query_interpret", [normalized])
+
+
+def apply_interpretation(state: AnalysisState, result: dict) -> AnalysisState:
+    state.company = result.get("company", state.company)
+    state.ticker = result.get("ticker", state.ticker)
+    state.analysis_type = result.get("analysis_type", state.analysis_type)
+    return state
+
+
+def query_interpret(state: AnalysisState) -> AnalysisState:
+    """
+    사용자의 질의를 해석하여 기업 이름, 티커, 분석 유형을 추출합니다.
+    1) 기업명/별칭 인덱스(Aho-Corasick)에서 바로 찾고,
+    2) 없으면 이전 LLM 해석 캐시를 확인하며,
+    3) 둘 다 없을 때만 LLMChain을 호출합니다.
+    모델은 JSON 형태의 결과(예: {"company": "애플", "ticker": "AAPL", "analysis_type": "credit_risk"})를 반환합니다.
+    """
+    match = get_index().lookup(state.user_input)
+    if match:
+        state.company, state.ticker = match
+        state.analysis_type = analysis_type_for(state.user_input)
+        return state
+
+    cache = get_interpretation_cache()
+    key = interpretation_key(state.user_input)
+    cached = cache.get(key)
+    if cached is not None:
+        return apply_interpretation(state, json.loads(cached))
+
     # 체인을 실행하여 JSON 결과 생성
-    result_json = chain.run({"user_input": state.user_input})
+    result_json = get_chain().run({"user_input": state.user_input})
     
     # JSON 파싱 후 상태 업데이트
     try:
         result = json.loads(result_json)
-        state.company = result.get("company", state.company)
-        state.ticker = result.get("ticker", state.ticker)
-        state.analysis_type = result.get("analysis_type", state.analysis_type)
+        apply_interpretation(state, result)
+        cache.put(key, json.dumps(result, ensure_ascii=False))
     except Exception as e:
         # JSON 파싱 실패 시 기존 룰 기반 처리
-        query = state.user_input.lower()
-        if "credit" in query or "신용" in query:
-            state.analysis_type = "credit_risk"
-        else:
-            state.analysis_type = "general"
+        state.analysis_type = analysis_type_for(state.user_input)
         words = state.user_input.split()
         if words:
             state.company = words[0]
-        company_to_ticker = {
-            "애플": "AAPL",
-            "삼성전자": "005930.KS",
-            "google": "GOOGL",
-            "apple": "AAPL"
-        }
-        if state.company in company_to_ticker:
-            state.ticker = company_to_ticker[state.company]
-        else:
-            state.ticker = state.company
+        state.ticker = state.company
     return state
 
 # 사용 예시
@@ -88,3 +122,9 @@ if __name__ == "__main__":
     updated_state = query_interpret(initial_state)
     print("업데이트된 상태:")
     print(updated_state)
+
+    # 인덱스 조회 지연 시간 측정
+    import timeit
+    n = 10000
+    seconds = timeit.timeit(lambda: query_interpret(AnalysisState(user_input="삼성전자 신용 위험 분석해줘")), number=n)
+    print(f"인덱스 해석: {seconds / n * 1e6:.1f} µs/질의")
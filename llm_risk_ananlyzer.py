@@ -14,28 +14,18 @@ class AnalysisState:
     financial_data: dict = None  # 재무 데이터 (yfinance에서 수집한 데이터)
 
 import json
-from langchain.chat_models import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
+from llm_cache import enable_llm_cache
+from llm_clients import get_chat_model
 
-def risk_analyzer(state: AnalysisState) -> AnalysisState:
-    data = state.financial_data
-    if not data:
-        state.analysis_summary = "분석할 금융 데이터가 없습니다."
-        return state
+# Serve repeated prompts from the shared response cache when LLM_CACHE=1
+enable_llm_cache()
 
-    # 재무 지표 추출 (값이 없으면 None)
-    dte = data.get("debtToEquity")      # 부채비율 (예: 1.5 -> 150%)
-    icr = data.get("interest_cover")      # 이자보상배율
-    curr = data.get("currentRatio")       # 유동비율
-
-    # LLM을 활용해 재무 지표 기반 신용 리스크 평가 요약 생성
-    llm = ChatOpenAI(temperature=0, model_name="gpt-3.5-turbo")
-    
-    # PromptTemplate 정의 (수치가 None인 경우 "N/A" 처리)
-    prompt_template = PromptTemplate(
-        input_variables=["dte", "icr", "curr"],
-        template="""다음은 기업의 주요 재무 지표입니다.
+# PromptTemplate 정의 (수치가 None인 경우 "N/A" 처리)
+RISK_PROMPT = PromptTemplate(
+    input_variables=["dte", "icr", "curr"],
+    template="""다음은 기업의 주요 재무 지표입니다.
 부채비율 (Debt-to-Equity): {dte}
 이자보상배율 (Interest Coverage Ratio): {icr}
 유동비율 (Current Ratio): {curr}
@@ -46,11 +36,32 @@ def risk_analyzer(state: AnalysisState) -> AnalysisState:
 '부채비율이 높아 재무 건전성에 부담이 있으며, 이자보상배율이 낮아 이자 지급에 어려움이 예상됩니다. 또한 유동비율이 1 미만으로 단기 채무 상환에 위험이 있으므로, 해당 기업의 신용 리스크는 높은 편입니다.'
 반드시 구체적인 수치와 함께 평가 내용을 포함해 주세요.
 """
-    )
-    
-    # LLMChain 생성
-    chain = LLMChain(llm=llm, prompt=prompt_template)
-    
+)
+
+_chain = None
+
+
+def get_chain() -> LLMChain:
+    """LLMChain은 처음 호출될 때 한 번만 생성하고 공유 ChatOpenAI를 재사용합니다."""
+    global _chain
+    if _chain is None:
+        # LLM을 활용해 재무 지표 기반 신용 리스크 평가 요약 생성
+        llm = get_chat_model("gpt-3.5-turbo", temperature=0)
+        _chain = LLMChain(llm=llm, prompt=RISK_PROMPT)
+    return _chain
+
+
+def risk_analyzer(state: AnalysisState) -> AnalysisState:
+    data = state.financial_data
+    if not data:
+        state.analysis_summary = "분석할 금융 데이터가 없습니다."
+        return state
+
+    # 재무 지표 추출 (값이 없으면 None)
+    dte = data.get("debtToEquity")      # 부채비율 (예: 1.5 -> 150%)
+    icr = data.get("interest_cover")      # 이자보상배율
+    curr = data.get("currentRatio")       # 유동비율
+
     # 입력값 준비: None이면 "N/A"로 대체
     input_values = {
         "dte": f"{dte:.2f}" if isinstance(dte, (int, float)) else "N/A",
@@ -60,7 +71,7 @@ def risk_analyzer(state: AnalysisState) -> AnalysisState:
     
     # 체인 실행하여 요약 생성 (LLM이 반환하는 결과 문자열)
     try:
-        summary = chain.run(input_values).strip()
+        summary = get_chain().run(input_values).strip()
     except Exception as e:
         summary = f"LLM 기반 신용 리스크 분석 생성 중 오류 발생: {e}"
     
@@ -0,0 +1,248 @@
+# mcp_session_pool.py - Long-lived MCP sessions shared by sync and async LangGraph nodes
+import asyncio
+import atexit
+import threading
+from dataclasses import dataclass, field
+
+import anyio
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from langchain_core.tools import StructuredTool
+from langchain_mcp_adapters.tools import load_mcp_tools
+
+# Errors that mean the server process (or its pipes) went away and a restart may help
+CONNECTION_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    BrokenPipeError,
+    ConnectionError,
+    EOFError,
+)
+
+
+@dataclass
+class _ServerHandle:
+    """Runtime state of one warm MCP server connection."""
+    params: StdioServerParameters
+    session: ClientSession = None
+    tools: list = field(default_factory=list)
+    task: asyncio.Task = None
+    stop: asyncio.Event = None
+    lock: asyncio.Lock = None
+    restarts: int = 0
+
+
+class MCPSessionPool:
+    """
+    Keep MCP server processes warm and share their sessions across calls.
+
+    Every session lives on one background event loop, so synchronous LangGraph
+    nodes (call_tool) and async nodes running on another loop (acall_tool,
+    get_tools) can use the same connections. The tool list of each server is
+    loaded once per connection, and a dead server is restarted transparently
+    before the call is retried.
+    """
+
+    def __init__(self, servers: dict = None, max_restarts: int = 3):
+        # servers: name -> StdioServerParameters (or a dict with "command"/"args")
+        self._servers = {}
+        self._handles = {}
+        self.max_restarts = max_restarts
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        for name, params in (servers or {}).items():
+            self.register(name, params)
+
+    # ----- configuration -----
+    def register(self, name: str, params) -> None:
+        """Register a server; the process is only spawned on first use."""
+        if isinstance(params, dict):
+            params = StdioServerParameters(**params)
+        self._servers[name] = params
+
+    # ----- background loop -----
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="mcp-session-pool", daemon=True
+                )
+                self._thread.start()
+        return self._loop
+
+    def _submit(self, coro):
+        """Schedule a coroutine on the pool loop and return a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def _run_sync(self, coro):
+        if self._thread is not None and threading.current_thread() is self._thread:
+            raise RuntimeError("Synchronous pool calls cannot be made from the pool's own loop")
+        return self._submit(coro).result()
+
+    async def _run_async(self, coro):
+        return await asyncio.wrap_future(self._submit(coro))
+
+    # ----- connection lifecycle (runs on the pool loop) -----
+    async def _serve(self, handle: _ServerHandle, ready: asyncio.Future):
+        """Hold the stdio/session context managers open until asked to stop."""
+        try:
+            async with stdio_client(handle.params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    tools = await load_mcp_tools(session)
+                    handle.session, handle.tools = session, tools
+                    ready.set_result(session)
+                    await handle.stop.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            handle.session = None
+
+    async def _connect(self, name: str) -> _ServerHandle:
+        handle = self._handles.get(name)
+        if handle is None:
+            if name not in self._servers:
+                raise KeyError(f"Unknown MCP server: {name}")
+            handle = _ServerHandle(params=self._servers[name], lock=asyncio.Lock())
+            self._handles[name] = handle
+        async with handle.lock:
+            if handle.session is not None and handle.task is not None and not handle.task.done():
+                return handle
+            handle.stop = asyncio.Event()
+            ready = asyncio.get_running_loop().create_future()
+            handle.task = asyncio.create_task(self._serve(handle, ready))
+            await ready
+            return handle
+
+    async def _disconnect(self, name: str) -> None:
+        handle = self._handles.get(name)
+        if handle is None or handle.task is None:
+            return
+        handle.stop.set()
+        try:
+            await asyncio.wait_for(handle.task, timeout=5)
+        except (asyncio.TimeoutError, Exception):
+            handle.task.cancel()
+        handle.task = None
+
+    async def _restart(self, name: str) -> _ServerHandle:
+        handle = self._handles[name]
+        if handle.restarts >= self.max_restarts:
+            raise RuntimeError(f"MCP server '{name}' failed {handle.restarts} times; giving up")
+        handle.restarts += 1
+        print(f"[MCP pool] restarting server '{name}' (attempt {handle.restarts})")
+        await self._disconnect(name)
+        return await self._connect(name)
+
+    async def _call(self, name: str, tool_name: str, arguments: dict):
+        handle = await self._connect(name)
+        try:
+            return await self._invoke(handle, tool_name, arguments)
+        except CONNECTION_ERRORS:
+            handle = await self._restart(name)
+            return await self._invoke(handle, tool_name, arguments)
+
+    @staticmethod
+    async def _invoke(handle: _ServerHandle, tool_name: str, arguments: dict):
+        tool = next((t for t in handle.tools if t.name == tool_name), None)
+        if tool is None:
+            raise KeyError(f"Tool '{tool_name}' is not provided by this server")
+        result = await tool.ainvoke(arguments)
+        handle.restarts = 0  # a successful call resets the restart budget
+        return result
+
+    async def _tools(self, name: str) -> list:
+        return list((await self._connect(name)).tools)
+
+    async def _close_all(self) -> None:
+        for name in list(self._handles):
+            await self._disconnect(name)
+
+    # ----- public API -----
+    def call_tool(self, server: str, tool_name: str, arguments: dict = None):
+        """Call a tool from synchronous code (e.g. a plain LangGraph node)."""
+        return self._run_sync(self._call(server, tool_name, arguments or {}))
+
+    async def acall_tool(self, server: str, tool_name: str, arguments: dict = None):
+        """Call a tool from any event loop; the work runs on the pool loop."""
+        return await self._run_async(self._call(server, tool_name, arguments or {}))
+
+    async def get_tools(self, server: str, names: list = None) -> list:
+        """
+        Return LangChain tools for a server that are safe to use on the caller's loop.
+        The tool list is cached per connection; each tool forwards to the pool.
+        """
+        tools = await self._run_async(self._tools(server))
+        return [self._bridge(server, t) for t in tools if names is None or t.name in names]
+
+    def get_tools_sync(self, server: str, names: list = None) -> list:
+        tools = self._run_sync(self._tools(server))
+        return [self._bridge(server, t) for t in tools if names is None or t.name in names]
+
+    def _bridge(self, server: str, tool) -> StructuredTool:
+        """Wrap a cached MCP tool so it can be invoked from outside the pool loop."""
+        return self.bridge_tool(server, tool.name, tool.description, tool.args_schema)
+
+    def bridge_tool(self, server: str, name: str, description: str, args_schema) -> StructuredTool:
+        """
+        Build a tool that forwards to `server` without connecting to it first
+        (e.g. from a saved tool manifest); the server starts on the first call.
+        """
+        async def _acall(**kwargs):
+            return await self.acall_tool(server, name, kwargs)
+
+        def _call(**kwargs):
+            return self.call_tool(server, name, kwargs)
+
+        return StructuredTool(
+            name=name,
+            description=description,
+            args_schema=args_schema,
+            func=_call,
+            coroutine=_acall,
+        )
+
+    async def aconnect(self, server: str) -> None:
+        """Start a server (if it is not running yet) from any event loop."""
+        await self._run_async(self._connect(server))
+
+    def is_connected(self, server: str) -> bool:
+        handle = self._handles.get(server)
+        return handle is not None and handle.session is not None
+
+    def restart(self, server: str) -> None:
+        """Force a server restart (e.g. after editing its script)."""
+        self._run_sync(self._restart(server))
+
+    def close(self) -> None:
+        """Stop every server process and the background loop."""
+        if self._loop is None:
+            return
+        try:
+            self._run_sync(self._close_all())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+            self._thread = None
+
+
+# Process-wide default pool used by the example clients
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_pool() -> MCPSessionPool:
+    """Return the shared pool, creating it on first use."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = MCPSessionPool()
+            atexit.register(_default_pool.close)
+    return _default_pool
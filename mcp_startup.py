@@ -0,0 +1,167 @@
+# mcp_startup.py - Lazy client initialization and a cold-start profiler for the MCP servers
+#
+# Import this module first in a server script, build heavy clients with @lazy
+# and call ready() just before mcp.run():
+#
+#     from mcp_startup import lazy, ready
+#     from mcp.server.fastmcp import FastMCP
+#
+#     @lazy("tavily")
+#     def get_tavily_client():
+#         from tavily import TavilyClient      # deferred import
+#         return TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+#
+#     if __name__ == "__main__":
+#         ready("WebSearchService")
+#         mcp.run(transport="stdio")
+#
+# `python server.py --profile-startup` (or MCP_PROFILE_STARTUP=1) then prints
+# the import-time breakdown, the time to ready and the init time of every lazy
+# client to stderr and exits, so cold start can be tracked as a regression
+# metric. Set MCP_STARTUP_PROFILE_PATH to also append the report as a JSON line.
+import os
+import sys
+import json
+import time
+import builtins
+import functools
+import threading
+
+PROFILE_FLAG = "--profile-startup"
+PROFILE_PATH = os.getenv("MCP_STARTUP_PROFILE_PATH")
+
+_T0 = time.perf_counter()
+
+
+def profiling_enabled() -> bool:
+    return PROFILE_FLAG in sys.argv or os.getenv("MCP_PROFILE_STARTUP", "0").lower() in ("1", "true", "yes")
+
+
+class StartupProfiler:
+    """
+    Records where a server spends its cold start.
+
+    Import times are collected by wrapping builtins.__import__ (only while
+    profiling, until ready()): each import statement of the server script is
+    charged with everything it imports transitively, so the report matches
+    what a line in the script costs. Imports deferred into lazy factories are
+    part of that client's init time instead.
+    """
+
+    def __init__(self):
+        self.imports = {}   # module -> seconds (outermost import statements only)
+        self.inits = {}     # lazy client -> seconds spent in its factory
+        self._depth = 0
+        self._lock = threading.Lock()
+        self._original_import = None
+
+    def install(self) -> None:
+        if self._original_import is not None:
+            return
+        self._original_import = original = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            # only the server script's own import statements are timed
+            if self._depth or not globals or globals.get("__name__") != "__main__":
+                return original(name, globals, locals, fromlist, level)
+            self._depth += 1
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._depth -= 1
+                self.imports[name] = self.imports.get(name, 0.0) + time.perf_counter() - start
+
+        builtins.__import__ = timed_import
+
+    def uninstall(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def record_init(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.inits[name] = seconds
+
+    def report(self, server: str, ready_seconds: float) -> dict:
+        return {
+            "server": server,
+            "ready_seconds": round(ready_seconds, 4),
+            "import_seconds": round(sum(self.imports.values()), 4),
+            "imports": {k: round(v, 4) for k, v in sorted(self.imports.items(), key=lambda kv: -kv[1])},
+            "init_seconds": round(sum(self.inits.values()), 4),
+            "inits": {k: round(v, 4) for k, v in self.inits.items()},
+        }
+
+
+profiler = StartupProfiler()
+if profiling_enabled():
+    profiler.install()
+
+_lazy_clients = {}  # name -> getter
+
+
+def lazy(name: str):
+    """
+    Decorator for a zero-argument factory: the client is built on the first
+    call (thread-safe, once) and the same instance is returned afterwards.
+    Put heavy imports inside the factory so they are deferred too.
+    """
+
+    def decorator(factory):
+        lock = threading.Lock()
+        instance = []
+
+        @functools.wraps(factory)
+        def getter():
+            if not instance:
+                with lock:
+                    if not instance:
+                        start = time.perf_counter()
+                        try:
+                            instance.append(factory())
+                        finally:
+                            profiler.record_init(name, time.perf_counter() - start)
+            return instance[0]
+
+        getter.initialized = lambda: bool(instance)
+        _lazy_clients[name] = getter
+        return getter
+
+    return decorator
+
+
+def print_report(report: dict, file=None) -> None:
+    file = file or sys.stderr  # stdout carries the stdio MCP protocol
+    print(f"[startup] {report['server']}: ready in {report['ready_seconds']:.3f}s "
+          f"(imports {report['import_seconds']:.3f}s), lazy init {report['init_seconds']:.3f}s", file=file)
+    for module, seconds in report["imports"].items():
+        print(f"  import {module:40s} {seconds * 1000:9.1f} ms", file=file)
+    for client, seconds in report["inits"].items():
+        print(f"  init   {client:40s} {seconds * 1000:9.1f} ms", file=file)
+
+
+def ready(server: str) -> None:
+    """
+    Mark the end of module-level startup (measured from the import of this
+    module). Without the profile flag this does nothing. With it, every lazy
+    client is built once to time it, the report is printed to stderr (and
+    appended to MCP_STARTUP_PROFILE_PATH) and the process exits instead of
+    serving.
+    """
+    if not profiling_enabled():
+        return
+    ready_seconds = time.perf_counter() - _T0
+    profiler.uninstall()
+    for name, getter in _lazy_clients.items():
+        try:
+            getter()
+        except Exception as e:
+            print(f"[startup] {name}: init failed: {str(e).splitlines()[0]}", file=sys.stderr)
+    report = profiler.report(server, ready_seconds)
+    print_report(report)
+    if PROFILE_PATH:
+        report["timestamp"] = time.time()
+        with open(PROFILE_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    sys.exit(0)
@@ -5,7 +5,7 @@ from typing_extensions import TypedDict
 from operator import add
 from langchain_core.messages import RemoveMessage, AIMessage, HumanMessage
 from langgraph.graph import add_messages
-from langchain_openai import ChatOpenAI
+from llm_clients import get_chat_model
 
 def manage_list(existing: list, updates: Union[list, dict]):
     if isinstance(updates, list):
@@ -67,7 +67,7 @@ def summarize_conversation(state: State):
 
     # Add prompt to our history
     messages = state["messages"] + [HumanMessage(content=summary_message)]
-    model = ChatOpenAI(temperature=0, streaming=True, model="gpt-4o")
+    model = get_chat_model("gpt-4o", temperature=0, streaming=True)
     response = model.invoke(messages)
 
     # Delete all but the 2 most recent messages
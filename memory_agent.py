@@ -32,9 +32,11 @@ graph_builder.add_edge(START, "Chatbot")
 graph_builder.add_edge("Chatbot", END)
 
 # 메모리 체크포인터 지정 – MemorySaver 사용 (단기 메모리 유지)&#8203;:contentReference[oaicite:31]{index=31}
-from langgraph.checkpoint.memory import MemorySaver
-memory_saver = MemorySaver()
-graph = graph_builder.compile(checkpointer=memory_saver)  # MemorySaver로 그래프 컴파일 (상태 체크포인트 활성화)
+# 긴 대화에서도 저장량이 선형으로 늘도록 messages는 직전 체크포인트 대비 델타로 저장 (주기적 전체 스냅샷)
+# 보존 정책: CHECKPOINT_KEEP_LAST(최근 N개), CHECKPOINT_MAX_AGE_HOURS(최근 T시간) - 백그라운드 압축으로 정리
+from delta_checkpointer import DeltaCheckpointSaver
+memory_saver = DeltaCheckpointSaver()
+graph = graph_builder.compile(checkpointer=memory_saver)  # DeltaCheckpointSaver로 그래프 컴파일 (상태 체크포인트 활성화)
 show_graph(graph)
 # ※ 영속적 저장이 필요할 경우 SQLite 체크포인터로 교체 가능 (별도 설치 필요)
 # from langgraph_checkpoint_sqlite import SqliteSaver
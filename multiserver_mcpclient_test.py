@@ -1,8 +1,6 @@
 import asyncio
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
+from agent_host import AgentHost
+from llm_clients import get_chat_model
 from dotenv import load_dotenv
 import os
 from src_langgraph.utils import show_graph
@@ -28,42 +26,43 @@ questions = [
 
 
 # Define llm
-model = ChatOpenAI(model="gpt-4o")
+model = get_chat_model("gpt-4o")
+
+# Define MCP servers (started lazily, shared by all questions)
+SERVERS = {
+    "tavily": {
+        "command": python_command,
+        "args": [server_script_path+"tavily_search.py"],
+        "transport": "stdio",
+    },
+    "youtube_transcript": {
+        "command": python_command,
+        "args": [server_script_path+"yt_transcript.py"],
+        "transport": "stdio",
+    }, 
+    # "weather": {
+    # "url": "http://localhost:8000/sse", # start your weather server on port 8000
+    # "transport": "sse",
+    # }
+}
 
-# Define MCP servers
 async def run_agent():
-    async with MultiServerMCPClient(
-        {
-            "tavily": {
-                "command": python_command,
-                "args": [server_script_path+"tavily_search.py"],
-                "transport": "stdio",
-            },
-            "youtube_transcript": {
-                "command": python_command,
-                "args": [server_script_path+"yt_transcript.py"],
-                "transport": "stdio",
-            }, 
-            # "weather": {
-            # "url": "http://localhost:8000/sse", # start your weather server on port 8000
-            # "transport": "sse",
-            # }
-        }
-    ) as client:
-        # Load available tools
-        tools = client.get_tools()
-        agent = create_react_agent(model, tools)
-        show_graph(agent)
-        # Add system message
-        system_message = SystemMessage(content=(
-                "You have access to multiple tools that can help answer queries. "
-                "Use them dynamically and efficiently based on the user's request. "
-        ))
+    host = AgentHost(SERVERS, model)
+    await host.start()
+    show_graph(host.agent)
+
+    # 모든 질문을 공유 세션 위에서 동시에 실행
+    answers = await host.ask_many(questions)
+    for q, answer in zip(questions, answers):
+        print(f"Q: {q}\nA: {answer}\n{'-'*40}")
 
-        for q in questions:
-            result = await agent.ainvoke({"messages": q})
-            answer = result["messages"][-1].content  # 최종 Assistant 답변 메시지
-            print(f"Q: {q}\nA: {answer}\n{'-'*40}")
+    # 시작 시간과 질의별 지연 시간 보고
+    metrics = host.metrics()
+    print("startup:", metrics["startup_seconds"])
+    print("server start:", metrics["server_start_seconds"])
+    print(f"queries: {metrics['queries']}, p50 {metrics['latency_p50']:.2f}s, "
+          f"p95 {metrics['latency_p95']:.2f}s, max {metrics['latency_max']:.2f}s")
+    host.close()
 
 # Run the agent
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+# news_index.py - Persistent seen-articles index for incremental news ingestion
+import os
+import re
+import sqlite3
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_INDEX_PATH = os.getenv("NEWS_INDEX_PATH", "news_index.sqlite")
+
+# Query parameters that only track the click and never change the article
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "ref_src", "cmpid", "mc_cid", "mc_eid", "ocid"}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of an article URL (scheme/host case, www., tracking params, fragment, trailing /)."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme,
+                       host, path, urlencode(sorted(query)), ""))
+
+
+def content_hash(article: dict) -> str:
+    """Hash of the article text, so the same story under a different URL is still recognised."""
+    text = " ".join(article.get(k) or "" for k in ("title", "description"))
+    text = re.sub(r"\s+", " ", text).strip().lower()
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def topic_key(topics) -> str:
+    """Stable key for a topic set, independent of order and case."""
+    if isinstance(topics, str):
+        topics = [topics]
+    return "|".join(sorted({t.strip().lower() for t in topics if t and t.strip()}))
+
+
+class SeenArticleIndex:
+    """
+    SQLite index of articles already processed, plus the newest `publishedAt`
+    seen for each topic set (the high-water mark used for the next fetch).
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS seen_articles (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                topic_key TEXT NOT NULL,
+                published_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS seen_articles_hash ON seen_articles(content_hash);
+            CREATE TABLE IF NOT EXISTS watermarks (
+                topic_key TEXT PRIMARY KEY,
+                published_at TEXT NOT NULL
+            );
+            """
+        )
+        self.conn.commit()
+
+    def watermark(self, key: str):
+        """Newest publishedAt already ingested for this topic set (ISO 8601), or None."""
+        row = self.conn.execute("SELECT published_at FROM watermarks WHERE topic_key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def is_seen(self, article: dict) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM seen_articles WHERE url = ? OR content_hash = ? LIMIT 1",
+            (normalize_url(article.get("url")), content_hash(article)),
+        ).fetchone()
+        return row is not None
+
+    def filter_new(self, articles: list) -> list:
+        """Drop articles already in the index and duplicates within this batch."""
+        fresh, batch_urls, batch_hashes = [], set(), set()
+        for article in articles:
+            url, digest = normalize_url(article.get("url")), content_hash(article)
+            if url in batch_urls or digest in batch_hashes or self.is_seen(article):
+                continue
+            batch_urls.add(url)
+            batch_hashes.add(digest)
+            fresh.append(article)
+        return fresh
+
+    def mark_seen(self, articles: list, key: str) -> None:
+        """Record articles as processed and advance the topic's high-water mark."""
+        newest = self.watermark(key)
+        with self.conn:
+            for article in articles:
+                published = article.get("publishedAt")
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO seen_articles (url, content_hash, topic_key, published_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (normalize_url(article.get("url")), content_hash(article), key, published),
+                )
+                # ISO 8601 UTC timestamps ("2025-01-01T09:00:00Z") compare correctly as strings
+                if published and (newest is None or published > newest):
+                    newest = published
+            if newest:
+                self.conn.execute(
+                    "INSERT INTO watermarks (topic_key, published_at) VALUES (?, ?) "
+                    "ON CONFLICT(topic_key) DO UPDATE SET published_at = excluded.published_at",
+                    (key, newest),
+                )
+
+    def close(self) -> None:
+        self.conn.close()
@@ -1,4 +1,5 @@
 # news_mcp_server.py - 뉴스 API MCP 서버 예시
+from mcp_startup import ready  # first import: times the imports below with --profile-startup
 from mcp.server.fastmcp import FastMCP
 import os, requests
 
@@ -20,4 +21,5 @@ def get_top_headlines(country: str = "us", category: str = None, q: str = None)
     return data  # JSON 그대로 반환 (status, articles 등 포함)
 
 if __name__ == "__main__":
+    ready("NewsAPI")
     mcp.run(transport="stdio")  # 표준 입출력을 통해 MCP 서버 실행
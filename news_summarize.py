@@ -7,6 +7,8 @@ from newsapi import NewsApiClient
 from langgraph.graph import StateGraph, START, END
 from typing import TypedDict, List  
 from dotenv import load_dotenv  
+from translation_engine import TranslationEngine, article_text
+from llm_cache import maybe_cached
 load_dotenv() 
 
 # ✅ 1. 공유 정보 (State) 정의
@@ -33,7 +35,7 @@ def create_initial_state(user_input: str) -> NewsState:
 # ✅ 2. OpenAI API 설정
 openai.api_key = os.environ.get("OPENAI_API_KEY")
 MODEL_NAME="gpt-4"#"gpt-3.5-turbo"  
-client = openai.Client(api_key=openai.api_key)
+client = maybe_cached(openai.Client(api_key=openai.api_key))  # LLM_CACHE=1 enables response caching
 
 def parse_user_input(state: NewsState) -> NewsState:  
     print(f"🧠 사용자의 요청을 분석 중: '{state['user_input']}'")  
@@ -103,34 +105,17 @@ def fetch_news(state):
 
 # ✅ 4. 뉴스 요약 (Summarize News)
 def summarize_news(state: NewsState):
-    """OpenAI LLM을 사용하여 뉴스 요약"""
+    """OpenAI LLM을 사용하여 뉴스 요약 (여러 기사를 동시에 요청)"""
     print("📝 뉴스 요약 진행 중...")
+    engine = TranslationEngine(model=state['model'], max_tokens=150, temperature=0.5)
+    results = engine.translate([article_text(article) for article in state['articles']])
+
     summaries = []
-    
-    for article in state['articles']:
-        title = article.get('title', '제목 없음')
-        description = article.get('description', '')
-        content = article.get('content', '')
-        text_to_summarize = content if content else (description if description else title)
-        
-        try:  
-            completion = client.chat.completions.create(  
-                model=state['model'],  
-                messages=[  
-                    {"role": "system", "content": "You are a Korean translation assistant. Please Translate the news article to Korean ."},  
-                    {"role": "user", "content": f"News article to translate: {text_to_summarize}"}  
-                    # {"role": "system", "content": "You are a news summary assistant. Please summarize the news article."},  
-                    # {"role": "user", "content": f"News article to summarize: {text_to_summarize}"}  
-                ],  
-                max_tokens=150,  
-                temperature=0.5  
-            )  
-            summary = completion.choices[0].message.content.strip()  
-        except Exception as e:  
-            print(f"❌ Summary failed: {e}")  
-            summary = "Summary failed"  
-        
-        summaries.append({"title": title, "url": article.get('url'), "summary": summary})
+    for article, summary in zip(state['articles'], results):
+        if isinstance(summary, Exception):
+            print(f"❌ Summary failed: {summary}")
+            summary = "Summary failed"
+        summaries.append({"title": article.get('title', '제목 없음'), "url": article.get('url'), "summary": summary})
 
     state['summaries'] = summaries
     return state
@@ -0,0 +1,81 @@
+# news_writer.py - Streaming JSON Lines + Markdown output for the news pipelines
+import os
+import json
+
+
+def default_markdown(idx: int, article: dict) -> str:
+    return (
+        f"### {idx}. {article['title']}\n"
+        f"URL: {article['url']}\n"
+        f"내용: {article['content']}\n\n"
+    )
+
+
+class NewsWriter:
+    """
+    Write each article to `<base>.jsonl` and `<base>.md` as soon as it is ready.
+
+    Records are flushed one by one, so nothing is buffered in memory and an
+    interrupted run keeps everything written so far. In append mode the
+    Markdown numbering continues from the records already in the JSONL file.
+    """
+
+    def __init__(self, save_path: str, append: bool = True, header: str = "",
+                 format_markdown=default_markdown):
+        base_name = os.path.splitext(save_path)[0]
+        self.jsonl_path = f"{base_name}.jsonl"
+        self.md_path = f"{base_name}.md"
+        self.append = append
+        self.header = header
+        self.format_markdown = format_markdown
+        self.count = 0            # records written by this writer
+        self._next_idx = 1
+        self._jsonl = None
+        self._md = None
+
+    @staticmethod
+    def _count_records(path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip())
+
+    def open(self) -> "NewsWriter":
+        mode = "a" if self.append else "w"
+        if self.append:
+            self._next_idx = self._count_records(self.jsonl_path) + 1
+        self._jsonl = open(self.jsonl_path, mode, encoding="utf-8")
+        self._md = open(self.md_path, mode, encoding="utf-8")
+        if self.header and self._md.tell() == 0:
+            self._md.write(self.header)
+            self._md.flush()
+        return self
+
+    def write(self, article: dict) -> None:
+        """Append one record to both files and flush them."""
+        self._jsonl.write(json.dumps(article, ensure_ascii=False) + "\n")
+        self._jsonl.flush()
+        self._md.write(self.format_markdown(self._next_idx, article))
+        self._md.flush()
+        self._next_idx += 1
+        self.count += 1
+
+    def close(self) -> None:
+        for f in (self._jsonl, self._md):
+            if f is not None:
+                f.close()
+        self._jsonl = self._md = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_jsonl(path: str):
+    """Read records back one at a time."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -1,5 +1,6 @@
+import os
 import asyncio
-import aiohttp
+from sse_client import SSEError, get_sse_client
 from langgraph.graph import StateGraph, START, END
 from typing import TypedDict
 import json
@@ -9,20 +10,17 @@ class State(TypedDict):
     user_input: str
     final_answer: str
 
-# MCP 서버를 SSE로 호출하는 함수
+# MCP 서버를 SSE로 호출하는 함수 (서버가 다른 주소/포트에서 실행 중이면 SSE_SERVER_URL 조정)
+sse_client = get_sse_client(os.getenv("SSE_SERVER_URL", "http://localhost:8000"))
+
 async def sse_invoke(tool: str, params: dict) -> dict:
-    url = "[invalid url, do not cite]  # 서버가 다른 포트에서 실행 중이면 URL 조정 필요
-    payload = {"tool": tool, "params": params}
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, json=payload) as resp:
-            if resp.status != 200:
-                return {"error": f"Server returned status {resp.status}"}
-            async for line in resp.content:
-                if line.startswith(b"data:"):
-                    data = line[5:].decode().strip()
-                    if data:
-                        return json.loads(data)
-    return {"error": "No data received"}
+    try:
+        data = await sse_client.call(tool, params)
+    except SSEError as e:
+        return {"error": f"Server returned status {e.status}"}
+    if not data:
+        return {"error": "No data received"}
+    return json.loads(data)
 
 # Perplexity에 질문하고 답변을 받는 노드
 async def ask_node(state: State) -> dict:
@@ -52,6 +50,7 @@ async def main():
     result_state = await graph.ainvoke(initial_state)
     print("질문:", user_question)
     print("답변:", result_state.get("final_answer"))
+    await sse_client.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
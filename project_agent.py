@@ -3,8 +3,8 @@ load_dotenv()
 
 from typing import Literal, Dict, Annotated, List
 import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
+from search_client import get_search_client
+from fanout import gather_quorum, quorum_size
 from pydantic import BaseModel
 from langgraph.graph import StateGraph, START, END
 import sqlite3
@@ -14,10 +14,23 @@ from langgraph.checkpoint.sqlite import SqliteSaver  # SQLite-based checkpoint
 from utils import show_graph
 import os
 
+# Research fan-out limits (override in .env)
+RESEARCH_CONCURRENCY = int(os.getenv("RESEARCH_CONCURRENCY", "8"))     # searches in flight at once
+RESEARCH_TIMEOUT = float(os.getenv("RESEARCH_TIMEOUT", "15"))          # seconds per search
+RESEARCH_QUORUM = float(os.getenv("RESEARCH_QUORUM", "0.8"))           # fraction of ideas needed to summarize
+MAX_RESEARCH_ROUNDS = int(os.getenv("MAX_RESEARCH_ROUNDS", "2"))       # rounds that retry missing ideas
+MAX_CHARS_PER_IDEA = int(os.getenv("MAX_CHARS_PER_IDEA", "1000"))
+MAX_SUMMARY_CHARS = int(os.getenv("MAX_SUMMARY_CHARS", "8000"))
+
+def merge_research(existing: Dict[str, str], new: Dict[str, str]) -> Dict[str, str]:
+    """Reducer: each research round adds the ideas it finished."""
+    return {**(existing or {}), **(new or {})}
+
 class IdeaState(BaseModel):
     topic: str                       # idea topic provided by the user
     ideas: List[str] = []           # list of ideas generated via brainstorming
-    research: Dict[str, str] = {}   # research results (keyword -> summarized info)
+    research: Annotated[Dict[str, str], merge_research] = {}   # research results (keyword -> summarized info)
+    research_rounds: int = 0         # research rounds run so far
     summary: str = ""                # final summary
 
 def brainstorm_agent(state: IdeaState):
@@ -33,72 +46,53 @@ def brainstorm_agent(state: IdeaState):
 
 async def web_search_async(query: str):
     """Asynchronously search the web and return top 3 results."""
-    # 4. Set User-Agent and Accept-Language headers (to avoid blocking)
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/90.0.4430.93 Safari/537.36"
-        ),
-        "Accept-Language": "en-US,en;q=0.9"
-    }
-    # Construct DuckDuckGo search URL
-    search_url = f"https://duckduckgo.com/html/?q={query}"
-
-    # 1. Perform asynchronous HTTP GET request using aiohttp
-    async with aiohttp.ClientSession() as session:
-        async with session.get(search_url, headers=headers) as response:
-            html_content = await response.text()
-
-    # 2. Parse HTML using BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    results = []
-    # 3. Select HTML elements containing search results (top 3 results)
-    result_items = soup.find_all('div', class_='result', limit=3)
-    for item in result_items:
-        title_elem = item.find('a', class_='result__a')
-        snippet_elem = item.find(class_='result__snippet')
-        link_elem = item.find('a', class_='result__url')
-
-        # Extract text and link if elements exist
-        title = title_elem.get_text() if title_elem else ''
-        url = link_elem['href'] if link_elem else ''
-        snippet = snippet_elem.get_text() if snippet_elem else ''
-
-        results.append({
-            "title": title,
-            "url": url,
-            "snippet": snippet
-        })
-    # 5. Return the results list
-    return results
+    # Shared client: one pooled session, per-host limits and a per-query result cache
+    return await get_search_client().search(query, limit=3)
+
+def format_research(info) -> str:
+    """Combine title and snippet for each result"""
+    if not info:
+        return ""
+    return "\n".join(
+        f"{item.get('title','').strip()} - {item.get('snippet','').strip()}"
+        for item in info
+    )[:MAX_CHARS_PER_IDEA]
+
+def _progress_writer():
+    """LangGraph custom stream writer (stream_mode="custom") when available, otherwise a no-op."""
+    try:
+        from langgraph.config import get_stream_writer
+        return get_stream_writer()
+    except Exception:
+        return lambda chunk: None
 
 async def research_agent(state: IdeaState):
-    """Agent that asynchronously retrieves information for each idea in the list."""
+    """Agent that asynchronously retrieves information for the ideas not researched yet."""
     ideas = state.ideas
     # Return empty result immediately if the idea list is empty
     if not ideas:
         return {"research": {}}
 
-    results = {}
-    # Perform web searches in parallel for each idea
-    coros = [web_search_async(idea) for idea in ideas]
-    fetched_list = await asyncio.gather(*coros)
-
-    # Organize results into a dict (idea -> info)
-    for idea, info in zip(ideas, fetched_list):
-        if info:
-            # Combine title and snippet for each result
-            info_str = "\n".join(
-                f"{item.get('title','').strip()} - {item.get('snippet','').strip()}"
-                for item in info
-            )
-        else:
-            info_str = ""
-        results[idea] = info_str
-
-    return {"research": results}
+    missing = [idea for idea in ideas if idea not in state.research]
+    # Stop once the quorum is met instead of waiting for the slowest searches
+    needed = max(quorum_size(len(ideas), RESEARCH_QUORUM) - (len(ideas) - len(missing)), 1)
+    write = _progress_writer()
+
+    def on_result(idea, result):
+        # Stream each finished search to callers of graph.astream(..., stream_mode="custom")
+        write({"idea": idea, "ok": not isinstance(result, Exception)})
+
+    # Perform web searches with bounded concurrency and a timeout per search
+    fetched, failed = await gather_quorum(
+        missing, web_search_async, concurrency=RESEARCH_CONCURRENCY,
+        timeout=RESEARCH_TIMEOUT, quorum=needed, on_result=on_result,
+    )
+    for idea, error in failed.items():
+        print(f"research failed for {idea!r}: {error!r}")
+
+    # Organize results into a dict (idea -> info); failed ideas are retried next round
+    results = {idea: format_research(info) for idea, info in fetched.items()}
+    return {"research": results, "research_rounds": state.research_rounds + 1}
 
 def summarize_agent(state: IdeaState):
     """Agent that compiles research results into a summary."""
@@ -106,9 +100,18 @@ def summarize_agent(state: IdeaState):
     if not research_data:
         summary_text = "No research data available to summarize."
     else:
-        # Combine all research strings into one summary
-        combined = " ".join(research_data.values())
-        summary_text = combined
+        # Combine research strings in idea order, up to MAX_SUMMARY_CHARS
+        parts, length = [], 0
+        for idea in state.ideas:
+            text = research_data.get(idea)
+            if not text:
+                continue
+            if length + len(text) > MAX_SUMMARY_CHARS:
+                parts.append(text[:MAX_SUMMARY_CHARS - length])
+                break
+            parts.append(text)
+            length += len(text) + 1
+        summary_text = " ".join(parts)
     return {"summary": summary_text}
 
 
@@ -120,15 +123,16 @@ def supervisor(state: IdeaState) -> Command[
     # If no ideas have been generated yet, start with brainstorming
     if not state.ideas:
         return Command(goto="brainstorm_agent")
-    # If ideas exist but research hasn't been done, go to research step
-    elif state.ideas and not state.research:
-        # If idea count is zero, end immediately
-        if len(state.ideas) == 0:
-            return Command(goto=END)
-        return Command(goto="research_agent")
-    # If research is complete and summary isn't, go to summarization
-    elif state.research and not state.summary:
+    # If the summary is done, finish
+    elif state.summary:
+        return Command(goto=END)
+    # Summarize once a quorum of ideas is researched (or the retry rounds are used up)
+    elif (len(state.research) >= quorum_size(len(state.ideas), RESEARCH_QUORUM)
+          or state.research_rounds >= MAX_RESEARCH_ROUNDS):
         return Command(goto="summarize_agent")
+    # Otherwise research the ideas that are still missing
+    elif state.ideas:
+        return Command(goto="research_agent")
     else:
         # All steps complete or termination condition
         return Command(goto=END)
@@ -149,13 +153,11 @@ builder.add_edge("brainstorm_agent", "supervisor")
 builder.add_edge("research_agent", "supervisor")
 builder.add_edge("summarize_agent", "supervisor")
 
-import aiosqlite
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from checkpointing import make_async_saver
 
 async def init_checkpointer():
-    # Create asynchronous checkpointer
-    conn = await aiosqlite.connect(":memory:")
-    return AsyncSqliteSaver(conn)
+    # Create asynchronous checkpointer (in-memory, or a durable file when CHECKPOINT_DB is set)
+    return await make_async_saver()
 
 async def main():
     checkpointer = await init_checkpointer()
@@ -171,6 +173,8 @@ async def main():
         state0 = {"topic": "Artificial Intelligence"}
         result = await graph.ainvoke(state0, config)
         print(result)
+        await get_search_client().aclose()
+        await checkpointer.conn.close()  # commits any grouped checkpoint writes (os._exit skips atexit)
         os._exit(0)
     except AttributeError as e:
         print(f"AttributeError occurred: {e}")
@@ -0,0 +1,161 @@
+# report_renderer.py - Credit report rendering with a font loaded once per process
+import os
+import copy
+import html
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Font settings come from the environment (.env) instead of a hard-coded Windows path
+FONT_PATH = os.getenv("REPORT_FONT_PATH", "C:/Windows/Fonts/NanumGothic.ttf")
+FONT_FAMILY = os.getenv("REPORT_FONT_FAMILY", "NanumGothic")
+REPORT_FORMAT = os.getenv("REPORT_FORMAT", "pdf")  # "pdf", "html" or "md"
+
+
+def report_title(state) -> str:
+    return f"{state.company} 신용 리스크 분석 보고서"
+
+
+def report_filename(state, fmt: str = "pdf", output_dir: str = ".") -> str:
+    return os.path.join(output_dir, f"{state.company}_credit_report.{fmt}")
+
+
+class ReportRenderer:
+    """
+    Render AnalysisState results as PDF, HTML or Markdown.
+
+    For PDF the TTF font is parsed once into a template document; every report
+    starts from a copy of that template instead of calling add_font again.
+    Set reuse_font=False to get the old behaviour (a fresh FPDF per report).
+    """
+
+    def __init__(self, font_path: str = FONT_PATH, font_family: str = FONT_FAMILY,
+                 font_size: int = 14, output_dir: str = ".", reuse_font: bool = True):
+        self.font_path = font_path
+        self.font_family = font_family
+        self.font_size = font_size
+        self.output_dir = output_dir
+        self.reuse_font = reuse_font
+        self._template = None
+
+    def _fresh_document(self):
+        from fpdf import FPDF
+
+        pdf = FPDF()
+        pdf.add_font(self.font_family, '', self.font_path, uni=True)
+        return pdf
+
+    def _new_document(self):
+        if not self.reuse_font:
+            return self._fresh_document()
+        if self._template is None:
+            self._template = self._fresh_document()
+        return copy.deepcopy(self._template)
+
+    def render_pdf(self, state, path: str = None) -> str:
+        pdf = self._new_document()
+        pdf.add_page()
+        pdf.set_font(self.font_family, '', self.font_size)
+        # 제목 추가
+        pdf.cell(0, 10, report_title(state), ln=1, align='C')
+        # 본문 내용 추가
+        pdf.multi_cell(0, 10, state.analysis_summary)
+        path = path or report_filename(state, "pdf", self.output_dir)
+        pdf.output(path)
+        return path
+
+    @staticmethod
+    def to_markdown(state) -> str:
+        return f"# {report_title(state)}\n\n" + "\n\n".join(state.analysis_summary.splitlines()) + "\n"
+
+    @staticmethod
+    def to_html(state) -> str:
+        paragraphs = "\n".join(f"<p>{html.escape(line)}</p>" for line in state.analysis_summary.splitlines())
+        return (
+            "<!DOCTYPE html>\n<html lang=\"ko\"><head><meta charset=\"utf-8\">"
+            f"<title>{html.escape(report_title(state))}</title></head>\n"
+            f"<body>\n<h1>{html.escape(report_title(state))}</h1>\n{paragraphs}\n</body></html>\n"
+        )
+
+    def render(self, state, fmt: str = REPORT_FORMAT, path: str = None) -> str:
+        """Write one report in the given format and return its path."""
+        if fmt == "pdf":
+            return self.render_pdf(state, path)
+        text = self.to_html(state) if fmt == "html" else self.to_markdown(state)
+        path = path or report_filename(state, fmt, self.output_dir)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+
+# ----- Parallel batch rendering -----
+_worker_renderer = None
+
+
+def _init_worker(options: dict) -> None:
+    global _worker_renderer
+    _worker_renderer = ReportRenderer(**options)
+
+
+def _render_in_worker(args):
+    state, fmt = args
+    return _worker_renderer.render(state, fmt)
+
+
+def render_many(states: list, fmt: str = REPORT_FORMAT, processes: int = None, **options) -> list:
+    """
+    Render many reports across processes; each worker loads the font once.
+    Returns the output paths in input order.
+    """
+    if fmt != "pdf" or processes == 1:
+        renderer = ReportRenderer(**options)
+        return [renderer.render(state, fmt) for state in states]
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(options,)) as pool:
+        return list(pool.map(_render_in_worker, [(state, fmt) for state in states], chunksize=4))
+
+
+_default_renderer = None
+
+
+def get_renderer() -> ReportRenderer:
+    """Shared renderer for the finance graph (template font survives across reports)."""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = ReportRenderer()
+    return _default_renderer
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    from finance import AnalysisState
+
+    parser = argparse.ArgumentParser(description="Benchmark credit report rendering")
+    parser.add_argument("--reports", type=int, default=50)
+    parser.add_argument("--font", default=FONT_PATH)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    summary = (
+        "레버리지 분석: 부채비율이 150.0%로 매우 높아 레버리지 위험이 큽니다.\n"
+        "유동성 분석: 유동비율이 0.90배로 1 미만입니다.\n"
+        "수익성 분석: 순이익률이 25.0%로 매우 우수합니다.\n"
+        "종합 신용 리스크 평가: 현재 신용 위험 수준은 높음입니다."
+    )
+    out_dir = tempfile.mkdtemp(prefix="reports_")
+    states = [AnalysisState(company=f"company{i}", analysis_summary=summary) for i in range(args.reports)]
+
+    def bench(label, run):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        print(f"{label:28s} {len(states) / elapsed:9.1f} reports/s")
+
+    options = dict(font_path=args.font, output_dir=out_dir)
+    fresh = ReportRenderer(reuse_font=False, **options)
+    reused = ReportRenderer(**options)
+    bench("pdf, add_font per report", lambda: [fresh.render(s, "pdf") for s in states])
+    bench("pdf, font loaded once", lambda: [reused.render(s, "pdf") for s in states])
+    bench(f"pdf, {args.processes} processes", lambda: render_many(states, "pdf", args.processes, **options))
+    bench("html", lambda: render_many(states, "html", **options))
+    bench("markdown", lambda: render_many(states, "md", **options))
+    print("output:", out_dir)
@@ -0,0 +1,297 @@
+# search_client.py - Shared async DuckDuckGo search client (pooled session, cache, fast parsing)
+import os
+import time
+import asyncio
+import weakref
+from collections import OrderedDict
+
+import aiohttp
+
+SEARCH_URL = "https://duckduckgo.com/html/"
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/90.0.4430.93 Safari/537.36"
+)
+DEFAULT_PARSER = os.getenv("SEARCH_PARSER")  # "selectolax", "lxml" or "bs4"; fastest installed when unset
+DEFAULT_PER_HOST = int(os.getenv("SEARCH_MAX_PER_HOST", "4"))
+DEFAULT_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "600"))
+
+
+# ----- Result parsing: only the div.result blocks are extracted -----
+def _parse_selectolax(html: str, limit: int) -> list:
+    from selectolax.parser import HTMLParser
+
+    results = []
+    for item in HTMLParser(html).css("div.result")[:limit]:
+        title_elem = item.css_first("a.result__a")
+        snippet_elem = item.css_first(".result__snippet")
+        link_elem = item.css_first("a.result__url")
+        results.append({
+            "title": title_elem.text() if title_elem else '',
+            "url": (link_elem.attributes.get("href") or '') if link_elem else '',
+            "snippet": snippet_elem.text() if snippet_elem else '',
+        })
+    return results
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _parse_lxml(html: str, limit: int) -> list:
+    import lxml.html
+
+    if not html.strip():
+        return []
+    results = []
+    for item in lxml.html.fromstring(html).xpath(f"//div[{_has_class('result')}]")[:limit]:
+        title_elem = item.xpath(f".//a[{_has_class('result__a')}]")
+        snippet_elem = item.xpath(f".//*[{_has_class('result__snippet')}]")
+        link_elem = item.xpath(f".//a[{_has_class('result__url')}]")
+        results.append({
+            "title": title_elem[0].text_content() if title_elem else '',
+            "url": link_elem[0].get("href", '') if link_elem else '',
+            "snippet": snippet_elem[0].text_content() if snippet_elem else '',
+        })
+    return results
+
+
+def _parse_bs4(html: str, limit: int) -> list:
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    # Build the tree only for the result blocks instead of the whole page. While
+    # parsing, the class attribute is still one string, so match its words here.
+    strainer = SoupStrainer('div', class_=lambda value: bool(value) and 'result' in value.split())
+    soup = BeautifulSoup(html, 'html.parser', parse_only=strainer)
+    results = []
+    for item in soup.find_all('div', class_='result', limit=limit):
+        title_elem = item.find('a', class_='result__a')
+        snippet_elem = item.find(class_='result__snippet')
+        link_elem = item.find('a', class_='result__url')
+        results.append({
+            "title": title_elem.get_text() if title_elem else '',
+            "url": link_elem.get('href', '') if link_elem else '',
+            "snippet": snippet_elem.get_text() if snippet_elem else '',
+        })
+    return results
+
+
+PARSERS = {"selectolax": _parse_selectolax, "lxml": _parse_lxml, "bs4": _parse_bs4}
+_PARSER_MODULES = {"selectolax": "selectolax.parser", "lxml": "lxml.html", "bs4": "bs4"}
+
+
+def available_parsers() -> list:
+    """Installed parsers, fastest first."""
+    import importlib.util
+
+    found = []
+    for name, module in _PARSER_MODULES.items():
+        try:
+            if importlib.util.find_spec(module) is not None:
+                found.append(name)
+        except ModuleNotFoundError:
+            pass
+    return found
+
+
+def parse_results(html: str, limit: int = 3, parser: str = None) -> list:
+    """Extract up to `limit` {"title", "url", "snippet"} dicts from a DuckDuckGo HTML page."""
+    if parser is None:
+        installed = available_parsers()
+        if not installed:
+            raise ImportError("Install selectolax, lxml or beautifulsoup4 to parse search results")
+        parser = installed[0]
+    return PARSERS[parser](html, limit)
+
+
+class SearchClient:
+    """
+    Async web search with one pooled aiohttp session per event loop.
+
+    Concurrent requests to the same host are capped by `max_per_host`,
+    results are cached per (query, limit) for `cache_ttl` seconds, and
+    identical queries already in flight share a single request.
+    """
+
+    def __init__(self, max_per_host: int = DEFAULT_PER_HOST, max_connections: int = 100,
+                 cache_ttl: float = DEFAULT_CACHE_TTL, cache_size: int = 1024,
+                 accept_language: str = "en-US,en;q=0.9", timeout: float = 15,
+                 parser: str = DEFAULT_PARSER, search_url: str = SEARCH_URL):
+        self.max_per_host = max_per_host
+        self.max_connections = max_connections
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        # User-Agent and Accept-Language headers (to avoid blocking)
+        self.headers = {"User-Agent": DEFAULT_USER_AGENT, "Accept-Language": accept_language}
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.parser = parser or (available_parsers() or ["bs4"])[0]
+        self.search_url = search_url
+        self._sessions = weakref.WeakKeyDictionary()   # event loop -> ClientSession
+        self._inflight = weakref.WeakKeyDictionary()   # event loop -> {key: Future}
+        self._cache = OrderedDict()                    # (query, limit) -> (results, stored_at)
+        self.requests = 0
+        self.cache_hits = 0
+
+    def _session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections, limit_per_host=self.max_per_host, ttl_dns_cache=300,
+            )
+            session = aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=self.timeout)
+            self._sessions[loop] = session
+        return session
+
+    def _cached(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        results, stored_at = entry
+        if time.monotonic() - stored_at > self.cache_ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return results
+
+    def _store(self, key, results: list) -> None:
+        self._cache[key] = (results, time.monotonic())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def fetch_html(self, query: str) -> str:
+        self.requests += 1
+        # aiohttp URL-encodes the query parameter
+        async with self._session().get(self.search_url, params={"q": query}) as response:
+            return await response.text()
+
+    async def search(self, query: str, limit: int = 3) -> list:
+        """Return the top `limit` results for the query."""
+        key = (" ".join(query.split()), limit)
+        results = self._cached(key)
+        if results is not None:
+            self.cache_hits += 1
+            return [dict(item) for item in results]
+
+        inflight = self._inflight.setdefault(asyncio.get_running_loop(), {})
+        future = inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._search_uncached(key[0], limit))
+            inflight[key] = future
+            future.add_done_callback(lambda _: inflight.pop(key, None))
+        results = await asyncio.shield(future)
+        return [dict(item) for item in results]
+
+    async def _search_uncached(self, query: str, limit: int) -> list:
+        html_content = await self.fetch_html(query)
+        results = parse_results(html_content, limit, self.parser)
+        self._store((query, limit), results)
+        return results
+
+    async def aclose(self) -> None:
+        """Close the session of the running loop."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+
+_default_client = None
+
+
+def get_search_client() -> SearchClient:
+    global _default_client
+    if _default_client is None:
+        _default_client = SearchClient()
+    return _default_client
+
+
+async def web_search(query: str, limit: int = 3) -> list:
+    """Search with the shared client."""
+    return await get_search_client().search(query, limit)
+
+
+# ----- Benchmark against saved (or synthetic) result pages -----
+def _synthetic_page(results: int = 30, padding: int = 400) -> str:
+    blocks = "".join(
+        f'<div class="result results_links web-result"><div class="links_main">'
+        f'<h2 class="result__title"><a class="result__a" href="https://example.com/{i}">Result {i} title</a></h2>'
+        f'<a class="result__url" href="https://example.com/{i}">example.com/{i}</a>'
+        f'<a class="result__snippet" href="https://example.com/{i}">Snippet <b>{i}</b> about the query.</a>'
+        f'</div></div>'
+        for i in range(results)
+    )
+    filler = "".join(f'<div class="nav"><span>menu item {i}</span></div>' for i in range(padding))
+    return f"<html><head><title>q</title></head><body>{filler}<div id=\"links\">{blocks}</div></body></html>"
+
+
+if __name__ == "__main__":
+    import glob
+    import argparse
+    from aiohttp import web
+
+    parser = argparse.ArgumentParser(description="Benchmark search parsing and the pooled client")
+    parser.add_argument("--fixtures", default="fixtures/search/*.html", help="glob of saved result pages")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(args.fixtures)):
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append(f.read())
+    if not pages:
+        print("no fixtures found, using a synthetic page")
+        pages = [_synthetic_page()]
+
+    # 1) parsing alone
+    for name in available_parsers():
+        rounds = max(1, 200 // len(pages))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for page in pages:
+                parse_results(page, 3, name)
+        elapsed = time.perf_counter() - start
+        print(f"parse[{name:10s}] {rounds * len(pages) / elapsed:9.1f} pages/s")
+
+    # 2) end to end against a local server serving the fixtures
+    async def run():
+        async def handler(request):
+            await asyncio.sleep(0.01)
+            return web.Response(text=pages[hash(request.query["q"]) % len(pages)], content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get("/html/", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/html/"
+        queries = [f"query {i % (args.queries // 2)} & more" for i in range(args.queries)]
+        gate = asyncio.Semaphore(args.concurrency)
+
+        async def per_query_session(query):
+            async with gate, aiohttp.ClientSession() as session:
+                async with session.get(url, params={"q": query}) as response:
+                    parse_results(await response.text(), 3, "bs4" if "bs4" in available_parsers() else None)
+
+        client = SearchClient(search_url=url, max_per_host=args.concurrency)
+
+        async def pooled(query):
+            async with gate:
+                await client.search(query)
+
+        for label, call in (("session per query", per_query_session), ("shared client", pooled)):
+            start = time.perf_counter()
+            await asyncio.gather(*(call(q) for q in queries))
+            elapsed = time.perf_counter() - start
+            print(f"{label:18s} {len(queries) / elapsed:9.1f} queries/s")
+        print(f"shared client: {client.requests} requests, {client.cache_hits} cache hits, parser={client.parser}")
+        await client.aclose()
+        await runner.cleanup()
+
+    asyncio.run(run())
@@ -0,0 +1,258 @@
+# sse_client.py - Keep-alive SSE client for the chatbot/perplexity tool servers
+import os
+import time
+import asyncio
+import weakref
+from contextlib import aclosing
+from typing import NamedTuple
+
+import aiohttp
+
+SSE_SERVER_URL = os.getenv("SSE_SERVER_URL", "http://localhost:8000")
+
+
+class SSEEvent(NamedTuple):
+    event: str
+    data: str
+    id: str = None
+
+
+class SSEError(Exception):
+    """The server answered with a non-200 status."""
+
+    def __init__(self, status: int, message: str = ""):
+        super().__init__(f"Server returned status {status}{': ' + message if message else ''}")
+        self.status = status
+
+
+class SSEParser:
+    """
+    Incremental text/event-stream parser.
+
+    feed() takes raw bytes as they arrive (chunks may split lines or UTF-8
+    sequences anywhere) and returns the events completed so far. Bytes are
+    kept in one reusable buffer and only complete lines are decoded.
+    Lines may end with LF or CRLF.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._event = None
+        self._data = []
+        self._id = None
+        self.last_event_id = None
+
+    def feed(self, chunk: bytes) -> list:
+        self._buffer += chunk
+        events = []
+        start = 0
+        buffer = self._buffer
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            line_end = end - 1 if end > start and buffer[end - 1] == 0x0D else end
+            self._line(bytes(buffer[start:line_end]).decode("utf-8"), events)
+            start = end + 1
+        if start:
+            del buffer[:start]
+        return events
+
+    def flush(self) -> list:
+        """Finish a stream that ended without a trailing blank line."""
+        events = []
+        if self._buffer:
+            self._line(self._buffer.decode("utf-8"), events)
+            self._buffer.clear()
+        self._line("", events)
+        return events
+
+    def _line(self, line: str, events: list) -> None:
+        if not line:
+            if self._data:
+                events.append(SSEEvent(self._event or "message", "\n".join(self._data), self._id))
+            self._event, self._data, self._id = None, [], None
+            return
+        if line[0] == ":":
+            return  # comment / keep-alive ping
+        field, _, value = line.partition(":")
+        if value[:1] == " ":
+            value = value[1:]
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event = value
+        elif field == "id":
+            self._id = self.last_event_id = value
+
+
+class SSEClient:
+    """
+    Call tools on an SSE tool server (POST {"tool", "params"} -> event stream).
+
+    One keep-alive aiohttp session per event loop is shared by every call, so
+    concurrent calls reuse pooled connections instead of opening new ones.
+    stream() yields events as they arrive; call() collects the result text.
+    """
+
+    def __init__(self, base_url: str = SSE_SERVER_URL, path: str = "/sse",
+                 max_connections: int = 100, keepalive_timeout: float = 60, timeout: float = 300):
+        self.url = base_url.rstrip("/") + path
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_read=timeout)
+        self.trace = aiohttp.TraceConfig()
+        self.trace.on_connection_create_end.append(self._on_connection)
+        self.connections = 0
+        self.requests = 0
+        self._sessions = weakref.WeakKeyDictionary()  # event loop -> ClientSession
+
+    async def _on_connection(self, session, context, params) -> None:
+        self.connections += 1
+
+    def _session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=self.keepalive_timeout)
+            session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, trace_configs=[self.trace])
+            self._sessions[loop] = session
+        return session
+
+    async def stream(self, tool: str, params: dict = None):
+        """
+        Async iterator of SSEEvent for one tool call. Close it early with
+        `async with aclosing(client.stream(...))`; reading to the end keeps the
+        connection reusable.
+        """
+        self.requests += 1
+        parser = SSEParser()
+        async with self._session().post(self.url, json={"tool": tool, "params": params or {}}) as resp:
+            if resp.status != 200:
+                raise SSEError(resp.status, (await resp.text())[:200])
+            async for chunk in resp.content.iter_any():
+                for event in parser.feed(chunk):
+                    yield event
+        for event in parser.flush():
+            yield event
+
+    async def call(self, tool: str, params: dict = None, on_token=None) -> str:
+        """
+        Run one tool call and return its result text. "token" events are passed
+        to on_token(token) as they arrive; "error" events become the result.
+        """
+        tokens, result = [], None
+        async with aclosing(self.stream(tool, params)) as events:
+            async for event in events:
+                if event.event == "token":
+                    tokens.append(event.data)
+                    if on_token is not None:
+                        on_token(event.data)
+                elif event.event in ("result", "error", "message"):
+                    result = event.data
+        return result if result is not None else "".join(tokens)
+
+    async def call_many(self, calls: list, return_exceptions: bool = True) -> list:
+        """Run several (tool, params) calls at once over the shared session."""
+        return await asyncio.gather(
+            *(self.call(tool, params) for tool, params in calls), return_exceptions=return_exceptions
+        )
+
+    async def aclose(self) -> None:
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+
+_clients = {}
+
+
+def get_sse_client(base_url: str = SSE_SERVER_URL) -> SSEClient:
+    """Shared client per server URL."""
+    client = _clients.get(base_url)
+    if client is None:
+        client = _clients[base_url] = SSEClient(base_url)
+    return client
+
+
+if __name__ == "__main__":
+    import argparse
+    import statistics
+    import threading
+
+    parser = argparse.ArgumentParser(description="Load test a chatbot_server_sse instance")
+    parser.add_argument("--url", default=SSE_SERVER_URL)
+    parser.add_argument("--spawn", action="store_true",
+                        help="start chatbot_server_sse in this process (tools replaced by local fakes)")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tool", default="generate_answer")
+    args = parser.parse_args()
+
+    if args.spawn:
+        import uvicorn
+        import chatbot_server_sse as server_module
+
+        async def fake_stream(query, search_results):
+            for token in ("Seoul ", "will be\n", "sunny ", "tomorrow."):
+                await asyncio.sleep(0.005)
+                yield token
+
+        def fake_search(query):
+            time.sleep(0.01)
+            return f"Results for {query}:\nline 1\nline 2"
+
+        server_module.stream_answer = fake_stream
+        server_module.BLOCKING_TOOLS["search_web"] = fake_search
+        port = int(args.url.rsplit(":", 1)[-1])
+        server = uvicorn.Server(uvicorn.Config(server_module.app, host="127.0.0.1", port=port, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.05)
+
+    params = {"query": "서울의 내일 날씨는?", "search_results": ""} if args.tool == "generate_answer" \
+        else {"query": "서울의 내일 날씨는?"}
+
+    async def run(label, call, connections):
+        gate = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def one():
+            async with gate:
+                start = time.perf_counter()
+                await call()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(args.requests)))
+        elapsed = time.perf_counter() - start
+        q = statistics.quantiles(latencies, n=100)
+        print(f"{label:20s} {args.requests / elapsed:8.1f} calls/s  p50 {q[49] * 1000:6.1f} ms  "
+              f"p95 {q[94] * 1000:6.1f} ms  connections {connections()}")
+
+    async def main():
+        opened = {"count": 0}
+        trace = aiohttp.TraceConfig()
+
+        async def count(session, context, params):
+            opened["count"] += 1
+
+        trace.on_connection_create_end.append(count)
+
+        async def session_per_call():
+            # old pattern: a new session (and TCP connection) for every call
+            async with aiohttp.ClientSession(trace_configs=[trace]) as session:
+                async with session.post(args.url + "/sse", json={"tool": args.tool, "params": params}) as resp:
+                    parser = SSEParser()
+                    async for chunk in resp.content.iter_any():
+                        parser.feed(chunk)
+
+        client = SSEClient(args.url)
+        await run("session per call", session_per_call, lambda: opened["count"])
+        await run("shared SSEClient", lambda: client.call(args.tool, params), lambda: client.connections)
+        tokens = []
+        answer = await client.call(args.tool, params, on_token=tokens.append)
+        print(f"last answer {answer!r} from {len(tokens)} token events")
+        await client.aclose()
+
+    asyncio.run(main())
@@ -1,6 +1,6 @@
 # tavily_search.py
+from mcp_startup import lazy, ready  # first import: times the imports below with --profile-startup
 from mcp.server.fastmcp import FastMCP
-from tavily import TavilyClient
 import os
 from dotenv import load_dotenv, find_dotenv
 
@@ -8,7 +8,12 @@ from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())
 # Set Tavily API key (via environment variables or .env)
 api_key = os.getenv("TAVILY_API_KEY")
-tavily_client = TavilyClient(api_key=api_key)
+
+@lazy("tavily_client")
+def get_tavily_client():
+    """Tavily client, created (and its package imported) on the first search."""
+    from tavily import TavilyClient
+    return TavilyClient(api_key=api_key)
 
 # Create a FastMCP server instance (service name: "WebSearchService")
 mcp = FastMCP("WebSearchService")
@@ -18,7 +23,7 @@ mcp = FastMCP("WebSearchService")
 def search_web(query: str) -> str:
     """Summarize and return the latest web search results for the given query."""
     try:
-        response = tavily_client.search(query)  # Execute web search via Tavily API
+        response = get_tavily_client().search(query)  # Execute web search via Tavily API
         # Use direct answer from Tavily response if available, otherwise use result content
         if isinstance(response, dict):
             if "answer" in response and response["answer"]:
@@ -32,4 +37,5 @@ def search_web(query: str) -> str:
         return f"(Search error: {e})"
 
 if __name__ == "__main__":
+    ready("WebSearchService")
     mcp.run(transport="stdio")
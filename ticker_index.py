@@ -0,0 +1,138 @@
+# ticker_index.py - Company/alias -> ticker lookup with an Aho-Corasick automaton
+import os
+import csv
+from collections import deque
+
+# Built-in aliases (Korean and English names); extend with a CSV file via TICKER_ALIASES_PATH
+COMPANY_ALIASES = {
+    "AAPL": ("애플", ["애플", "apple", "apple inc", "aapl"]),
+    "005930.KS": ("삼성전자", ["삼성전자", "삼성", "samsung electronics", "samsung"]),
+    "GOOGL": ("google", ["google", "구글", "alphabet", "알파벳", "googl"]),
+    "MSFT": ("microsoft", ["microsoft", "마이크로소프트", "마소", "msft"]),
+    "AMZN": ("amazon", ["amazon", "아마존", "amzn"]),
+    "TSLA": ("tesla", ["tesla", "테슬라", "tsla"]),
+    "NVDA": ("nvidia", ["nvidia", "엔비디아", "nvda"]),
+    "META": ("meta", ["meta platforms", "meta", "메타", "facebook", "페이스북"]),
+    "INTC": ("intel", ["intel", "인텔", "intc"]),
+    "NFLX": ("netflix", ["netflix", "넷플릭스", "nflx"]),
+    "000660.KS": ("SK하이닉스", ["sk하이닉스", "하이닉스", "sk hynix", "hynix"]),
+    "005380.KS": ("현대자동차", ["현대자동차", "현대차", "hyundai motor"]),
+    "066570.KS": ("LG전자", ["lg전자", "lg electronics"]),
+    "035420.KS": ("네이버", ["네이버", "naver"]),
+    "035720.KS": ("카카오", ["카카오", "kakao"]),
+    "051910.KS": ("LG화학", ["lg화학", "lg chem"]),
+    "005490.KS": ("POSCO홀딩스", ["포스코홀딩스", "포스코", "posco"]),
+}
+
+CREDIT_KEYWORDS = ("credit", "신용")
+
+
+def analysis_type_for(query: str) -> str:
+    """Same rule as the prompt: 'credit'/'신용' means a credit risk analysis."""
+    query = query.lower()
+    return "credit_risk" if any(keyword in query for keyword in CREDIT_KEYWORDS) else "general"
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: finds every pattern occurrence in one pass over the text."""
+
+    def __init__(self):
+        self.goto = [{}]      # state -> {char: next state}
+        self.fail = [0]
+        self.output = [[]]    # state -> [(pattern length, value)]
+        self._built = False
+
+    def add(self, pattern: str, value) -> None:
+        state = 0
+        for char in pattern:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = nxt
+        self.output[state].append((len(pattern), value))
+        self._built = False
+
+    def build(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+        self._built = True
+
+    def search(self, text: str):
+        """Yield (start, end, value) for every match."""
+        if not self._built:
+            self.build()
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for length, value in self.output[state]:
+                yield i - length + 1, i + 1, value
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+
+class TickerIndex:
+    """Find the company mentioned in a query among all known names and aliases."""
+
+    def __init__(self, aliases: dict = COMPANY_ALIASES, csv_path: str = os.getenv("TICKER_ALIASES_PATH")):
+        self.automaton = AhoCorasick()
+        self.size = 0
+        for ticker, (company, names) in aliases.items():
+            for name in names:
+                self.add(name, company, ticker)
+        if csv_path and os.path.exists(csv_path):
+            self.load_csv(csv_path)
+        self.automaton.build()
+
+    def add(self, alias: str, company: str, ticker: str) -> None:
+        self.automaton.add(alias.lower(), (company, ticker))
+        self.size += 1
+
+    def load_csv(self, path: str) -> None:
+        """Load rows of alias,ticker[,company] (e.g. an exchange listing export)."""
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if len(row) >= 2 and row[0].strip() and not row[0].startswith("#"):
+                    alias, ticker = row[0].strip(), row[1].strip()
+                    self.add(alias, row[2].strip() if len(row) > 2 and row[2].strip() else alias, ticker)
+        self.automaton.build()
+
+    def lookup(self, query: str):
+        """Return (company, ticker) of the leftmost-longest alias in the query, or None."""
+        text = query.lower()
+        best = None
+        for start, end, value in self.automaton.search(text):
+            # Latin aliases must be whole words ("meta" must not match "metadata");
+            # Korean names may carry particles ("애플의", "삼성전자를")
+            if _is_word_char(text[start]) and (
+                (start > 0 and _is_word_char(text[start - 1])) or (end < len(text) and _is_word_char(text[end]))
+            ):
+                continue
+            if best is None or start < best[0] or (start == best[0] and end > best[1]):
+                best = (start, end, value)
+        return best[2] if best else None
+
+
+_default_index = None
+
+
+def get_index() -> TickerIndex:
+    global _default_index
+    if _default_index is None:
+        _default_index = TickerIndex()
+    return _default_index
@@ -0,0 +1,255 @@
+# translation_engine.py - Concurrent, rate-limited LLM translation stage for the news pipelines
+import os
+import time
+import random
+import asyncio
+from collections import deque
+
+import openai
+
+from llm_cache import maybe_cached
+from llm_clients import get_async_openai_client
+
+TRANSLATE_SYSTEM_PROMPT = "You are a Korean translation assistant. Please Translate the news article to Korean ."
+
+# Defaults can be tuned per deployment through the environment
+DEFAULT_CONCURRENCY = int(os.getenv("TRANSLATE_CONCURRENCY", "8"))
+DEFAULT_RPM = int(os.getenv("TRANSLATE_RPM", "500"))        # requests per minute
+DEFAULT_TPM = int(os.getenv("TRANSLATE_TPM", "40000"))      # tokens per minute
+DEFAULT_MAX_RETRIES = int(os.getenv("TRANSLATE_MAX_RETRIES", "5"))
+
+
+def article_text(article: dict) -> str:
+    """Pick the text to send for an article: content, then description, then title."""
+    return article.get('content') or article.get('description') or article.get('title', '제목 없음')
+
+
+def estimate_tokens(text: str, max_tokens: int) -> int:
+    """Rough token estimate (prompt ~ 4 chars/token plus the completion budget)."""
+    return len(text) // 4 + max_tokens + 20
+
+
+class RateLimiter:
+    """Token bucket that refills `per_minute` units evenly over each minute."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = max(1, per_minute)
+        self.tokens = float(self.capacity)
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, amount: int = 1) -> None:
+        amount = min(amount, self.capacity)  # a single oversized request must still pass eventually
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception):
+    """Seconds requested by the server's Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TranslationEngine:
+    """
+    Send many chat completions at once while respecting a concurrency cap and
+    request/token-per-minute budgets. Results always come back in input order.
+    """
+
+    def __init__(self, model: str, client: openai.AsyncOpenAI = None,
+                 system_prompt: str = TRANSLATE_SYSTEM_PROMPT,
+                 user_template: str = "News article to translate: {text}",
+                 max_tokens: int = 500, temperature: float = 0.5,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 rpm: int = DEFAULT_RPM, tpm: int = DEFAULT_TPM,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff_base: float = 1.0):
+        self.model = model
+        self.client = client
+        self.system_prompt = system_prompt
+        self.user_template = user_template
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.concurrency = concurrency
+        self.rpm, self.tpm = rpm, tpm
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+    def _messages(self, text: str) -> list:
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self.user_template.format(text=text)},
+        ]
+
+    async def _complete(self, client, text, semaphore, request_limiter, token_limiter) -> str:
+        attempt = 0
+        while True:
+            await request_limiter.acquire(1)
+            await token_limiter.acquire(estimate_tokens(text, self.max_tokens))
+            async with semaphore:
+                try:
+                    completion = await client.chat.completions.create(
+                        model=self.model,
+                        messages=self._messages(text),
+                        max_tokens=self.max_tokens,
+                        temperature=self.temperature,
+                    )
+                    return completion.choices[0].message.content.strip()
+                except Exception as e:
+                    if attempt >= self.max_retries or not _is_retryable(e):
+                        raise
+                    error = e
+            # Back off outside the semaphore so other requests keep flowing
+            delay = _retry_after(error) or self.backoff_base * (2 ** attempt) * (0.5 + random.random())
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def iter_translate(self, texts):
+        """
+        Yield (index, result) in input order as soon as each prefix is complete.
+        A failed item yields its exception instead of a string. Only a bounded
+        window of requests is in flight ahead of the consumer, so `texts` may be
+        any iterable and memory stays flat however many articles there are.
+        """
+        client = maybe_cached(self.client or get_async_openai_client())
+        semaphore = asyncio.Semaphore(self.concurrency)
+        request_limiter, token_limiter = RateLimiter(self.rpm), RateLimiter(self.tpm)
+        window = max(1, self.concurrency * 4)
+        pending = deque()
+        remaining = iter(texts)
+
+        def fill():
+            while len(pending) < window:
+                text = next(remaining, None)
+                if text is None:
+                    return
+                pending.append(asyncio.create_task(
+                    self._complete(client, text, semaphore, request_limiter, token_limiter)
+                ))
+
+        fill()
+        index = 0
+        try:
+            while pending:
+                try:
+                    result = await pending.popleft()
+                except Exception as e:
+                    result = e
+                fill()
+                yield index, result
+                index += 1
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def translate_all(self, texts: list) -> list:
+        """Return one result per text, in order (exceptions in place of failures)."""
+        return [result async for _, result in self.iter_translate(texts)]
+
+    def translate(self, texts: list) -> list:
+        """Synchronous entry point for plain LangGraph nodes."""
+        return asyncio.run(self.translate_all(texts))
+
+    def translate_each(self, texts, on_result) -> int:
+        """Synchronously call on_result(index, result) in input order as results arrive."""
+        async def run():
+            count = 0
+            async for index, result in self.iter_translate(texts):
+                on_result(index, result)
+                count += 1
+            return count
+        return asyncio.run(run())
+
+
+# ----- Benchmark against a local fake OpenAI-compatible server -----
+def _start_fake_openai_server(latency: float, error_rate: float):
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency)
+            if random.random() < error_rate:
+                self.send_response(429)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Retry-After", "0.05")
+                error = b'{"error": {"message": "rate limited", "type": "rate_limit"}}'
+                self.send_header("Content-Length", str(len(error)))
+                self.end_headers()
+                self.wfile.write(error)
+                return
+            text = body["messages"][-1]["content"]
+            payload = {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": f"[번역] {text}"}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+            }
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the translation engine against a fake local server")
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake server latency per request (s)")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="fraction of requests answered with 429")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    server = _start_fake_openai_server(args.latency, args.error_rate)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    texts = [f"Article {i}: something happened in AI today." for i in range(args.articles)]
+
+    for concurrency in args.concurrency:
+        engine = TranslationEngine(
+            model="fake-model",
+            client=openai.AsyncOpenAI(base_url=base_url, api_key="fake", max_retries=0),
+            concurrency=concurrency, rpm=100000, tpm=10000000, backoff_base=0.05,
+        )
+        start = time.perf_counter()
+        results = engine.translate(texts)
+        elapsed = time.perf_counter() - start
+        failed = sum(isinstance(r, Exception) for r in results)
+        in_order = all(isinstance(r, Exception) or r.endswith(t) for r, t in zip(results, texts))
+        print(f"concurrency={concurrency:3d}: {len(texts) / elapsed:8.1f} articles/s "
+              f"({elapsed:.2f}s, failed={failed}, ordered={in_order})")
+    server.shutdown()
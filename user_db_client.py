@@ -1,9 +1,9 @@
 # Translated from user_db_client.py citeturn0file0
 # MCP client and LangGraph agent setup
 import asyncio
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp import StdioServerParameters
+from mcp_session_pool import get_pool
+from batch_tools import with_batching
 from langgraph.prebuilt import create_react_agent
 from langchain_openai import ChatOpenAI  # using OpenAI GPT-4 model as an example
 import os
@@ -16,22 +16,21 @@ async def main():
         command="python",
         args=[svrpath]  # Path to the MCP server script
     )
-    # 2. Connect to the MCP server with an STDIO client and start session
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            # Initialize MCP session (exchange server metadata)
-            await session.initialize()
-            # 3. Load available tools from server (retrieve tool metadata)
-            tools = await load_mcp_tools(session)
-            # 4. Create a LangGraph agent with LLM model and tools
-            model = ChatOpenAI(model="gpt-4")
-            agent = create_react_agent(model, tools)
-            # 5. Run agent with natural language query (agent invokes tools to generate response)
-            query = {"messages": "What is the name of user with ID 1?"}
-            result = await agent.ainvoke(query)
-            # Print results
-            for message in result["messages"]:
-                print(message.content)
+    # 2-3. Connect through the shared session pool and load the server's tools
+    #      (the server keeps running between queries, so later calls skip the handshake)
+    pool = get_pool()
+    pool.register("user_db", server_params)
+    #      (parallel get_user_name calls of one agent step are merged into one get_user_names request)
+    tools = with_batching(await pool.get_tools("user_db"))
+    # 4. Create a LangGraph agent with LLM model and tools
+    model = ChatOpenAI(model="gpt-4")
+    agent = create_react_agent(model, tools)
+    # 5. Run agent with natural language query (agent invokes tools to generate response)
+    query = {"messages": "What is the name of user with ID 1?"}
+    result = await agent.ainvoke(query)
+    # Print results
+    for message in result["messages"]:
+        print(message.content)
 
 # Run in asynchronous context
 if __name__ == "__main__":
@@ -1,16 +1,41 @@
 # Translated from user_db_server.py citeturn1file0
+from mcp_startup import lazy, ready  # first import: times the imports below with --profile-startup
 from mcp.server.fastmcp import FastMCP
+from user_store import open_user_store
 
 # Create an MCP server named "UserDBService"
 mcp = FastMCP("UserDBService")
 
+# Demo users, served when USER_DB_PATH is not set
+USERS = {1: "Alice", 2: "Bob"}
+
+@lazy("user_store")
+def get_store():
+    """SQLite (WAL) database or memory-mapped snapshot at USER_DB_PATH, opened on the first lookup."""
+    return open_user_store(demo_users=USERS)
+
 # Register a tool that maps user ID to name
 @mcp.tool()
 def get_user_name(user_id: int) -> str:
     """Return the name corresponding to the given user ID."""
-    users = {1: "Alice", 2: "Bob"}
-    return users.get(user_id, f"Unknown user (ID: {user_id})")
+    name = get_store().get_name(user_id)
+    return name if name is not None else f"Unknown user (ID: {user_id})"
+
+# Batched variant: one tool call (and one LLM step) for many IDs
+@mcp.tool()
+def get_user_names(user_ids: list[int]) -> list[dict]:
+    """Return the names of several users at once. Use this instead of repeated get_user_name calls.
+    One result per ID, in order: {"user_id", "ok": true, "name"} or {"user_id", "ok": false, "error"}."""
+    names = get_store().get_names(user_ids)
+    results = []
+    for user_id in user_ids:
+        if user_id in names:
+            results.append({"user_id": user_id, "ok": True, "name": names[user_id]})
+        else:
+            results.append({"user_id": user_id, "ok": False, "error": f"Unknown user (ID: {user_id})"})
+    return results
 
 if __name__ == "__main__":
+    ready("UserDBService")
     # Run the MCP server over standard IO for inter-process communication on the same machine
     mcp.run(transport="stdio")
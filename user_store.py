@@ -0,0 +1,353 @@
+# user_store.py - Pluggable user stores for user_db_server (dict, SQLite WAL, mmap snapshot)
+import os
+import mmap
+import json
+import queue
+import struct
+import sqlite3
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+
+USER_DB_PATH = os.getenv("USER_DB_PATH")   # .sqlite/.db (SQLite) or .snapshot (mmap); unset: demo users
+USER_DB_POOL_SIZE = int(os.getenv("USER_DB_POOL_SIZE", "4"))
+USER_DB_CACHE_ITEMS = int(os.getenv("USER_DB_CACHE_ITEMS", "100000"))
+
+_MISSING = object()
+
+
+class UserStore:
+    """Read interface shared by every store: user id -> name."""
+
+    def get_name(self, user_id: int):
+        """Name of the user, or None if there is no such user."""
+        raise NotImplementedError
+
+    def get_names(self, user_ids) -> dict:
+        """{user_id: name} for the ids that exist."""
+        names = {}
+        for user_id in user_ids:
+            name = self.get_name(user_id)
+            if name is not None:
+                names[user_id] = name
+        return names
+
+    def close(self) -> None:
+        pass
+
+
+class DictUserStore(UserStore):
+    """In-memory store (the demo users, tests)."""
+
+    def __init__(self, users: dict):
+        self.users = dict(users)
+
+    def get_name(self, user_id: int):
+        return self.users.get(user_id)
+
+
+class SQLiteUserStore(UserStore):
+    """
+    users(id INTEGER PRIMARY KEY, name TEXT) in a SQLite file in WAL mode.
+
+    Readers take a connection from a fixed pool, so lookups from several
+    threads run in parallel (WAL lets them read while a writer commits).
+    Every query is one of a few constant SQL strings, so sqlite3 reuses
+    each connection's prepared statements; a batch lookup binds the ids as
+    a single JSON array (json_each) to keep using one statement for any
+    batch size. Recent lookups, including misses, are served from an LRU.
+    """
+
+    _GET = "SELECT name FROM users WHERE id = ?"
+    _GET_MANY = "SELECT id, name FROM users WHERE id IN (SELECT value FROM json_each(?))"
+    _PUT = "INSERT OR REPLACE INTO users (id, name) VALUES (?, ?)"
+
+    def __init__(self, path: str, pool_size: int = USER_DB_POOL_SIZE,
+                 cache_items: int = USER_DB_CACHE_ITEMS, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self.cache_items = cache_items
+        self._cache = OrderedDict()  # user_id -> name or _MISSING
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.queries = 0
+        if not readonly:
+            with self._connect() as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.readonly:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False,
+                                   cached_statements=64)
+        else:
+            conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=64)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-65536")       # 64 MB page cache per connection
+        conn.execute("PRAGMA mmap_size=268435456")     # read pages through a 256 MB memory map
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    # ----- LRU -----
+    def _cached(self, user_id: int):
+        with self._cache_lock:
+            name = self._cache.get(user_id, _MISSING)
+            if name is not _MISSING:
+                self._cache.move_to_end(user_id)
+                self.cache_hits += 1
+            return name
+
+    def _remember(self, user_id: int, name) -> None:
+        if not self.cache_items:
+            return
+        with self._cache_lock:
+            self._cache[user_id] = name
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.cache_items:
+                self._cache.popitem(last=False)
+
+    # ----- reads -----
+    def get_name(self, user_id: int):
+        name = self._cached(user_id)
+        if name is not _MISSING:
+            return name
+        self.queries += 1
+        with self.connection() as conn:
+            row = conn.execute(self._GET, (user_id,)).fetchone()
+        name = row[0] if row else None
+        self._remember(user_id, name)
+        return name
+
+    def get_names(self, user_ids) -> dict:
+        names, missing = {}, []
+        for user_id in dict.fromkeys(user_ids):
+            name = self._cached(user_id)
+            if name is _MISSING:
+                missing.append(user_id)
+            elif name is not None:
+                names[user_id] = name
+        if missing:
+            self.queries += 1
+            with self.connection() as conn:
+                found = dict(conn.execute(self._GET_MANY, (json.dumps(missing),)))
+            for user_id in missing:
+                name = found.get(user_id)
+                self._remember(user_id, name)
+                if name is not None:
+                    names[user_id] = name
+        return names
+
+    # ----- writes -----
+    def put_many(self, rows) -> None:
+        """Insert or replace (id, name) rows in one transaction."""
+        rows = list(rows)
+        with self.connection() as conn:
+            with conn:
+                conn.executemany(self._PUT, rows)
+        with self._cache_lock:
+            for user_id, _ in rows:
+                self._cache.pop(user_id, None)
+
+    def put(self, user_id: int, name: str) -> None:
+        self.put_many([(user_id, name)])
+
+    def iter_users(self, batch: int = 10000):
+        """All (id, name) rows in id order."""
+        with self.connection() as conn:
+            cursor = conn.execute("SELECT id, name FROM users ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    return
+                yield from rows
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+class SnapshotUserStore(UserStore):
+    """
+    Read-only, memory-mapped snapshot: lookups are a bisect over a sorted id
+    array plus one slice of a name blob, with no SQL or Python objects per
+    user. The OS pages the file in on demand and shares it between server
+    processes.
+
+    File layout (little-endian): b"USNAP1\\0\\0", count (uint64), ids (int64 x
+    count, ascending), name offsets (uint64 x count+1), UTF-8 names.
+    """
+
+    MAGIC = b"USNAP1\0\0"
+    _HEADER = struct.Struct("<8sQ")
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = self._HEADER.unpack_from(self._mmap, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"{path} is not a user snapshot")
+        self.count = count
+        view = memoryview(self._mmap)
+        ids_start = self._HEADER.size
+        offsets_start = ids_start + 8 * count
+        self._names_start = offsets_start + 8 * (count + 1)
+        self._ids = view[ids_start:offsets_start].cast("q")
+        self._offsets = view[offsets_start:self._names_start].cast("Q")
+        self._view = view
+
+    @classmethod
+    def write(cls, path: str, rows) -> int:
+        """Write (id, name) rows (any order, unique ids) as a snapshot; returns the user count."""
+        from array import array
+
+        rows = sorted(rows)
+        ids = array("q", (user_id for user_id, _ in rows))
+        offsets = array("Q", [0])
+        names = bytearray()
+        for _, name in rows:
+            names += name.encode("utf-8")
+            offsets.append(len(names))
+        if ids.itemsize != 8 or offsets.itemsize != 8:
+            raise RuntimeError("64-bit array types are required")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(cls._HEADER.pack(cls.MAGIC, len(ids)))
+            f.write(ids.tobytes())
+            f.write(offsets.tobytes())
+            f.write(names)
+        os.replace(tmp_path, path)
+        return len(ids)
+
+    def get_name(self, user_id: int):
+        i = bisect_left(self._ids, user_id)
+        if i == self.count or self._ids[i] != user_id:
+            return None
+        start = self._names_start + self._offsets[i]
+        end = self._names_start + self._offsets[i + 1]
+        return str(self._view[start:end], "utf-8")
+
+    def close(self) -> None:
+        self._ids.release()
+        self._offsets.release()
+        self._view.release()
+        self._mmap.close()
+
+
+def open_user_store(path: str = USER_DB_PATH, demo_users: dict = None) -> UserStore:
+    """
+    Store for `path`: a .snapshot file is memory-mapped, anything else is
+    opened as a SQLite database. Without a path the demo users are served
+    from memory.
+    """
+    if not path:
+        return DictUserStore(demo_users or {})
+    if path.endswith((".snapshot", ".snap")):
+        return SnapshotUserStore(path)
+    return SQLiteUserStore(path)
+
+
+def generate_users(count: int, seed: int = 11):
+    """Yield count (id, name) rows with sparse ids."""
+    import random
+
+    rng = random.Random(seed)
+    first = ["Alice", "Bob", "Chloe", "Dmitri", "Eun-ji", "Farid", "Grace", "Hiro", "Ines", "Jae-won", "Kofi", "Lena"]
+    last = ["Kim", "Lee", "Park", "Smith", "Garcia", "Tanaka", "Novak", "Okafor", "Silva", "Chen", "Müller", "Rossi"]
+    for i in range(count):
+        yield i * 3 + 1, f"{rng.choice(first)} {rng.choice(last)}"
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import random
+    import asyncio
+    import argparse
+    import statistics
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Benchmark the user stores in process and over MCP stdio")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--calls", type=int, default=2000, help="MCP get_user_name calls per store")
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    def bench(label, store, ids):
+        start = time.perf_counter()
+        for user_id in ids:
+            store.get_name(user_id)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:34s} {len(ids) / elapsed:12,.0f} lookups/s  ({elapsed / len(ids) * 1e6:.2f} us each)")
+
+    async def mcp_load(label, env):
+        from mcp_session_pool import MCPSessionPool
+
+        pool = MCPSessionPool()
+        pool.register("user_db", {"command": sys.executable, "args": ["user_db_server.py"], "env": env})
+        rng = random.Random(3)
+        ids = [rng.randrange(1, args.users * 3) for _ in range(args.calls)]
+        await pool.acall_tool("user_db", "get_user_name", {"user_id": 1})  # start the server
+        gate = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def one(user_id):
+            async with gate:
+                start = time.perf_counter()
+                await pool.acall_tool("user_db", "get_user_name", {"user_id": user_id})
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(user_id) for user_id in ids))
+        elapsed = time.perf_counter() - start
+        q = statistics.quantiles(latencies, n=100)
+        start = time.perf_counter()
+        result = await pool.acall_tool("user_db", "get_user_names", {"user_ids": ids[:100]})
+        batch = time.perf_counter() - start
+        print(f"  {label:16s} get_user_name {args.calls / elapsed:6,.0f} calls/s (p50 {q[49] * 1e3:6.1f} ms, "
+              f"p95 {q[94] * 1e3:6.1f} ms)  get_user_names x{len(result)} {len(result) / batch:8,.0f} users/s")
+        pool.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "users.sqlite")
+        snapshot_path = os.path.join(tmp, "users.snapshot")
+        start = time.perf_counter()
+        store = SQLiteUserStore(db_path)
+        store.put_many(generate_users(args.users))
+        print(f"wrote {args.users:,} users to SQLite in {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        SnapshotUserStore.write(snapshot_path, store.iter_users())
+        print(f"wrote snapshot ({os.path.getsize(snapshot_path) / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s")
+
+        rng = random.Random(5)
+        ids = [rng.randrange(1, args.users * 3) for _ in range(args.lookups)]   # ~1/3 exist
+        hot = [rng.choice(ids[:5000]) for _ in range(args.lookups)]              # repeated ids
+        print("in process:")
+        bench("SQLite, no cache (random ids)", SQLiteUserStore(db_path, cache_items=0), ids)
+        bench("SQLite + LRU (hot ids)", SQLiteUserStore(db_path), hot)
+        snapshot = SnapshotUserStore(snapshot_path)
+        bench("mmap snapshot (random ids)", snapshot, ids)
+        for user_id in ids[:1000]:
+            assert snapshot.get_name(user_id) == store.get_name(user_id)
+        snapshot.close()
+        store.close()
+
+        print("over MCP stdio (user_db_server.py):")
+        # per-call cost over stdio is dominated by the MCP SDK (framing, schema validation), not the store
+        base_env = {k: v for k, v in os.environ.items() if k != "USER_DB_PATH"}
+        asyncio.run(mcp_load("demo dict", base_env))
+        asyncio.run(mcp_load("SQLite", {**base_env, "USER_DB_PATH": db_path}))
+        asyncio.run(mcp_load("mmap snapshot", {**base_env, "USER_DB_PATH": snapshot_path}))
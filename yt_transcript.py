@@ -1,6 +1,6 @@
 # yt_transcript.py
+from mcp_startup import ready  # first import: times the imports below with --profile-startup
 from mcp.server.fastmcp import FastMCP
-from youtube_transcript_api import YouTubeTranscriptApi
 import re
 
 # Create FastMCP server instance (service name: "YouTubeService")
@@ -14,6 +14,7 @@ def get_transcript(video_url: str) -> str:
         # Extract the video ID from the URL (supports youtu.be short URLs or v= parameter)
         match = re.search(r"(?:v=|youtu\.be/)([^&/\n?]+)", video_url)
         video_id = match.group(1) if match else video_url  # Assume input is ID if no match
+        from youtube_transcript_api import YouTubeTranscriptApi  # deferred: only needed once a video is requested
         # Retrieve transcript segments via YouTubeTranscriptApi (preferring English)
         transcript_list = YouTubeTranscriptApi.get_transcript(video_id, languages=['en'])
         # Concatenate each segment's 'text' field into a single string
@@ -23,4 +24,5 @@ def get_transcript(video_url: str) -> str:
         return f"(Transcript extraction error: {e})"
 
 if __name__ == "__main__":
+    ready("YouTubeService")
     mcp.run(transport="stdio")